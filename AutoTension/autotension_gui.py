@@ -34,6 +34,9 @@
 #                     New "Truer" overtension value?
 #                     Get tension clarified some more
 #
+# 2026-10, Records go to the database through an outbox (sMDT.outbox), so saving never waits on it.
+#          It's opened after the window shows, and matplotlib is imported when first plotting
+#
 
 import sys
 import os
@@ -58,6 +61,7 @@ DROPBOX_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(DROPBOX_DIR)
 
 from sMDT import db, tube
+from sMDT.outbox import Outbox
 from sMDT.data.tension import Tension, TensionRecord
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -70,6 +74,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.plot_y_label = "Tension (g)"
 
         self.db = db.db()
+        # Records are journaled locally and written to the database in the background.
+        self.outbox = self.open_outbox()
 
         names = []
         file = open("Python_program_names.txt", "r")
@@ -322,6 +328,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.increase = 10
         self.decrease = 10
 
+    def open_outbox(self):
+        # Nothing could be saved without it, so the station doesn't start.
+        try:
+            return Outbox('autotension', self.db)
+        except Exception as e:
+            QMessageBox.critical(None, "AutoTension",
+                                 "Couldn't open the outbox, is another AutoTension window open?\n" + str(e))
+            raise
+
     def update_auto_ext_tension(self, tension):
         self.auto_ext_tension.setText(str(tension))
 
@@ -512,12 +527,12 @@ class MainWindow(QtWidgets.QMainWindow):
                         tension, frequency = self.measuring_manual_tension("Measuring internal tension")
 
                         if(( tension > 350) and (tension < 450) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_tension_pass("Overtension complete")
                         else:
                             tension, frequency = self.measuring_manual_tension("Recalculating...")
                             if(( tension > 350) and (tension < 450) ):
-                                self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                                self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                                 self.manual_tension_pass("Overtension complete")
                             else:
                                 self.manual_red("Invalid overtension, check battery or try again")
@@ -574,24 +589,24 @@ class MainWindow(QtWidgets.QMainWindow):
                         tension, frequency = self.measuring_manual_tension("Measuring internal tension")
 
                         if( (tension > 311.97) and (tension < 326.15) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_tension_pass("Final tension complete, "+(self.manual_ID_edit.text().strip())+" tube tension added to database")
                             self.manual_focus()
                         else:
                             tension, frequency = self.measuring_manual_tension("Error, recalculating...")
                             if( (tension > 315.48) and (tension < 322.57) ):
-                                self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                                self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                                 self.manual_tension_pass("Final tension complete, tube tension added to database")
                                 win32gui.SetForegroundWindow(win32gui.FindWindow(None, "AutoTension"))
                                 self.manual_focus()
                             elif( (tension > 200) and (tension < 315.48) ):
-                                self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                                self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                                 self.manual_red("Final tension low, need increase")
                             elif( (tension > 322.57) and (tension < 400) ):
-                                self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                                self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                                 self.manual_red("Final tension high, need decrease")
                             elif(tension < 200):
-                                self.db.ad4d_tube(self.manual_tube_tension_record(tension, frequency))
+                                self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                                 self.manual_red("Final tension very low, check battery or try again?")
                             else:
                                 self.manual_red("Invalid final tension, check battery")
@@ -617,39 +632,39 @@ class MainWindow(QtWidgets.QMainWindow):
                     tension, frequency = self.measuring_auto_tension("Measuring internal tension")
 
                     if( (tension > 335) and (tension < 365) ):
-                        self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                         self.auto_tension_pass((self.auto_ID_edit.text().strip())+" Done. Internal tension is "+str(tension))
                     elif( (tension > 200) and (tension < 315) ):
-                        self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                         self.auto_red("Done. Tension low.")
                     elif( (tension > 315) and (tension < 335) ):
-                        self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                         self.auto_red("Done. If 1st tension, good. If 2nd tension, low.")
                         #self.auto_yellow()
                         #self.auto_int_tension.setStyleSheet('background-color: yellow')
                         #self.update_auto_status("Done. If 1st tension, good. If 2nd tension, low.")
                     elif( (tension > 365) and (tension < 500) ):
-                        self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                         self.auto_red("Done. Tension high.")
                     else:
                         tension, frequency = self.measuring_auto_tension("Error, recalculating...")
                         if(tension <= 200):
-                            self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                             self.auto_red("Done. Internal tension low. Wire snap? Check battery?")
                         elif( (tension > 200) and (tension < 315) ):
-                            self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                             self.auto_red("Done. Tension low.")
                         elif( (tension > 315) and (tension < 335) ):
-                            self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                             self.auto_red("Done. If 1st tension, good. If 2nd tension, low.")
                             #self.auto_yellow()
                             #self.auto_int_tension.setStyleSheet('background-color: yellow')
                             #self.update_auto_status("Done. If 1st tension, good. If 2nd tension, low.")
                         elif( (tension > 335) and (tension < 365) ):
-                            self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                             self.auto_tension_pass("Done. Internal tension is "+str(tension))
                         elif( (tension > 365) and (tension < 500) ):
-                            self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                             self.auto_red("Done. Tension high.")
                         else:
                             self.auto_red("Invalid tension, very high, check battery?")
@@ -673,37 +688,37 @@ class MainWindow(QtWidgets.QMainWindow):
                     tension, frequency = self.measuring_manual_tension("Measuring internal tension")
 
                     if( (tension > 335) and (tension < 365) ):
-                        self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                         self.manual_tension_pass((self.manual_ID_edit.text().strip())+" Done. Internal tension is "+str(tension))
                     elif( (tension > 200) and (tension < 315) ):
-                        self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                         self.manual_red("Done. Tension low.")
                     elif( (tension > 315) and (tension < 335) ):
-                        self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                         self.manual_yellow()
                         self.manual_int_tension.setStyleSheet('background-color: yellow')
                         self.update_manual_status("Done. If 1st tension, good. If 2nd tension, low.")
                     elif( (tension > 365) and (tension < 500) ):
-                        self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                        self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                         self.manual_red("Done. Tension high.")
                     else:
                         tension, frequency = self.measuring_manual_tension("Error, recalculating...")
                         if(tension <= 200):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_red("Done. Internal tension low. Wire snap? Check battery?")
                         elif( (tension > 200) and (tension < 315) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_red("Done. Tension low.")
                         elif( (tension > 315) and (tension < 335) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_yellow()
                             self.manual_int_tension.setStyleSheet('background-color: yellow')
                             self.update_manual_status("Done. If 1st tension, good. If 2nd tension, low.")
                         elif( (tension > 335) and (tension < 365) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_tension_pass("Done. Internal tension is "+str(tension))
                         elif( (tension > 365) and (tension < 500) ):
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_red("Done. Tension high.")
                         else:
                             self.manual_red("Invalid tension, very high, check battery?")
@@ -743,7 +758,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
                         if( (tension > 280.00) and (tension < 350.00) ):
                             tension, frequency = self.measuring_manual_tension("Double checking tension")
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_tension_pass("Tension increased")
                         else:
                             self.manual_red("Invalid tension, make sure you are near correct tension range, check battery, or try again")
@@ -786,7 +801,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
                         if( (tension > 280.00) and (tension < 350.00) ):
                             tension, frequency = self.measuring_manual_tension("Double checking tension")
-                            self.db.add_tube(self.manual_tube_tension_record(tension, frequency))
+                            self.outbox.add_tube(self.manual_tube_tension_record(tension, frequency))
                             self.manual_tension_pass("Tension decreased")
                         else:
                             self.manual_red("Invalid tension, make sure you are near correct tension range, or check battery and try again")
@@ -921,7 +936,7 @@ class MainWindow(QtWidgets.QMainWindow):
                                                 if(check1 != 2):
                                                     if( (tension > 200) and (tension < 450) ):
                                                         tension, frequency = self.measuring_auto_tension("Double checking tension...")
-                                                        self.db.add_tube(self.auto_tube_tension_record(tension, frequency))
+                                                        self.outbox.add_tube(self.auto_tube_tension_record(tension, frequency))
                                                         self.auto_tension_pass("Done")
                                                         win32gui.SetForegroundWindow(win32gui.FindWindow(None, "AutoTension"))
                                                         self.auto_focus()
@@ -7,12 +7,12 @@
 # Modifications:
 # 2022-06, Reinhard: Move high-level functionality to autotension_gui
 #          Alexandru: Abort when user presses "Esc"
+# 2026-10, matplotlib is imported when first plotting, not at startup
 #
 import math
 import keyboard
 import nidaqmx
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 
 from nidaqmx.constants import TerminalConfiguration, AcquisitionType
@@ -33,6 +33,7 @@ class Plotter:
         self.i = 0
 
     def plot(self, Y):
+        import matplotlib.pyplot as plt
         self.X.append(time.time()-self.time0)
         self.Y.append(Y)
         self.i += 1
@@ -52,6 +53,7 @@ class Plotter:
         plt.show(block=False)
 
     def clear(self):
+        import matplotlib.pyplot as plt
         plt.clf()
         self.X = []
         self.Y = []
@@ -21,20 +21,30 @@ import sys
 
 DROPBOX_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(DROPBOX_DIR)
-from sMDT import db, tube
+from sMDT import tube
 from sMDT.data import bent
+from sMDT.outbox import Outbox
 path=os.path.dirname(os.path.abspath(__file__))
+# Records are journaled locally and written to the database in the background
+# by an outbox, opened on the first write so importing this doesn't take its lock
+outbox = None
+
+
+def get_outbox():
+    global outbox
+    if outbox is None:
+        outbox = Outbox('bentness')
+    return outbox
 
 
 
 def write(code, length, name):
-    datab = db.db()
     tube1 = tube.Tube()
     tube1.set_ID(code)
     if not length:
         length = 0
     tube1.bent.add_record(bent.BentRecord(bentness=float(length),user=name))    
-    datab.add_tube(tube1)
+    get_outbox().add_tube(tube1)
         
 #######################################
 #####      Swage Entry Code    ########
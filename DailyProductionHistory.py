@@ -11,10 +11,8 @@ from sMDT import db, tube
 from sMDT.data import status
 import sys
 
-# get all of the tubes in the database
 database=db.db()
-tubes = database.get_tubes()
-if len(tubes)==0:
+if database.size(include_cold=True)==0:
     print("Error, no tubes found!")
     sys.exit(1)
 EndDate=datetime(2021,6,4).date()
@@ -26,6 +24,8 @@ totBent=0
 
 # Start date is the date one week ago
 StartDate=datetime.today().date() - timedelta(days=7)
+# only the swaged tubes made in that week are needed
+tubes = list(database.query(station='swage', mfg_date=(StartDate, None), include_cold=True))
 day = 0
 noProdDay=0
 
@@ -1,9 +1,6 @@
-from sMDT import db
-from sMDT import tube as Tube
-from sMDT.data.dark_current import DarkCurrentRecord
+from sMDT import ingest
 
 import sys
-import datetime
 
 
 if __name__ == "__main__":
@@ -11,12 +8,9 @@ if __name__ == "__main__":
     dark_current = sys.argv[2]
     date = sys.argv[3]
     barcode = sys.argv[4]
-    date = datetime.datetime.strptime(date, '%m/%d/%Y%I:%M %p')
 
-    datab = db.db()
-    tube = Tube()
-    tube.set_ID(barcode)
-    tube.leak.add_record(DarkCurrentRecord(dark_current=dark_current,
-                                           date=date, 
-                                           user=name))
-    datab.add_tube(tube)
\ No newline at end of file
+    # The line goes to the ingest worker if it's running, see
+    # utilities/Modules_for_Labview/dark_current_to_tube.py. The record goes
+    # to the dark current station as a number; before 2026-10 this script
+    # added it to the leak station, as the string LabVIEW passed.
+    ingest.submit('dark_current', name, dark_current, date, barcode)
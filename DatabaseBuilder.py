@@ -41,7 +41,7 @@ if __name__ == "__main__":
 			end_time = time.perf_counter()
 			difference_sec = end_time-start_time
 			diff_str = str(difference_sec) + " seconds." if difference_sec < 60 else str(difference_sec/60) + " minutes."
-			print('Database updated, new size is', str(database.size()) +'.' + "Took", diff_str)
+			print('Database updated, new size is', str(database.size(include_cold=True)) +'.' + "Took", diff_str)
 			time.sleep(5)
 		else:
 			start_time = time.perf_counter()
@@ -49,7 +49,7 @@ if __name__ == "__main__":
 			end_time = time.perf_counter()
 			difference_sec = end_time-start_time
 			diff_str = str(difference_sec) + " seconds." if difference_sec < 60 else str(difference_sec/60) + " minutes."
-			print('Database updated, new size is', str(database.size()) +'.' + "Took", diff_str)
+			print('Database updated, new size is', str(database.size(include_cold=True)) +'.' + "Took", diff_str)
 			lock.unlock()
 		input("Press enter to continue...")
 		
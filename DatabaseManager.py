@@ -18,6 +18,7 @@ if __name__ == "__main__":
 		LOOP = True
 		CLEANUP = False
 		NOPICKLER = False
+		TIER = True
 
 		db_man = db.db_manager(archive=ARCHIVE, testing=NOPICKLER)
 		if WIPE:
@@ -25,6 +26,9 @@ if __name__ == "__main__":
 			db_man.cleanup()
 		if CLEANUP:
 			db_man.cleanup()
+		if TIER:
+			# Complete and shipped tubes go to the cold tier, see sMDT/tiering.py
+			db_man.tier()
 
 		lock.lock()
 		current_folder = os.path.dirname(os.path.abspath(__file__))
@@ -36,7 +40,10 @@ if __name__ == "__main__":
 			end_time = time.perf_counter()
 			elapsed = end_time - start_time
 
-			print_str = f"Database updated. Updated size is {database.size()}. "
+			# database.meta, written by the update, the database isn't opened
+			metadata = database.metadata()
+			print_str = f"Database updated. Updated size is {metadata.tubes + metadata.cold} ({metadata.cold} cold), "
+			print_str += f"{metadata.count()} records, {metadata.pending} files waiting. "
 			print_str += f"This took {elapsed:0.2f} seconds."
 			print(print_str)
 			time.sleep(5)
@@ -46,7 +53,10 @@ if __name__ == "__main__":
 			end_time = time.perf_counter()
 			elapsed = end_time - start_time
 
-			print_str = f"Database updated. Updated size is {database.size()}. "
+			# database.meta, written by the update, the database isn't opened
+			metadata = database.metadata()
+			print_str = f"Database updated. Updated size is {metadata.tubes + metadata.cold} ({metadata.cold} cold), "
+			print_str += f"{metadata.count()} records, {metadata.pending} files waiting. "
 			print_str += f"This took {elapsed:0.2f} seconds."
 			print(print_str)
 			lock.unlock()
@@ -13,6 +13,8 @@
 #   2021-06-13, Reinhard Schwienhorst: Update database every 5 seconds
 #   2021-06-24, Reinhard: Allow user to enter only 4 digits for tube ID
 #   2022-06, Sara: Add UMich info for color and second tension
+#   2026-10, The window shows right away, the tubes are loaded after
+#   2026-10, The database given on the command line is opened, it was ignored
 #
 ###############################################################################
 
@@ -34,6 +36,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from sMDT import db as db
+from sMDT.header import barcode_number
 from sMDT.data import status
 import sys
 
@@ -169,7 +172,7 @@ class DataModel(QtCore.QAbstractTableModel):
         return len(self.m_data)
 
     def columnCount(self, index):
-        return len(self.m_data[0])
+        return len(DataModel.horizontal_headers)
 
     def update(self):
         self.layoutAboutToBeChanged.emit()
@@ -496,46 +499,39 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setCentralWidget(self.tabbed_window)
 
 
-def get_tension_measurement(list_of_records, type, mode):
-    date_set_without_times = set()
-    for record in list_of_records:
-        date_set_without_times.add(record.date.date())
-
+def get_tension_measurement(station, type, mode):
+    # The day is the first ('initial') or last ('final') day the tube was
+    # tensioned, taken from the station summary rather than a scan.
+    summary = station.summary()
     if type == 'initial':
-        # The oldest date is the smallest.
-        date = min(date_set_without_times)
+        date = summary.first_day
     elif type == 'final':
-        date = max(date_set_without_times)
+        date = summary.last_day
     else:
-        date = DataModel.no_value_recorded_date
+        date = None
+    if date is None:
+        raise ValueError("no tension records")
 
     ret_date = DataModel.no_value_recorded_date
     ret_tens = DataModel.no_value_recorded_float
 
+    record = None
     if mode == 'last':
-        l = []
-        for record in list_of_records:
-            if record.date.date() == date:
-                l.append(record)
-
-        ret_date = l[-1].date
-        ret_tens = l[-1].tension
-
-    if mode == 'first passing':
-        for record in list_of_records:
-            if record.date.date() == date and not record.fail():
-                ret_date = record.date
-                ret_measurement = record.tension
-                break
-
-    if mode == 'last passing':
-        l = []
-        for record in list_of_records:
-            if record.date.date() == date and not record.fail():
-                l.append(record)
-
-        ret_date = l[-1].date
-        ret_tens = l[-1].tension
+        record = summary.day_last(date)
+
+    if mode == 'first passing' or mode == 'last passing':
+        start = datetime.datetime.combine(date, datetime.time())
+        passing = [
+            i for i in station.get_records_between(
+                start, start + datetime.timedelta(days=1)
+            ) if not i.fail()
+        ]
+        if passing:
+            record = passing[0] if mode == 'first passing' else passing[-1]
+
+    if record is not None:
+        ret_date = record.date
+        ret_tens = record.tension
 
     return (ret_date, ret_tens)
 
@@ -590,7 +586,7 @@ def db_to_display_array(database):
             try:
                 (initial_tension_date, initial_tension) = \
                     get_tension_measurement(
-                        tube.tension.get_record('all'),
+                        tube.tension,
                         'initial',
                         'last'
                     )
@@ -605,7 +601,7 @@ def db_to_display_array(database):
                     (tube.umich_tension.get_record().umich_date,
                     tube.umich_tension.get_record().umich_tension)
                     # get_tension_measurement(
-                    #     tube.tension.get_record('all'),
+                    #     tube.tension,
                     #     'final',
                     #     'last'
                     # )
@@ -645,18 +641,8 @@ def db_to_display_array(database):
             # except IndexError:
             #     umich_tension = unrecorded_str
 
-            if tube_id is None:
-                tube_id = 0
-            elif tube_id == "":
-                tube_id = 0
-            else:
-                try:
-                    tube_id = int(tube_id[2:])
-                except ValueError:
-                    try:
-                        tube_id = int(tube_id[3:])
-                    except ValueError:
-                        tube_id = 0
+            # the number of the barcode, MSU01234 -> 1234, or 0
+            tube_id = barcode_number(tube_id) or 0
 
             if swage_date is None:
                 swage_date = DataModel.no_value_recorded_date
@@ -715,10 +701,12 @@ def get_data_array_alt():
 
 
 def get_new_database(path_str=None):
+    # path_str is the directory of a database, or its database.s file
     if path_str is None:
         database = db.db()
     else:
-        database = db.db(path_str)
+        path = Path(path_str)
+        database = db.db(config=path if path.is_dir() else path.parent)
     return database
 
 
@@ -731,17 +719,16 @@ def main():
         path_str = None
 
     database = get_new_database(path_str)
-    data_array = db_to_display_array(database)
-
-    if not data_array:
-        data_array = get_data_array_alt()
 
     app = QtWidgets.QApplication(sys.argv)
 
     app.setStyle("fusion")
 
-    window = MainWindow(data_array, database, path_str)
+    # Shown empty, loading every tube takes a while. The timer fires once
+    # the window is up.
+    window = MainWindow([], database, path_str)
     window.show()
+    QtCore.QTimer.singleShot(0, window.tabbed_window.data_model.update)
 
     if pyside_version == 2:
         sys.exit(app.exec_())
@@ -199,7 +199,9 @@ class ExportTubesWidget(QtWidgets.QWidget):
             csv_lines = []
             for (key, val) in self.tube_dict.items():
                 for tube_id in val:
-                    t = self.database.get_tube(tube_id)
+                    t = self.database.get_tube(
+                        tube_id, stations=['tension', 'dark_current', 'leak']
+                    )
                     logger = self.name
                     row = key[3:]
                     barcode = tube_id
@@ -266,8 +268,12 @@ class ExportTubesWidget(QtWidgets.QWidget):
                 for i in range(508, 520):
                     self.add_item_to_model(f"MSU00{i}")
 
+        # A tube still in production is in the station cache, otherwise it's
+        # loaded from the database.
+        t = self.database.get_wip(tube_id)
         try:
-            t = self.database.get_tube(tube_id)
+            if t is None:
+                t = self.database.get_tube(tube_id)
         except KeyError:
             print("KeyError has occurred. Tube cannot be found in the database")
         except AttributeError:
@@ -294,15 +300,11 @@ class ExportTubesWidget(QtWidgets.QWidget):
         self.barcode_entry.clear()
 
     def get_first_tension(self, tube):
-        list_of_records = tube.tension.get_record('all')
-        first_record = None
-
-        for record in list_of_records:
-            if not record.fail():
-                first_record = record
-
-        if first_record is None:
-            first_record = list_of_records[-1]
+        # The exported "First Tension" columns have always held the last
+        # tension record (the loop this replaced returned its loop
+        # variable), and the CSVs already sent out were written that way, so
+        # this keeps giving the last record rather than summary().first_passing.
+        record = tube.tension.get_record('last')
 
         return (record.tension, record.frequency, record.date)
 
@@ -1,24 +1,14 @@
 import sys
 import os
-import datetime
 DROPBOX_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(DROPBOX_DIR)
 
 from sMDT import db
 
-def getFirstTensionRecord(records):
-    earliestTensionDate = datetime.datetime(year=datetime.MAXYEAR, month=1, day=1)
-    for record in records:
-        if record.date < earliestTensionDate:
-            earliestTensionDate = record.date
-    firstTensionRecord = None
-    firstTensionDate = datetime.datetime(year=datetime.MINYEAR, month=1, day=1)
-    for record in records:
-        if record.date.day == earliestTensionDate.day and record.date.month == earliestTensionDate.month:
-            if record.date > firstTensionDate:
-                firstTensionRecord = record
-                firstTensionDate = record.date
-    return firstTensionRecord
+def getFirstTensionRecord(station):
+    # The last tension record on the first day the tube was tensioned.
+    summary = station.summary()
+    return summary.day_last(summary.first_day)
 
 date = str(input("Enter date in YYYY-MM-DD format:"))  ## MAKING THIS PROGRAM INTERACTIVE AND TAKE IN USER INPUT - HAYDEN
 date += "_8_00_00.csv"
@@ -40,7 +30,7 @@ datab = db.db()
 for barcode in barcodes:
     print(barcode)
     tube1 = datab.get_tube(barcode)
-    firstTensionRecord = getFirstTensionRecord(tube1.tension.get_record(mode='all'))
+    firstTensionRecord = getFirstTensionRecord(tube1.tension)
     tension = firstTensionRecord.tension
     tensiond = firstTensionRecord.date.strftime("%Y:%m:%d")
     tensionf = firstTensionRecord.frequency
@@ -7,6 +7,11 @@
 #       before it can be swaged. The current program cannot handle this, and 
 #       so a new program was created specifically for this reason.
 #
+#   Modifications:
+#   2026-10, Tubes go to the database through an outbox (sMDT.outbox), so
+#       entering one never waits on the database. It's opened after the
+#       window shows.
+#
 #   Known Issues:
 #
 #   Workarounds:
@@ -50,6 +55,7 @@ TEST_LEN = 53535353353553
 
 from sMDT import db, tube
 from sMDT.data import swage, status
+from sMDT.outbox import Outbox
 
 if debug:
     db_man = db.db_manager(testing=True)
@@ -60,6 +66,9 @@ class SwageWidget(QtWidgets.QWidget):
     def __init__(self, db):
         super().__init__()
         self.database = db
+        # New records are journaled locally and written to the database in
+        # the background.
+        self.outbox = self.open_outbox()
         self.setWindowTitle("Swage Station GUI")
         layout = QtWidgets.QVBoxLayout()
 
@@ -125,8 +134,14 @@ class SwageWidget(QtWidgets.QWidget):
             if tube_id == MSU_CODE:
                 return TEST_LEN
 
+        # A tube swaged recently is in the station cache, without opening the
+        # database.
+        entry = self.database.get_wip(tube_id)
+        if entry is not None and entry.raw_length is not None:
+            return entry.raw_length
+
         try:
-            t = self.database.get_tube(tube_id)
+            t = self.database.get_tube(tube_id, stations=['swage'])
         except KeyError:
             return None
         else:
@@ -149,6 +164,15 @@ class SwageWidget(QtWidgets.QWidget):
         else:
             self.raw_length_entry.setText(str(raw_len))
 
+    def open_outbox(self):
+        # Nothing could be saved without it, so the station doesn't start.
+        try:
+            return Outbox('swage', self.database)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(None, "Swage Station GUI",
+                                           "Couldn't open the outbox, is another swage station window open?\n" + str(e))
+            raise
+
     @QtCore.Slot()
     def write_to_database(self):
         barcode = self.barcode_entry.text().strip()
@@ -193,7 +217,7 @@ class SwageWidget(QtWidgets.QWidget):
 
         if not debug:
             try:
-                self.database.add_tube(t)
+                self.outbox.add_tube(t)
             except Exception as e:
                 self.text_box.setText(
                     f"There was an issue with entering tube {barcode}.\n"
@@ -14,7 +14,7 @@ import sys
 
 # get all of the tubes in the database
 database=db.db()
-tubes = database.get_tubes()
+tubes = database.get_tubes(include_cold=True)
 
 totTubes=0
 totGood=0
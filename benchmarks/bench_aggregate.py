@@ -0,0 +1,77 @@
+###############################################################################
+#   File: bench_aggregate.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Compares daily mean, std and median of tension values computed
+#       the way plot/devious_plots.py used to (a Python list per day, then
+#       numpy per list) with sMDT.aggregate, on synthetic tubes. The results
+#       are checked against each other.
+#
+#   Usage: python benchmarks/bench_aggregate.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import aggregate
+
+
+def bucket(tubes):
+    buckets = {}
+    for tube in tubes:
+        for record in tube.tension.m_records:
+            if record.date is not None and record.tension is not None:
+                buckets.setdefault(record.date.date(), []).append(record.tension)
+    return buckets
+
+
+def reduce_lists(buckets):
+    days = sorted(buckets)
+    return (
+        days,
+        [sum(buckets[day]) / len(buckets[day]) for day in days],
+        [np.std(buckets[day]) for day in days],
+        [np.median(buckets[day]) for day in days],
+    )
+
+
+def main(n=100000):
+    tubes = make_tubes(n)
+    stats = ('mean', 'std', 'median')
+
+    start = time.perf_counter()
+    buckets = bucket(tubes)
+    list_extract = time.perf_counter() - start
+    start = time.perf_counter()
+    days, mean, std, median = reduce_lists(buckets)
+    list_reduce = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups, codes, values, dropped = aggregate.extract(tubes, 'tension', 'day')
+    array_extract = time.perf_counter() - start
+    start = time.perf_counter()
+    result = aggregate.reduce(groups, codes, values, stats)
+    array_reduce = time.perf_counter() - start
+
+    assert result.groups == days
+    assert np.allclose(result['mean'], mean)
+    assert np.allclose(result['std'], std)
+    assert np.allclose(result['median'], median)
+    print(f"{n} tubes, {len(values)} values, {len(days)} days")
+    print(f"              {'extract':>9} {'reduce':>9} {'total':>9}")
+    print(f"lists per day {list_extract:8.3f}s {list_reduce:8.3f}s {list_extract + list_reduce:8.3f}s")
+    print(f"aggregate     {array_extract:8.3f}s {array_reduce:8.3f}s {array_extract + array_reduce:8.3f}s")
+    print(f"reduce speedup {list_reduce / array_reduce:5.1f}x, total speedup "
+          f"{(list_extract + list_reduce) / (array_extract + array_reduce):5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,57 @@
+###############################################################################
+#   File: bench_batch.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times staging tubes with one add_tube() call each against one
+#       add_tubes() batch, and the db_manager update that stores them. The
+#       database, new_data and the lock are in a temporary directory, the
+#       real database isn't touched.
+#
+#   Usage: python benchmarks/bench_batch.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import db
+
+
+def setup(directory):
+    database = db.db(config=directory)
+    manager = db.db_manager(testing=True, config=directory)
+    return database, manager
+
+
+def timed(name, stage, tubes):
+    with tempfile.TemporaryDirectory() as directory:
+        database, manager = setup(directory)
+        start = time.perf_counter()
+        stage(database, tubes)
+        staged = time.perf_counter() - start
+        files = len(os.listdir(str(database.new_data_dir)))
+        start = time.perf_counter()
+        manager.update(logging=False)
+        updated = time.perf_counter() - start
+        assert database.size() == len(tubes)
+    total = staged + updated
+    print(f"{name:<10} stage {staged:6.2f} s ({files} files), update {updated:6.2f} s, "
+          f"{len(tubes) / total:7.0f} tubes/s")
+    return total
+
+
+def main(n=5000):
+    tubes = make_tubes(n)
+    single = timed("add_tube", lambda d, ts: [d.add_tube(t) for t in ts], tubes)
+    batch = timed("add_tubes", lambda d, ts: d.add_tubes(ts), tubes)
+    print(f"speedup    {single / batch:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,91 @@
+###############################################################################
+#   File: bench_compression.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: Compares the settings of the Config's compression (see
+#       compression.py): the size of the database on disk, and of the tube
+#       pickles stored in it, against the time to read it back, decompressing every tube pickle, loading every tube
+#       with get_tubes() and looking tubes up with get_tube(). Run it on the
+#       lab's computers to pick the setting for their disks and CPUs. The
+#       databases are in temporary directories, the real database isn't
+#       touched.
+#
+#   Usage: python benchmarks/bench_compression.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import db
+from sMDT.config import Config
+
+# (name, codec, with a dictionary built by compress())
+SETTINGS = [
+    ('none', None, False),
+    ('zlib', 'zlib', False),
+    ('zlib + dictionary', 'zlib', True),
+    ('lzma', 'lzma', False),
+]
+
+
+def disk_size(directory, prefix):
+    return sum(os.path.getsize(os.path.join(directory, f))
+               for f in os.listdir(directory) if f.startswith(prefix + '.'))
+
+
+def run(tubes, codec, dictionary):
+    ids = [tube.get_ID() for tube in tubes]
+    sample = ids[::max(1, len(ids) // 200)]
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config(directory, compression=codec or 'none')
+        database = db.db(config=config)
+        manager = db.db_manager(testing=True, config=config)
+        database.add_tubes(tubes)
+        start = time.perf_counter()
+        manager.update(logging=False)
+        if dictionary:
+            manager.compress(logging=False)
+            manager.compact(logging=False)
+        write = time.perf_counter() - start
+        size = disk_size(directory, 'database')
+
+        tube_store = database.open_shelve()
+        # What is stored, without the space the backend adds around it.
+        values = sum(len(data) for key, data in tube_store.store.iterate(raw=True))
+        start = time.perf_counter()
+        for key, data in tube_store.iterate(raw=True):
+            pass
+        decode = time.perf_counter() - start
+        database.close_shelve(tube_store)
+
+        start = time.perf_counter()
+        database.get_tubes()
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        for ID in sample:
+            database.get_tube(ID)
+        lookup = (time.perf_counter() - start) / len(sample)
+    return size, values, write, decode, scan, lookup
+
+
+def main(n=5000):
+    tubes = make_tubes(n)
+    print(f"{n} tubes")
+    print(f"{'setting':<20}{'on disk':>10}{'values':>10}{'ratio':>8}{'write':>9}{'decode':>9}{'get_tubes':>11}{'get_tube':>11}")
+    plain = None
+    for name, codec, dictionary in SETTINGS:
+        size, values, write, decode, scan, lookup = run(tubes, codec, dictionary)
+        plain = plain or values
+        print(f"{name:<20}{size / 1e6:>8.2f}MB{values / 1e6:>8.2f}MB{plain / values:>7.2f}x{write:>8.2f}s"
+              f"{decode:>8.3f}s{scan:>10.3f}s{lookup * 1e3:>9.3f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
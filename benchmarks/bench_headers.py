@@ -0,0 +1,58 @@
+###############################################################################
+#   File: bench_headers.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times listing every tube's ID, status and manufacture date from
+#       the tube store (loading every tube) and from the header store. Both
+#       stores are built in a temporary directory, the real database isn't
+#       touched.
+#
+#   Usage: python benchmarks/bench_headers.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import shelve
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT.header import TubeHeader
+
+
+def main(n=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        tube_path = os.path.join(directory, 'database.s')
+        header_path = os.path.join(directory, 'headers.s')
+        with shelve.open(tube_path) as tubes, shelve.open(header_path) as headers:
+            for seq, tube in enumerate(make_tubes(n)):
+                tubes[tube.get_ID()] = tube
+                headers[tube.get_ID()] = TubeHeader.from_tube(tube, seq)
+
+        start = time.perf_counter()
+        with shelve.open(tube_path, 'r') as tubes:
+            rows = [(t.get_ID(), t.status(), t.get_mfg_date()) for t in tubes.values()]
+        tube_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with shelve.open(header_path, 'r') as headers:
+            rows = [(h.barcode, h.status(), h.mfg_date) for h in headers.values()]
+        header_time = time.perf_counter() - start
+
+        tube_size = sum(os.path.getsize(os.path.join(directory, f))
+                        for f in os.listdir(directory) if f.startswith('database'))
+        header_size = sum(os.path.getsize(os.path.join(directory, f))
+                          for f in os.listdir(directory) if f.startswith('headers'))
+
+    print(f"{len(rows)} tubes")
+    print(f"from tubes   : {tube_time:6.2f} s  ({tube_size / n:5.0f} bytes per tube on disk)")
+    print(f"from headers : {header_time:6.2f} s  ({header_size / n:5.0f} bytes per tube on disk)")
+    print(f"speedup      : {tube_time / header_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,58 @@
+###############################################################################
+#   File: bench_id_index.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times checking barcodes against the list get_IDs() returns,
+#       against get_IDs('set') and against the IDIndex, and listing a range
+#       of tube numbers by going through every ID against IDIndex.range().
+#       Also times loading the pickled index, as db.id_index() does.
+#
+#   Usage: python benchmarks/bench_id_index.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import pickle
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sMDT.header import barcode_number
+from sMDT.id_index import IDIndex
+
+
+def timed(name, function, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:<36} {elapsed * 1e6:10.1f} us")
+    return result
+
+
+def main(n=20000):
+    rng = random.Random(1)
+    ids = [f"MSU{i:05d}" for i in range(n)]
+    rng.shuffle(ids)
+    lookups = [f"MSU{rng.randrange(2 * n):05d}" for i in range(1000)]
+
+    data = pickle.dumps(IDIndex(ids), 4)
+    index = timed("load the index", lambda: pickle.loads(data), 20)
+    id_set = frozenset(ids)
+
+    print("1000 barcode lookups:")
+    expected = timed("  in list", lambda: [b in ids for b in lookups], 3)
+    assert timed("  in set", lambda: [b in id_set for b in lookups], 20) == expected
+    assert timed("  in IDIndex", lambda: [b in index for b in lookups], 20) == expected
+
+    print("tubes numbered 659 to 685:")
+    expected = timed("  every ID", lambda: sorted(
+        (b for b in ids if 659 <= (barcode_number(b) or -1) < 686), key=barcode_number), 3)
+    assert timed("  IDIndex.range", lambda: index.range(659, 686), 1000) == expected
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,73 @@
+###############################################################################
+#   File: bench_ingest.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times handing measurements over the way the *_to_tube.py
+#       scripts do, starting Python for every one, against sending lines to
+#       one ingest worker (sMDT/ingest.py). Both journal into an outbox and
+#       stage into a temporary directory, the real database isn't touched.
+#
+#   Usage: python benchmarks/bench_ingest.py [number of measurements]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from sMDT import db, ingest
+from sMDT.outbox import Outbox
+
+# What one run of leak_to_tube.py does, staging into the directory argv[1].
+ONE_RUN = """
+import sys
+from sMDT import db, ingest
+from sMDT.outbox import Outbox
+database = db.db(config=sys.argv[1])
+database.config.make_dirs()
+tube = ingest.leak_tube('Jason', '0.00001', sys.argv[2], '05/31/20262:15 PM')
+with Outbox('labview', database, directory=sys.argv[1]) as outbox:
+    outbox.add_tube(tube)
+"""
+
+
+def line(i):
+    return f"leak\tJason\t0.00001\tMSU{i:05d}\t05/31/20262:15 PM\n"
+
+
+def main(n=2000):
+    runs = max(n // 100, 5)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for i in range(runs):
+            subprocess.run([sys.executable, '-c', ONE_RUN, directory, f"MSU{i:05d}"],
+                           check=True, cwd=ROOT)
+        per_run = (time.perf_counter() - start) / runs
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = db.db(config=directory)
+        database.config.make_dirs()
+        lines = [line(i) for i in range(n)]
+        answers = []
+        with Outbox('ingest', database, directory=directory) as outbox:
+            start = time.perf_counter()
+            ingest.serve(lines, outbox, answers.append)
+            per_line = (time.perf_counter() - start) / n
+            outbox.flush()
+        assert answers == [f"ok MSU{i:05d}" for i in range(n)]
+        batches = len(os.listdir(str(database.new_data_dir)))
+
+    print(f"one process per measurement : {per_run * 1e3:8.1f} ms each ({runs} runs)")
+    print(f"ingest worker               : {per_line * 1e6:8.1f} us each "
+          f"({n} lines, {batches} batch files)")
+    print(f"speedup                     : {per_run / per_line:8.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,72 @@
+###############################################################################
+#   File: bench_migrate.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times migrating a shelve of synthetic tubes stored the way they
+#       were before schema versions existed (every station an object, no
+#       version), in this process and with a pool of worker processes. The
+#       shelves are built in a temporary directory, the real database isn't
+#       touched.
+#
+#   Usage: python benchmarks/bench_migrate.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import shelve
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import migrate
+from sMDT.storage import open_store
+
+
+class Unversioned:
+    # Pickles a tube like one stored before schema versions existed.
+    def __init__(self, tube):
+        self.state = dict(tube.__dict__)
+        for name in ('_stamp', '_cache_key', '_cache'):
+            self.state.pop(name, None)
+        for name in tube.station_names:
+            self.state[name] = getattr(tube, name)
+        self.state.update(m_comments=tube.m_comments, legacy_data=tube.legacy_data,
+                          comment_fail=tube.comment_fail)
+        self.type = type(tube)
+
+    def __reduce__(self):
+        return (self.type, (), self.state)
+
+
+def run(n, workers, directory):
+    path = os.path.join(directory, f"database{workers}.s")
+    with shelve.open(path, 'n') as tubes:
+        for tube in make_tubes(n):
+            tubes[tube.get_ID()] = Unversioned(tube)
+    before = sum(os.path.getsize(os.path.join(directory, f))
+                 for f in os.listdir(directory) if f.startswith(f"database{workers}"))
+    with open_store('shelve', path) as tubes, \
+            open_store('shelve', os.path.join(directory, f"headers{workers}.s"), 'n') as headers:
+        start = time.perf_counter()
+        result = migrate.migrate(tubes, headers, workers=workers, logging=False)
+        elapsed = time.perf_counter() - start
+    after = sum(os.path.getsize(os.path.join(directory, f))
+                for f in os.listdir(directory) if f.startswith(f"database{workers}"))
+    name = "in process" if workers == 0 else f"{workers or os.cpu_count()} workers"
+    print(f"{name:<12}: {result.upgraded} tubes in {elapsed:6.2f} s "
+          f"({result.upgraded / elapsed:7.0f} tubes/s), "
+          f"{before / n:5.0f} -> {after / n:5.0f} bytes per tube on disk")
+
+
+def main(n=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        run(n, 0, directory)
+        run(n, None, directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,92 @@
+###############################################################################
+#   File: bench_record_memory.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Measures the memory taken by 100k records of every record type.
+#       Every report loads the whole database, so this is most of what the
+#       reports pay for in memory.
+#
+#   Usage: python benchmarks/bench_record_memory.py [number of records]
+#
+###############################################################################
+
+import os
+import sys
+import datetime
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sMDT.data.record import Record
+from sMDT.data.swage import SwageRecord
+from sMDT.data.tension import TensionRecord
+from sMDT.data.leak import LeakRecord
+from sMDT.data.dark_current import DarkCurrentRecord
+from sMDT.data.bent import BentRecord
+from sMDT.data.umich import UMich_TensionRecord, UMich_DarkCurrentRecord
+from sMDT.data.umich import UMich_BentRecord, UMich_MiscRecord
+
+USERS = ["Paul", "Reinhard", "Dravin", "Sara", "Jason"]
+
+
+def user_for(i):
+    # The pickler splits a fresh string out of every csv line, so each record
+    # gets its own copy of the operator's name unless it gets interned.
+    return ",".join([USERS[i % len(USERS)], ""]).split(",")[0]
+
+
+def date_for(i):
+    return datetime.datetime(2021, 6, 1) + datetime.timedelta(seconds=37 * i)
+
+
+FACTORIES = {
+    "SwageRecord": lambda i: SwageRecord(raw_length=1.5, swage_length=0.5, clean_code="4",
+                                         date=date_for(i), user=user_for(i)),
+    "TensionRecord": lambda i: TensionRecord(tension=350.0, frequency=90.0, date=date_for(i), user=user_for(i)),
+    "LeakRecord": lambda i: LeakRecord(leak_rate=1e-7, date=date_for(i), user=user_for(i)),
+    "DarkCurrentRecord": lambda i: DarkCurrentRecord(dark_current=0.1, date=date_for(i), voltage=3015.0,
+                                                     user=user_for(i)),
+    "BentRecord": lambda i: BentRecord(bentness=0.2, date=date_for(i), user=user_for(i)),
+    "UMich_TensionRecord": lambda i: UMich_TensionRecord(umich_tension=350.0, umich_frequency=90.0,
+                                                         umich_date=date_for(i), tension_flag="Pass",
+                                                         freq_diff=0.1, tens_diff=0.2, time_diff=14.0,
+                                                         flag_scd_tension="Pass2"),
+    "UMich_DarkCurrentRecord": lambda i: UMich_DarkCurrentRecord(umich_dark_current=0.1, umich_date=date_for(i),
+                                                                 dc_flag="OK", hv_time=60.0),
+    "UMich_BentRecord": lambda i: UMich_BentRecord(umich_bent=0.2),
+    "UMich_MiscRecord": lambda i: UMich_MiscRecord(prod_site="MSU", endplug_type="Munich", first_scan="x",
+                                                   flag_endplug="ok", length=1624.0, done="yes"),
+}
+
+
+def measure(factory, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return after - before
+
+
+def main(n=100000):
+    compact = getattr(Record, "compact_dates", None)
+    modes = [False, True] if compact is not None else [None]
+    for mode in modes:
+        if mode is not None:
+            Record.compact_dates = mode
+            print(f"compact_dates = {mode}")
+        print(f"{'record type':<26}{'MB per ' + str(n):>16}{'bytes/record':>16}")
+        total = 0
+        for name, factory in FACTORIES.items():
+            used = measure(factory, n)
+            total += used
+            print(f"{name:<26}{used / 1e6:>16.2f}{used / n:>16.0f}")
+        print(f"{'total':<26}{total / 1e6:>16.2f}\n")
+    if compact is not None:
+        Record.compact_dates = compact
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,75 @@
+###############################################################################
+#   File: bench_result_cache.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times the repeated dashboard queries (failed tubes of a week,
+#       daily tension for 60 days) without a result cache, with one, and
+#       from a second cache reading the first one's directory, as another
+#       process would. The database is built in a temporary directory, the
+#       real one isn't touched.
+#
+#   Usage: python benchmarks/bench_result_cache.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import shelve
+import tempfile
+import datetime
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes, START
+from sMDT import db
+from sMDT.header import TubeHeader
+from sMDT.data.status import Status
+from sMDT.result_cache import ResultCache
+
+
+def dashboard(database, end):
+    week = (end - datetime.timedelta(days=7), end)
+    failed = [t.get_ID() for t in database.query(status=Status.FAIL, mfg_date=week)]
+    daily = database.aggregate('tension', by='day',
+                               mfg_date=(end - datetime.timedelta(days=60), end))
+    return failed, daily.rows()
+
+
+def timed(name, database, end, runs=5):
+    start = time.perf_counter()
+    for i in range(runs):
+        result = dashboard(database, end)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"{name:<22} {elapsed * 1000:8.1f} ms per run")
+    return result
+
+
+def main(n=20000):
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        with shelve.open(str(directory / 'database.s')) as tubes, \
+                shelve.open(str(directory / 'headers.s')) as headers:
+            for seq, tube in enumerate(make_tubes(n)):
+                tubes[tube.get_ID()] = tube
+                headers[tube.get_ID()] = TubeHeader.from_tube(tube, seq)
+            generation = db.mark_generation(headers, n)
+        (directory / 'database.generation').write_text("{} {}".format(*generation))
+        end = START + datetime.timedelta(minutes=7 * n)
+
+        def database(cache=None):
+            return db.db(cache, config=directory)
+
+        expected = timed("no cache", database(), end)
+        cache = ResultCache(path=str(directory / 'cache'))
+        assert timed("cache", database(cache), end) == expected
+        print("  ", cache)
+        second = ResultCache(path=str(directory / 'cache'))
+        assert timed("second process", database(second), end) == expected
+        print("  ", second)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
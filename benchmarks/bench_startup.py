@@ -0,0 +1,87 @@
+###############################################################################
+#   File: bench_startup.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times how long each entry point takes to import, in a new
+#       Python process every time, with python -X importtime. Prints the
+#       import time of the module, the time until the process ends, and the
+#       slowest modules it imports. Entry points whose dependencies (PySide,
+#       nidaqmx...) aren't installed are listed with the error.
+#
+#   Usage: python benchmarks/bench_startup.py [runs per entry point]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, module, directory added to the path)
+ENTRY_POINTS = [
+    ('sMDT.db', 'sMDT.db', None),
+    ('sMDT.outbox', 'sMDT.outbox', None),
+    ('sMDT.ingest', 'sMDT.ingest', None),
+    ('DatabaseViewer', 'DatabaseViewer', None),
+    ('ExportTubes', 'ExportTubesGUI.ExportTubes', None),
+    ('SwageStationGUI', 'SwagerStation.SwageStationGUI', None),
+    ('autotension_gui', 'autotension_gui', 'AutoTension'),
+]
+
+
+def parse(stderr):
+    # -X importtime lines are "import time: self | cumulative | name", the
+    # name indented two spaces per level. Returns [(level, cumulative, name)].
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((level, int(cumulative), name.strip()))
+    return imports
+
+
+def measure(module, directory):
+    path = [ROOT] + ([os.path.join(ROOT, directory)] if directory else [])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    elapsed = time.perf_counter() - start
+    if process.returncode:
+        return None, process.stderr.strip().splitlines()[-1]
+    imports = parse(process.stderr)
+    total = next(c for level, c, name in reversed(imports) if name == module)
+    return (total, elapsed, imports), None
+
+
+def main(runs=5):
+    print(f"{'entry point':<18} {'import':>9} {'process':>9}  slowest imports")
+    for name, module, directory in ENTRY_POINTS:
+        measure(module, directory)  # compiles what needs compiling
+        results = []
+        for i in range(runs):
+            result, error = measure(module, directory)
+            if error:
+                break
+            results.append(result)
+        if error:
+            print(f"{name:<18} can't import: {error}")
+            continue
+        total, elapsed, imports = min(results, key=lambda r: r[0])
+        slowest = sorted(
+            (c, n) for level, c, n in imports
+            if n != module and not n.startswith(module + '.') and level <= 2
+        )[-3:]
+        print(f"{name:<18} {total / 1000:7.1f} ms {elapsed * 1000:7.1f} ms  "
+              + ", ".join(f"{n} {c / 1000:.1f}" for c, n in reversed(slowest)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
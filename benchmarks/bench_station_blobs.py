@@ -0,0 +1,65 @@
+###############################################################################
+#   File: bench_station_blobs.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times loading stored tubes for three kinds of readers: one that
+#       needs the whole tube (status), a viewer row that needs the last leak
+#       and dark current values, and the swage station's raw length autofill,
+#       which loads only the swage station.
+#
+#   Usage: python benchmarks/bench_station_blobs.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import pickle
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+
+
+def load_all(stored):
+    for data in stored:
+        pickle.loads(data).status()
+
+
+def viewer_row(stored):
+    for data in stored:
+        tube = pickle.loads(data)
+        try:
+            tube.leak.get_record().leak_rate
+        except IndexError:
+            pass
+        try:
+            tube.dark_current.get_record().dark_current
+        except IndexError:
+            pass
+
+
+def swage_autofill(stored):
+    for data in stored:
+        tube = pickle.loads(data)
+        if hasattr(tube, 'project'):
+            tube.project(['swage'])
+        try:
+            tube.swage.get_record('last').raw_length
+        except IndexError:
+            pass
+
+
+def main(n=20000):
+    stored = [pickle.dumps(tube) for tube in make_tubes(n)]
+    print(f"{n} tubes, {sum(map(len, stored)) / n:.0f} bytes stored per tube")
+    for reader in (load_all, viewer_row, swage_autofill):
+        start = time.perf_counter()
+        reader(stored)
+        elapsed = time.perf_counter() - start
+        print(f"{reader.__name__:<16} {elapsed * 1e6 / n:7.1f} us per tube")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,74 @@
+###############################################################################
+#   File: bench_status_cache.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Runs the status calls of one full DatabaseViewer refresh
+#       (db_to_display_array) and of the production history reports on
+#       freshly loaded tubes, and reports how many status computations the
+#       status cache saved.
+#
+#   Usage: python benchmarks/bench_status_cache.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import pickle
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT.data.station import status_cache
+from sMDT.data.status import Status
+
+
+def viewer_refresh(tubes):
+    # The status calls DatabaseViewer.db_to_display_array makes per row.
+    for tube in tubes:
+        status = tube.status_umich()
+        if status is None:
+            status = tube.status()
+        else:
+            status = tube.status_umich()
+
+
+def history_report(tubes):
+    # The status calls DailyProductionHistory makes per tube and day.
+    for tube in tubes:
+        if tube.status() == Status.FAIL:
+            if tube.status_bentness() == Status.FAIL:
+                continue
+            tube.swage.status()
+            tube.tension.status()
+            tube.dark_current.status()
+
+
+def run(stored, enabled):
+    # Every refresh loads the tubes from the database again.
+    tubes = pickle.loads(stored)
+    status_cache.enabled = enabled
+    status_cache.reset()
+    start = time.perf_counter()
+    viewer_refresh(tubes)
+    history_report(tubes)
+    elapsed = time.perf_counter() - start
+    status_cache.enabled = True
+    return elapsed
+
+
+def main(n=20000):
+    stored = pickle.dumps(make_tubes(n))
+    uncached = run(stored, False)
+    print(f"{n} tubes, cache disabled: {uncached:.3f} s")
+    print(status_cache)
+    cached = run(stored, True)
+    print(f"{n} tubes, cache enabled: {cached:.3f} s")
+    print(status_cache)
+    saved = status_cache.station_hits + status_cache.tube_hits
+    print(f"recomputations avoided: {saved}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
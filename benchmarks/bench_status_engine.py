@@ -0,0 +1,55 @@
+###############################################################################
+#   File: bench_status_engine.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Compares the vectorized status engine with calling status(),
+#       status_bentness() and status_umich() on every tube, on synthetic
+#       productions of 10k, 100k and 1M tubes. Tubes are built and evaluated
+#       in chunks so a million of them don't have to fit in memory at once.
+#       Every chunk is cross checked against the tubes' own statuses.
+#
+#   Usage: python benchmarks/bench_status_engine.py [number of tubes ...]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tube
+from sMDT import status_engine
+
+CHUNK = 100000
+
+
+def run(n):
+    rng = random.Random(1)
+    engine_time = object_time = 0.0
+    for start in range(0, n, CHUNK):
+        tubes = [make_tube(i, rng) for i in range(start, min(n, start + CHUNK))]
+
+        begin = time.perf_counter()
+        table = status_engine.evaluate(tubes)
+        engine_time += time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        for tube in tubes:
+            tube.status()
+            tube.status_bentness()
+            tube.status_umich()
+        object_time += time.perf_counter() - begin
+
+        status_engine.check(tubes, table)
+    print(f"{n:>9} tubes: Tube.status() {object_time:8.2f} s, "
+          f"status_engine {engine_time:8.2f} s, "
+          f"{object_time / engine_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,70 @@
+###############################################################################
+#   File: bench_storage.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Times the same work on every storage backend (see storage.py):
+#       writing every tube in one batch, reading them one at a time and
+#       with one get_many(), listing the keys, iterating over everything,
+#       deleting a tenth of the tubes and taking a snapshot. The stores are
+#       in a temporary directory, the real database isn't touched.
+#
+#   Usage: python benchmarks/bench_storage.py [number of tubes] [backend ...]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT.storage import BACKENDS, MemoryBackend, open_store, store_path
+
+
+def timed(results, name, work):
+    start = time.perf_counter()
+    work()
+    results[name] = time.perf_counter() - start
+
+
+def run(backend, tubes, directory):
+    ids = [tube.get_ID() for tube in tubes]
+    shuffled = random.Random(0).sample(ids, len(ids))
+    path = str(store_path(backend, directory, 'database'))
+    results = {}
+    with open_store(backend, path, 'n') as store:
+        timed(results, "put_batch", lambda: store.put_batch((tube.get_ID(), tube) for tube in tubes))
+    # Reads from a store opened again, as the db class does.
+    with open_store(backend, path, 'r') as store:
+        timed(results, "get", lambda: [store[ID] for ID in shuffled])
+        timed(results, "get_many", lambda: list(store.get_many(shuffled)))
+        timed(results, "keys", lambda: sorted(store.keys()))
+        timed(results, "iterate", lambda: list(store.iterate()))
+    with open_store(backend, path) as store:
+        timed(results, "delete", lambda: [store.delete(ID) for ID in shuffled[:len(ids) // 10]])
+        timed(results, "snapshot", lambda: store.snapshot(store_path(backend, directory, 'snapshot')))
+        assert store.size() == len(ids) - len(ids) // 10
+    MemoryBackend.drop()
+    return results
+
+
+def main(n=5000, backends=None):
+    tubes = make_tubes(n)
+    backends = backends or list(BACKENDS)
+    table = {}
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as directory:
+            table[backend] = run(backend, tubes, directory)
+    names = list(table[backends[0]])
+    print(f"{n} tubes, seconds")
+    print(f"{'':<10}" + "".join(f"{backend:>10}" for backend in backends))
+    for name in names:
+        print(f"{name:<10}" + "".join(f"{table[backend][name]:10.3f}" for backend in backends))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, sys.argv[2:])
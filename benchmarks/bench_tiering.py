@@ -0,0 +1,76 @@
+###############################################################################
+#   File: bench_tiering.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: Times what station programs and the viewer do (loading every
+#       tube, looking tubes up) before and after db_manager.tier() moves the
+#       shipped tubes to the cold tier, and compares the size on disk of the
+#       database and of the cold store. A given fraction of the tubes is
+#       shipped. The database is in a temporary directory, the real database
+#       isn't touched.
+#
+#   Usage: python benchmarks/bench_tiering.py [number of tubes] [shipped fraction]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import db
+
+
+def disk_size(directory, prefix):
+    return sum(os.path.getsize(os.path.join(directory, f))
+               for f in os.listdir(directory) if f.startswith(prefix + '.'))
+
+
+def timed(database, ids):
+    start = time.perf_counter()
+    database.get_tubes()
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for ID in ids:
+        database.get_tube(ID)
+    lookup = (time.perf_counter() - start) / len(ids)
+    return scan, lookup
+
+
+def main(n=5000, fraction=0.7):
+    tubes = make_tubes(n)
+    ids = [tube.get_ID() for tube in tubes]
+    shipped = set(ids[:int(n * fraction)])
+    # The tubes still on the floor, and a few shipped ones.
+    sample = ids[int(n * fraction):][:200] + ids[:20]
+    with tempfile.TemporaryDirectory() as directory:
+        database = db.db(config=directory)
+        manager = db.db_manager(testing=True, config=directory)
+        database.add_tubes(tubes)
+        manager.update(logging=False)
+        hot_before = disk_size(directory, 'database')
+        scan_before, lookup_before = timed(database, sample)
+
+        start = time.perf_counter()
+        moved = manager.tier(shipped, logging=False)
+        tier_time = time.perf_counter() - start
+        manager.compact(logging=False)
+        hot_after = disk_size(directory, 'database')
+        cold = disk_size(directory, 'cold')
+        scan_after, lookup_after = timed(database, sample)
+        assert database.size(include_cold=True) == n
+
+    print(f"{n} tubes, {moved} moved to the cold tier in {tier_time:.2f} s")
+    print(f"database on disk   {hot_before / 1e6:8.2f} MB -> {hot_after / 1e6:8.2f} MB, "
+          f"cold store {cold / 1e6:.2f} MB")
+    print(f"get_tubes()        {scan_before:8.3f} s  -> {scan_after:8.3f} s")
+    print(f"get_tube()         {lookup_before * 1e3:8.3f} ms -> {lookup_after * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.7)
@@ -0,0 +1,73 @@
+###############################################################################
+#   File: bench_tube_merge.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Microbenchmark of the two ways of combining tubes, the '+'
+#       operator (Tube.__add__) and the in place Tube.merge_from. The database
+#       manager merges every staged tube into the stored one, so this is the
+#       per-record cost of an update.
+#
+#   Usage: python benchmarks/bench_tube_merge.py [records per station]
+#
+###############################################################################
+
+import os
+import sys
+import timeit
+import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sMDT.tube import Tube
+from sMDT.data.swage import SwageRecord
+from sMDT.data.tension import TensionRecord
+from sMDT.data.leak import LeakRecord
+from sMDT.data.dark_current import DarkCurrentRecord
+from sMDT.data.bent import BentRecord
+
+
+def make_tube(n_records):
+    tube = Tube()
+    tube.set_ID("MSU01234")
+    date = datetime.datetime(2021, 6, 1)
+    for i in range(n_records):
+        date += datetime.timedelta(hours=1)
+        tube.swage.add_record(SwageRecord(raw_length=1.0, swage_length=0.5, date=date, user='Paul'))
+        tube.tension.add_record(TensionRecord(tension=350, frequency=90, date=date, user='Paul'))
+        tube.leak.add_record(LeakRecord(leak_rate=1e-7, date=date, user='Paul'))
+        tube.dark_current.add_record(DarkCurrentRecord(dark_current=0.1, date=date, voltage=3015, user='Paul'))
+        tube.bent.add_record(BentRecord(bentness=0.2, date=date, user='Paul'))
+    return tube
+
+
+def main(n_records=1000, repeat=5, number=200):
+    stored = make_tube(n_records)
+    staged = make_tube(1)
+
+    # Staged tubes only ever hold a record or two, so we time merging a small
+    # tube into a large one, which is what the manager does.
+    def add():
+        return stored + staged
+
+    add_time = min(timeit.repeat(add, repeat=repeat, number=number)) / number
+
+    # merge_from mutates the receiver, so each timed merge gets its own
+    # receiver, built outside of the timed region.
+    merge_times = []
+    for _ in range(repeat):
+        receivers = [make_tube(n_records) for _ in range(number)]
+        start = timeit.default_timer()
+        for receiver in receivers:
+            receiver.merge_from(staged)
+        merge_times.append((timeit.default_timer() - start) / number)
+    merge_time = min(merge_times)
+
+    print(f"records per station: {n_records}")
+    print(f"Tube.__add__     : {add_time * 1e6:10.2f} us per merge")
+    print(f"Tube.merge_from  : {merge_time * 1e6:10.2f} us per merge")
+    print(f"speedup          : {add_time / merge_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,59 @@
+###############################################################################
+#   File: bench_tube_size.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Measures the memory and pickle size of tubes: synthetic
+#       production tubes after loading them back from their pickles, the
+#       one record tubes the stations stage, and the delete markers
+#       db.delete_tube writes.
+#
+#   Usage: python benchmarks/bench_tube_size.py [number of tubes]
+#
+###############################################################################
+
+import os
+import sys
+import pickle
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT.tube import Tube
+from sMDT.data.leak import LeakRecord
+
+
+def measure(name, pickles):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tubes = [pickle.loads(data) for data in pickles]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    n = len(tubes)
+    size = sum(len(data) for data in pickles)
+    print(f"{name:<16} {used / n:9.0f} bytes in memory, "
+          f"{size / n:7.0f} bytes pickled per tube")
+
+
+def staged_tube(i):
+    tube = Tube()
+    tube.set_ID(f"MSU{i:05d}")
+    tube.leak.add_record(LeakRecord(leak_rate=1e-7, user='Paul'))
+    return tube
+
+
+def delete_marker(i):
+    tube = Tube()
+    tube.set_ID(f"MSU{i:05d}")
+    return tube
+
+
+def main(n=20000):
+    measure("production", [pickle.dumps(t) for t in make_tubes(n)])
+    measure("staged record", [pickle.dumps(staged_tube(i)) for i in range(n)])
+    measure("delete marker", [pickle.dumps(delete_marker(i)) for i in range(n)])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
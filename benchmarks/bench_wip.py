@@ -0,0 +1,73 @@
+###############################################################################
+#   File: bench_wip.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: Times what a station does when a tube is scanned, looking up its
+#       last raw length and status, with db.get_wip() against loading the
+#       tube with db.get_tube(). The synthetic tubes were swaged years ago, so
+#       the cache is built as of the last of them. The database is in a
+#       temporary directory, the real database isn't touched.
+#
+#   Usage: python benchmarks/bench_wip.py [number of tubes] [lookups]
+#
+###############################################################################
+
+import os
+import sys
+import time
+import pickle
+import datetime
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_tubes
+from sMDT import db
+from sMDT.storage import open_store
+from sMDT.wip import WIPCache
+
+
+def main(n=5000, lookups=500):
+    tubes = make_tubes(n)
+    with tempfile.TemporaryDirectory() as directory:
+        database = db.db(config=directory)
+        manager = db.db_manager(testing=True, config=directory)
+        database.add_tubes(tubes)
+        manager.update(logging=False)
+
+        # As if the last tube had just been swaged.
+        now = max(t.get_mfg_date() for t in tubes if t.get_mfg_date()) + datetime.timedelta(days=1)
+        start = time.perf_counter()
+        with open_store(manager.backend, manager.path, 'r') as stored, \
+                open_store(manager.backend, manager.header_path, 'r') as headers:
+            cache = WIPCache.build(stored, headers, db.RESERVED_KEYS, now=now)
+        build = time.perf_counter() - start
+        # Written as the db_manager does, without expiring it as of today.
+        cache.generation = database.generation()
+        with open(manager.wip_path, 'wb') as f:
+            pickle.dump(cache, f, 4)
+        ids = [entry.barcode for entry in cache if entry.raw_length is not None][:lookups]
+
+        start = time.perf_counter()
+        for ID in ids:
+            tube = database.get_tube(ID)
+            tube.swage.get_record('last').raw_length, tube.status()
+        full = (time.perf_counter() - start) / len(ids)
+
+        database.wip()
+        start = time.perf_counter()
+        for ID in ids:
+            entry = database.get_wip(ID)
+            entry.raw_length, entry.status()
+        cached = (time.perf_counter() - start) / len(ids)
+        size = os.path.getsize(manager.wip_path)
+
+    print(f"{n} tubes, {len(cache)} in production, cache built in {build:.2f} s, {size / 1e3:.1f} kB")
+    print(f"get_tube()   {full * 1e3:8.3f} ms per lookup")
+    print(f"get_wip()    {cached * 1e3:8.3f} ms per lookup ({full / cached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 500)
@@ -0,0 +1,78 @@
+###############################################################################
+#   File: synthetic.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Builds synthetic tubes for the benchmarks. The values are drawn
+#       so that every status (pass, fail, incomplete, UMich complete) shows
+#       up in realistic proportions. Seeded, so runs are repeatable.
+#
+###############################################################################
+
+import os
+import sys
+import random
+import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sMDT.tube import Tube
+from sMDT.data.swage import SwageRecord
+from sMDT.data.tension import TensionRecord
+from sMDT.data.leak import LeakRecord
+from sMDT.data.dark_current import DarkCurrentRecord
+from sMDT.data.bent import BentRecord
+from sMDT.data.umich import UMich_MiscRecord, UMich_TensionRecord
+from sMDT.data.status import ErrorCodes
+
+USERS = ["Paul", "Reinhard", "Dravin", "Sara", "Jason"]
+START = datetime.datetime(2021, 5, 1)
+
+
+def make_tube(i, rng):
+    tube = Tube()
+    tube.set_ID(f"MSU{i:05d}")
+    user = rng.choice(USERS)
+    date = START + datetime.timedelta(minutes=7 * i)
+
+    if rng.random() < 0.95:
+        tube.swage.add_record(SwageRecord(
+            raw_length=rng.gauss(0, 5), swage_length=rng.gauss(0, 0.1),
+            clean_code="4", date=date, user=user
+        ))
+    if rng.random() < 0.9:
+        tube.bent.add_record(BentRecord(
+            bentness=rng.choice([0.1, 0.2, 0.4, 0.8, 0.95]), date=date, user=user
+        ))
+    for n in range(rng.choice([0, 1, 1, 2, 3])):
+        tube.tension.add_record(TensionRecord(
+            tension=rng.gauss(350, 8), frequency=rng.gauss(90, 1),
+            date=date + datetime.timedelta(days=14 * n, hours=1), user=user
+        ))
+    for n in range(rng.choice([0, 1, 1, 2])):
+        tube.leak.add_record(LeakRecord(
+            leak_rate=rng.choice([1e-7, 2e-6, 5e-5, None]),
+            date=date + datetime.timedelta(days=1 + n), user=user
+        ))
+    for n in range(rng.choice([0, 1, 1, 1, 2])):
+        tube.dark_current.add_record(DarkCurrentRecord(
+            dark_current=abs(rng.gauss(0.3, 1)),
+            date=date + datetime.timedelta(days=2 + n), user=user,
+            voltage=rng.choice([3015.0, 3015.0, 3015.0, 0.0, None])
+        ))
+    if rng.random() < 0.05:
+        tube.new_comment(("comment", user, date, rng.choice(list(ErrorCodes))))
+    if rng.random() < 0.3:
+        tube.umich_misc.add_record(UMich_MiscRecord(
+            prod_site="MSU", endplug_type=rng.choice(["Munich", "Protvino"]),
+            length=1624.0, done=rng.choice(["yes", "no"])
+        ))
+        tube.umich_tension.add_record(UMich_TensionRecord(
+            umich_tension=rng.gauss(350, 8), flag_scd_tension="Pass2"
+        ))
+    return tube
+
+
+def make_tubes(n, seed=1):
+    rng = random.Random(seed)
+    return [make_tube(i, rng) for i in range(n)]
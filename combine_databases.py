@@ -10,7 +10,5 @@ sys.path.append(DROPBOX_DIR)
 
 database = db.db()
 with shelve.open("database_new.s") as tubes:
-    for tube in tubes:
-        #print(tube)
-        #print(tubes[tube])
-        database.add_tube(tubes[tube])
\ No newline at end of file
+    # One batch, which the manager adds in a single update
+    database.add_tubes(tubes[tube] for tube in tubes)
@@ -5,6 +5,9 @@
 #
 #   Purpose: Uses matplotlib to create several plots related to tension.
 #
+#   Modifications:
+#   2026-10 Daily statistics computed with sMDT.aggregate.group_stats
+#
 ###############################################################################
 from typing import List, Any
 
@@ -18,6 +21,7 @@ dropbox_dir = r'C:\Users\Third\Dropbox\sMDT'
 sys.path.append(dropbox_dir)
 
 from sMDT.db import db
+from sMDT.aggregate import group_stats
 
 
 def get_tension1(tube, min_date):
@@ -113,7 +117,7 @@ def get_dark_current(tube, min_date):
 class Plotter:
     def __init__(self, num_days, remove_outliers=False, outlier_stdev=2):
         database = db()
-        self.tubes = database.get_tubes()
+        self.tubes = database.get_tubes(include_cold=True)
         self.plots = []
         self.num_days = num_days
         self.min_date = date.today() - timedelta(days=num_days)
@@ -137,23 +141,25 @@ class Plotter:
             axs = np.array([axs])
         for i,ax in enumerate(axs.flat):
                 (title, x_label, y_label), data_tups, plot_type = self.plots[i]
-                data_by_date = [[] for i in range(self.num_days)]
-                [data_by_date[(date.date() - self.min_date).days - 1].append(data) for data, date in data_tups if date.date() > self.min_date]
-                data_avg_by_date = [sum(date_list) / len(date_list) if date_list else np.nan for date_list in data_by_date]
-                data_stdev_by_date = [np.std(date_list) if date_list else np.nan for date_list in data_by_date]
-                data_median_by_date = [np.median(date_list) if date_list else np.nan for date_list in data_by_date]
-
-                if self.remove_outliers and plot_type != "median_only":
-                    all_data = []
-                    [all_data.extend([data for data in date_list if not np.isnan(data)]) for date_list in data_by_date]
-                    total_med = np.median(all_data)
-                    med_stdev = np.median([stdev for stdev in data_stdev_by_date if not np.isnan(stdev)])
-                    data_by_date = [[data for data in date_list if np.abs(data - total_med) < med_stdev * self.outlier_stdev] for date_list in data_by_date]
+                # bucket by day once, with every statistic computed by NumPy
+                data_tups = [(data, date) for data, date in data_tups if date.date() > self.min_date]
+                values = np.array([data for data, date in data_tups], dtype=float)
+                days = [date.date() for data, date in data_tups]
+                by_day = group_stats(days, values, ('mean', 'std', 'median'))
+                data_avg_by_date = by_day.reindex('mean', self.dates)
+                data_stdev_by_date = by_day.reindex('std', self.dates)
+                data_median_by_date = by_day.reindex('median', self.dates)
+
+                if self.remove_outliers and plot_type != "median_only" and len(values):
+                    total_med = np.nanmedian(values)
+                    med_stdev = np.nanmedian(data_stdev_by_date)
+                    keep = np.abs(values - total_med) < med_stdev * self.outlier_stdev
 
                     #recalculate values to plot with outliers removed
-                    data_avg_by_date = [sum(date_list) / len(date_list) if date_list else np.nan for date_list in data_by_date]
-                    data_stdev_by_date = [np.std(date_list) if date_list else np.nan for date_list in data_by_date]
-                    data_median_by_date = [np.median(date_list) if date_list else np.nan for date_list in data_by_date]
+                    by_day = group_stats([day for day, kept in zip(days, keep) if kept], values[keep], ('mean', 'std', 'median'))
+                    data_avg_by_date = by_day.reindex('mean', self.dates)
+                    data_stdev_by_date = by_day.reindex('std', self.dates)
+                    data_median_by_date = by_day.reindex('median', self.dates)
 
 
                 if plot_type != "median_only":
@@ -0,0 +1,288 @@
+###############################################################################
+#   File: aggregate.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Group by statistics of record values, see db.aggregate(). The
+#       values and their group keys are pulled out of the tubes once, and
+#       every statistic of every group is then computed at once with NumPy,
+#       instead of filling a Python list per group.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import numbers
+import datetime
+
+import numpy as np
+
+from .tube import Tube
+
+BY = ('day', 'week', 'month', 'operator', 'endplug')
+
+RECORD_MODES = ('all', 'first', 'last')
+
+
+# Record group keys are computed as ints for speed: the ordinal of the day,
+# of the week's Monday, or year * 12 + month - 1. These turn them back into
+# dates.
+def _from_day(key):
+    return datetime.date.fromordinal(key)
+
+
+def _from_month(key):
+    return datetime.date(key // 12, key % 12 + 1, 1)
+
+
+def _day_key(date):
+    return date.toordinal()
+
+
+def _week_key(date):
+    # date.weekday() is (ordinal + 6) % 7, Monday being 0.
+    ordinal = date.toordinal()
+    return ordinal - (ordinal + 6) % 7
+
+
+def _month_key(date):
+    return date.year * 12 + date.month - 1
+
+
+# by -> (key of a record's date, key -> group).
+_date_keys = {
+    'day': (_day_key, _from_day),
+    'week': (_week_key, _from_day),
+    'month': (_month_key, _from_month),
+}
+
+
+def _endplug(tube):
+    # Endplug type from the tube's last UMich misc record.
+    records = tube.peek('umich_misc').m_records
+    if not records:
+        return None
+    return getattr(records[-1], 'endplug_type', None) or None
+
+
+def parse_field(field):
+    """
+    Splits 'station.field' into its two parts. A station name alone means
+    that station's primary_field, so 'tension' is 'tension.tension'.
+    """
+    station, _, name = field.partition('.')
+    if station not in Tube.station_names:
+        raise ValueError(f"unknown station {station!r}")
+    if not name:
+        name = Tube._station_factories[station].primary_field
+        if name is None:
+            raise ValueError(f"the {station} station has no primary field, use '{station}.<field>'")
+    return station, name
+
+
+def _number(value):
+    # The value as a float, or None if it isn't a real number (or is NaN).
+    if type(value) is float or type(value) is int \
+            or isinstance(value, numbers.Real) and not isinstance(value, bool):
+        value = float(value)
+        if value == value:
+            return value
+    return None
+
+
+def extract(tubes, field, by='day', record='all'):
+    """
+    Pulls the values of field out of tubes, with the group each belongs to.
+    Returns (groups, codes, values, dropped): the list of groups, an int
+    array with the index in groups of every value, the float array of
+    values, and how many records were left out because they had no group
+    (no date, no user...) or no numeric value. record is 'all', or 'first'
+    or 'last' for one record per tube.
+    """
+    if by not in BY:
+        raise ValueError(f"by must be one of {', '.join(BY)}")
+    if record not in RECORD_MODES:
+        raise ValueError(f"record must be one of {', '.join(RECORD_MODES)}")
+    station, name = parse_field(field)
+    date_key, from_key = _date_keys.get(by, (None, None))
+    index = {}
+    codes = []
+    values = []
+    dropped = 0
+    for tube in tubes:
+        records = tube.peek(station).m_records
+        if not records:
+            continue
+        if record != 'all':
+            records = records[:1] if record == 'first' else records[-1:]
+        if by == 'endplug':
+            tube_key = _endplug(tube)
+        for rec in records:
+            value = getattr(rec, name, None)
+            if type(value) is not float:
+                value = _number(value)
+            elif value != value:
+                value = None
+            if date_key is not None:
+                date = getattr(rec, 'date', None)
+                key = date_key(date) if isinstance(date, datetime.date) else None
+            elif by == 'operator':
+                key = getattr(rec, 'user', None) or None
+            else:
+                key = tube_key
+            if key is None or value is None:
+                dropped += 1
+                continue
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(index)
+            codes.append(code)
+            values.append(value)
+    groups = list(index)
+    if from_key is not None:
+        groups = [from_key(key) for key in groups]
+    return groups, np.array(codes, dtype=np.int64), np.array(values, dtype=float), dropped
+
+
+def _quantile(stat):
+    # 'median' and 'p95' style names -> the quantile, None for anything else.
+    if stat == 'median':
+        return 0.5
+    if stat.startswith('p') and stat[1:].replace('.', '', 1).isdigit():
+        q = float(stat[1:]) / 100
+        if q <= 1:
+            return q
+    return None
+
+
+STATS = ('count', 'sum', 'mean', 'std', 'min', 'max', 'median', 'p<N>')
+
+
+def group_stats(keys, values, stats=('count', 'mean', 'std', 'median')):
+    """
+    Computes stats of values grouped by keys (any hashable, sortable values,
+    one per value). Returns an Aggregate. Stats are the names in STATS;
+    'p<N>' is the Nth percentile, like 'p95', interpolated like
+    numpy.percentile.
+    """
+    if len(keys) != len(values):
+        raise ValueError("keys and values must be the same length")
+    index = {}
+    codes = [index.setdefault(key, len(index)) for key in keys]
+    return reduce(list(index), np.array(codes, dtype=np.int64), values, stats)
+
+
+def reduce(groups, codes, values, stats=('count', 'mean', 'std', 'median')):
+    """
+    group_stats() of values already split into groups: codes holds the
+    index in groups of every value, as extract() returns them. The
+    Aggregate has its groups sorted.
+    """
+    for stat in stats:
+        if stat not in STATS[:-1] and _quantile(stat) is None:
+            raise ValueError(f"unknown statistic {stat!r}, known are {', '.join(STATS)}")
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return Aggregate([], {stat: np.array([], dtype=float) for stat in stats})
+
+    # Renumber the groups in sorted order.
+    n_groups = len(groups)
+    order = sorted(range(n_groups), key=groups.__getitem__)
+    rank = np.empty(n_groups, dtype=np.int64)
+    rank[order] = np.arange(n_groups)
+    inverse = rank[codes]
+    groups = [groups[i] for i in order]
+
+    count = np.bincount(inverse, minlength=n_groups)
+    total = np.bincount(inverse, weights=values, minlength=n_groups)
+    mean = total / count
+    result = {}
+    ordered = None
+    for stat in stats:
+        if stat == 'count':
+            result[stat] = count
+        elif stat == 'sum':
+            result[stat] = total
+        elif stat == 'mean':
+            result[stat] = mean
+        elif stat == 'std':
+            # Population standard deviation, like numpy.std. Two passes,
+            # since sum of squares minus square of sums loses precision.
+            deviation = values - mean[inverse]
+            result[stat] = np.sqrt(
+                np.bincount(inverse, weights=deviation * deviation, minlength=n_groups) / count
+            )
+        else:
+            if ordered is None:
+                # Sorted by group, then by value, so every group's values
+                # are one sorted run starting at starts.
+                ordered = values[np.lexsort((values, inverse))]
+                starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+            if stat == 'min':
+                result[stat] = ordered[starts]
+            elif stat == 'max':
+                result[stat] = ordered[starts + count - 1]
+            else:
+                position = starts + _quantile(stat) * (count - 1)
+                low = np.floor(position).astype(np.int64)
+                high = np.ceil(position).astype(np.int64)
+                fraction = position - low
+                result[stat] = ordered[low] + (ordered[high] - ordered[low]) * fraction
+    return Aggregate(groups, result)
+
+
+class Aggregate:
+    """
+    Results of db.aggregate() or group_stats(). groups is the sorted list of
+    group keys, and every statistic is an array in the same order, read
+    with aggregate['mean']. dropped is how many records were left out.
+    """
+    def __init__(self, groups, stats, dropped=0):
+        self.groups = groups
+        self.stats = stats
+        self.dropped = dropped
+
+    def __getitem__(self, stat):
+        return self.stats[stat]
+
+    def __len__(self):
+        return len(self.groups)
+
+    def rows(self):
+        """A list with a dict per group: {'group': key, 'count': ..., ...}."""
+        names = list(self.stats)
+        columns = [self.stats[name].tolist() for name in names]
+        return [
+            dict(group=group, **{name: column[i] for name, column in zip(names, columns)})
+            for i, group in enumerate(self.groups)
+        ]
+
+    def reindex(self, stat, groups):
+        """
+        The stat for each of groups, in that order, with NaN for groups that
+        had no values. For example every day of a plot, including days
+        nothing was made.
+        """
+        index = {group: i for i, group in enumerate(self.groups)}
+        column = self.stats[stat]
+        return np.array(
+            [column[index[group]] if group in index else np.nan for group in groups],
+            dtype=float
+        )
+
+    def __str__(self):
+        names = list(self.stats)
+        lines = ["\t".join(['group'] + names)]
+        for row in self.rows():
+            lines.append("\t".join([str(row['group'])] + [f"{row[name]:g}" for name in names]))
+        return "\n".join(lines)
+
+
+def aggregate(tubes, field, by='day', stats=('count', 'mean', 'std', 'median'), record='all'):
+    """The stats of the values extract() pulls out of tubes."""
+    groups, codes, values, dropped = extract(tubes, field, by, record)
+    result = reduce(groups, codes, values, stats)
+    result.dropped = dropped
+    return result
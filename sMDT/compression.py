@@ -0,0 +1,139 @@
+###############################################################################
+#   File: compression.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: Compression of the tubes kept in the database. Tube pickles
+#       repeat themselves (class names, dates, operator names, the UMich
+#       fields), and database.s is synced through the shared folder with
+#       every change. With the compression of the Config (see config.py)
+#       set to zlib or lzma, every tube is stored compressed in a
+#       CompressedStore (see storage.py); the cold tier has its own setting,
+#       zlib unless changed.
+#
+#       Each pickle on its own is small, so zlib compresses it much better
+#       with a dictionary of what tube pickles usually hold.
+#       db_manager.compress() builds one from the tubes in the database,
+#       keeps it in database.zdict and rewrites every tube with it. Every
+#       dictionary ever built stays in that file, since a value names the
+#       dictionary it was compressed with, so tubes written with an older
+#       one still read back.
+#
+#       benchmarks/bench_compression.py compares the size of the database
+#       and the time to read it back with every setting.
+#
+#   Known Issues:
+#       Python's lzma can't use a dictionary, it's only used by zlib.
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import zlib
+import pickle
+import tempfile
+from pathlib import Path
+
+from .storage import CompressedStore, open_store, codec_name
+
+# zlib only looks back 32 kB, so a longer dictionary is never used.
+DICTIONARY_SIZE = 32 * 1024
+
+# Values per batch when a store is rewritten.
+_CHUNK = 500
+
+# path -> ((mtime, size), (current dictionary, every dictionary)), so the
+# dictionary file is only read again once it has changed.
+_loaded = {}
+
+
+def dictionary_id(dictionary):
+    """The Adler-32 of dictionary, which zlib streams compressed with it name it by."""
+    return zlib.adler32(dictionary)
+
+
+def concatenated_dictionary(samples, size=DICTIONARY_SIZE):
+    """
+    A zlib dictionary for values like those in samples, a list of pickles.
+    Nothing is trained or selected: it's simply the samples concatenated, as
+    many of the last ones as fit in size. zlib finds what's near the end of
+    its dictionary fastest and codes it shortest, so the last samples, the
+    newest tubes if they're in barcode order, go last. Picking the common
+    substrings instead compressed the test tubes worse, since whole tube
+    pickles share their layout as well as their strings.
+    """
+    return b''.join(samples)[-size:]
+
+
+def load_dictionaries(path):
+    """
+    (current, dictionaries): the dictionary new values are compressed with,
+    None if there is none, and every dictionary in the file at path by
+    dictionary_id(). (None, {}) if there is no such file.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded.get(path)
+    if loaded is None or loaded[0] != key:
+        with path.open('rb') as f:
+            state = pickle.load(f)
+        loaded = _loaded[path] = (key, (state['dictionaries'].get(state['current']), state['dictionaries']))
+    return loaded[1]
+
+
+def save_dictionary(path, dictionary):
+    """
+    Adds dictionary to the file at path, as the one new values are
+    compressed with. The others are kept, for the values compressed with them.
+    """
+    path = Path(path)
+    current, dictionaries = load_dictionaries(path)
+    dictionaries = dict(dictionaries)
+    dictionaries[dictionary_id(dictionary)] = dictionary
+    state = {'current': dictionary_id(dictionary), 'dictionaries': dictionaries}
+    # Written to a temporary file and renamed, like the db_manager's files.
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(state, f, 4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, str(path))
+
+
+def open_compressed(backend, path, flag='c', codec=None, dictionary_file=None, level=None):
+    """
+    Opens the store at path, as open_store() does, in a CompressedStore that
+    writes its values with codec (None for plain pickles) and the current
+    dictionary of dictionary_file, and reads them whatever they were written
+    with.
+    """
+    current, dictionaries = (None, {}) if dictionary_file is None else load_dictionaries(dictionary_file)
+    return CompressedStore(
+        open_store(backend, path, flag), level, codec,
+        current if codec_name(codec) == 'zlib' else None, dictionaries
+    )
+
+
+def sample(store, n):
+    """The pickles of n tubes of the open store, spread over its keys."""
+    keys = sorted(store.keys())
+    step = max(1, len(keys) // n)
+    return [data for key, data in store.get_many(keys[::step][:n], raw=True)]
+
+
+def recompress(backend, path, codec=None, dictionary_file=None, level=None):
+    """
+    Rewrites every value of the store at path with codec and the current
+    dictionary of dictionary_file. Returns the number of values rewritten.
+    """
+    with open_compressed(backend, path, 'c', codec, dictionary_file, level) as store:
+        keys = store.keys()
+        for i in range(0, len(keys), _CHUNK):
+            # Every value of a chunk is read before any is written.
+            store.put_batch(list(store.get_many(keys[i:i + _CHUNK], raw=True)), raw=True)
+        return len(keys)
@@ -0,0 +1,100 @@
+###############################################################################
+#   File: config.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The Config class, where a database and everything around it
+#       lives: database.s, the header store, the lock file, new_data, the
+#       legacy pickler's directories and the outbox journals. Everything is
+#       derived from one root directory, so a database can be made anywhere
+#       (a temporary directory for tests and benchmarks, a staging copy)
+#       and several can run side by side without touching the lab's.
+#
+#       The root is, in order: the one given to Config(), the environment
+#       variable SMDT_ROOT, or the directory containing the sMDT package,
+#       which is where the lab's database has always been. The storage
+#       backend (see storage.py) is likewise the one given, SMDT_BACKEND, or
+#       shelve. So is the compression of the tubes (see compression.py),
+#       SMDT_COMPRESSION or none, and of the cold tier, SMDT_COLD_COMPRESSION
+#       or zlib.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+from pathlib import Path
+
+from .storage import store_path, codec_name
+
+ROOT_VARIABLE = 'SMDT_ROOT'
+BACKEND_VARIABLE = 'SMDT_BACKEND'
+COMPRESSION_VARIABLE = 'SMDT_COMPRESSION'
+COLD_COMPRESSION_VARIABLE = 'SMDT_COLD_COMPRESSION'
+
+# The directory containing the sMDT package.
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_OUTBOX_DIRECTORY = Path.home() / '.sMDT' / 'outbox'
+
+
+class Config:
+    """
+    The paths of one database, all under root, the storage backend its
+    tubes and headers are kept with, and what its tubes and those of the
+    cold tier are compressed with, 'zlib', 'lzma' or None. outbox_dir is where outboxes keep
+    their journals by default, ~/.sMDT/outbox for the lab's database and
+    root/outbox for any other.
+    """
+    def __init__(self, root=None, outbox_dir=None, backend=None, compression=None, cold_compression=None):
+        if root is None:
+            root = os.environ.get(ROOT_VARIABLE) or None
+        self.is_default = root is None
+        self.root = PACKAGE_ROOT if root is None else Path(root).resolve()
+        self.backend = backend or os.environ.get(BACKEND_VARIABLE) or 'shelve'
+        # 'none' turns either off
+        self.compression = codec_name(compression or os.environ.get(COMPRESSION_VARIABLE))
+        self.cold_compression = codec_name(
+            cold_compression or os.environ.get(COLD_COMPRESSION_VARIABLE) or 'zlib'
+        )
+        # database.s and headers.s with shelve, database.sqlite... with sqlite
+        self.db_file = store_path(self.backend, self.root, 'database')
+        self.header_file = store_path(self.backend, self.root, 'headers')
+        self.generation_file = self.root / 'database.generation'
+        self.id_index_file = self.root / 'database.ids'
+        self.metadata_file = self.root / 'database.meta'
+        self.wip_file = self.root / 'database.wip'
+        # The zlib dictionaries, see compression.py
+        self.dictionary_file = self.root / 'database.zdict'
+        # The cold tier, see tiering.py
+        self.cold_file = store_path(self.backend, self.root, 'cold')
+        self.cold_header_file = store_path(self.backend, self.root, 'cold_headers')
+        # Where the export programs write the CSVs of shipped tubes.
+        self.exported_dir = self.root / 'Exported_Tubes'
+        self.package_dir = self.root / 'sMDT'
+        self.lock_dir = self.package_dir / 'locks'
+        self.lock_file = self.lock_dir / 'db_lock.lock'
+        self.new_data_dir = self.package_dir / 'new_data'
+        # Staged files the db_manager couldn't read are moved here.
+        self.quarantine_dir = self.package_dir / 'quarantine'
+        # The lab's log stays in the working directory, as it always was.
+        self.activity_log = Path('activity.log') if self.is_default else self.root / 'activity.log'
+        if outbox_dir is not None:
+            self.outbox_dir = Path(outbox_dir)
+        else:
+            self.outbox_dir = DEFAULT_OUTBOX_DIRECTORY if self.is_default else self.root / 'outbox'
+
+    def __repr__(self):
+        return f"Config({str(self.root)!r}, backend={self.backend!r})"
+
+    @classmethod
+    def of(cls, config):
+        """config if it's a Config, else the Config with config (a path, or None) as root."""
+        return config if isinstance(config, Config) else cls(config)
+
+    def make_dirs(self):
+        """Creates the lock and new_data directories, if they don't exist."""
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self.new_data_dir.mkdir(parents=True, exist_ok=True)
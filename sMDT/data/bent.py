@@ -24,6 +24,7 @@ class BentRecord(Record):
     """
     Class for objects representing individual records from the Bentness station.
     """
+    __slots__ = ('bentness',)
 
     # These are the fail limits for any tube.
     max_bentness = 0.9   # mm
@@ -58,6 +59,8 @@ class Bent(Station, ABC):
     """
     The Bentness station class, manages the relevant records for a particular tube.
     """
+    primary_field = 'bentness'
+
     def __init__(self): 
         super().__init__()
 
@@ -65,10 +68,8 @@ class Bent(Station, ABC):
         a = "Bentness Data: " + (self.status().name or '') + "\n"
         b = ""
 
-        # We want to print out each record.
-        for record in sorted(
-                self.m_records, key=lambda i: (i.date is None, i.date)
-        ):
+        # We want to print out each record. They are kept sorted by date.
+        for record in self.m_records:
             b += record.__str__()
 
         b = b[:-1]
@@ -81,7 +82,7 @@ class Bent(Station, ABC):
             return False
         return self.get_record(mode='last').fail()
 
-    def status(self):
+    def compute_status(self):
         if not self.visited():
             return Status.INCOMPLETE
         elif self.fail():
@@ -27,10 +27,13 @@ class DarkCurrentRecord(Record):
     Class for objects representing individual records from the 
     Dark Current station.
     """
+    __slots__ = ('dark_current', 'voltage')
 
     # Here are the project defined limits.
     max_individual_current = 2 # nA
     max_collective_current = 8 # nA
+    # Records after this date with a voltage of 0 V are from a tripped channel.
+    trip_check_date = datetime(2021, 5, 13)
 
     def __init__(
             self,
@@ -65,6 +68,8 @@ class DarkCurrent(Station, ABC):
     Class for objects representing individual records from the 
     Dark Current station.
     """
+    primary_field = 'dark_current'
+
     def __init__(self):
         super().__init__()
 
@@ -72,10 +77,8 @@ class DarkCurrent(Station, ABC):
         a = "Dark Current Data:  " + (self.status().name or '') + "\n"
         b = ""
 
-        # We want to print out each record.
-        for record in sorted(
-                self.m_records, key=lambda i: (i.date is None, i.date)
-        ):
+        # We want to print out each record. They are kept sorted by date.
+        for record in self.m_records:
             b += record.__str__()
 
         b = b[:-1]
@@ -90,7 +93,7 @@ class DarkCurrent(Station, ABC):
         except IndexError:
             return False
 
-    def status(self):
+    def compute_status(self):
         if not self.visited():
             return Status.INCOMPLETE
         try:
@@ -99,7 +102,9 @@ class DarkCurrent(Station, ABC):
             # with 2600 V would be rather pointless. This is why some
             # tubes with 0 nA of stray current will be recorded as 
             # incomplete, as they will be recorded as 0 nA at 0 V.
-            if self.get_record(mode='last').date > datetime(2021, 5, 13) and self.get_record(mode='last').voltage <= 0.0:
+            last = self.get_record(mode='last')
+            if last.date > DarkCurrentRecord.trip_check_date \
+                    and last.voltage <= 0.0:
                 return Status.INCOMPLETE
         except TypeError:
             return Status.INCOMPLETE
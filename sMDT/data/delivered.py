@@ -22,6 +22,7 @@ class Delivered(Record):
     """
     Class for objects representing individual records on tube delivery to UMich.
     """
+    __slots__ = ('delivered',)
 
     # Does this format for a long list of parameters look cleaner?
     def __init__(self, delivered=None, date=datetime.now(), user=None):
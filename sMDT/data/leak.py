@@ -24,6 +24,7 @@ class LeakRecord(Record):
     """
     Class for objects representing individual records from the Leak station.
     """
+    __slots__ = ('leak_rate',)
 
     # Here are the project defined limits.
     threshold_leak = 1.0E-5
@@ -50,6 +51,8 @@ class Leak(Station, ABC):
     """
     The Leak station class, manages the relevant records for a particular tube.
     """
+    primary_field = 'leak_rate'
+
     def __init__(self):
         super().__init__()
 
@@ -57,10 +60,8 @@ class Leak(Station, ABC):
         a = "Leak Data: " + (self.status().name or '') + "\n"
         b = ""
 
-        # We want to print out each record.
-        for record in sorted(
-                self.m_records, key=lambda i: (i.date is None, i.date)
-        ):
+        # We want to print out each record. They are kept sorted by date.
+        for record in self.m_records:
             b += record.__str__()
 
         b = b[:-1]
@@ -74,7 +75,7 @@ class Leak(Station, ABC):
         except IndexError:
             return False
 
-    def status(self):
+    def compute_status(self):
         if not self.visited():
             return Status.INCOMPLETE
         elif self.fail():
@@ -9,12 +9,125 @@
 #
 #   Workarounds:
 #
+#   Modifications:
+#   2026-10 Records are slotted, operator names are interned and dates can
+#           optionally be stored compactly. Old pickles still load through
+#           __setstate__.
+#   2026-10 Fields of old pickles that no longer exist go in the _extra slot
+#           rather than a __dict__, which pickling used to create on every
+#           record.
+#
 ###############################################################################
+import sys
+import datetime
+
+
+_slot_cache = {}
+
+
+def _all_slots(cls):
+    # Every slot name of the class and its parents. Cached per class, this
+    # gets hit on every pickle and unpickle of a record.
+    try:
+        return _slot_cache[cls]
+    except KeyError:
+        names = set()
+        for klass in cls.__mro__:
+            names.update(klass.__dict__.get('__slots__', ()))
+        names.discard('_extra')
+        _slot_cache[cls] = frozenset(names)
+        return _slot_cache[cls]
 
 
 class Record:
+    """
+    Base class of all station records.
+
+    Records are slotted, so they don't each carry their own __dict__. The
+    '_extra' slot is only there so pickles with fields that have since
+    been removed (like SwageRecord.error_code) still load: it holds a dict
+    of them, read like any attribute, and is never set for records made by
+    the current code. A field that is never set reads as None, this lets
+    records like the UMich ones skip the fields they inherit but don't use.
+    """
+    __slots__ = ('user', '_date', '_extra')
+
+    # When true, dates with whole seconds are stored as a small int of
+    # seconds since compact_epoch rather than a datetime object. The date
+    # attribute always reads back as a datetime either way.
+    compact_dates = False
+    compact_epoch = datetime.datetime(2000, 1, 1)
+
     def __init__(self, user=None):
-        self.user = user
+        self.user = sys.intern(user) if type(user) is str else user
+
+    @property
+    def date(self):
+        try:
+            value = self._date
+        except AttributeError:
+            return None
+        if type(value) is int:
+            return Record.compact_epoch + datetime.timedelta(seconds=value)
+        return value
+
+    @date.setter
+    def date(self, value):
+        if Record.compact_dates \
+                and type(value) is datetime.datetime \
+                and value.tzinfo is None \
+                and value.microsecond == 0:
+            value = (value - Record.compact_epoch) // datetime.timedelta(seconds=1)
+        self._date = value
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, so for slots that were
+        # never set and for names that don't exist at all.
+        if name in _all_slots(type(self)) or name == '_extra':
+            return None
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __getstate__(self):
+        # The state is a plain dictionary with the same keys as the records
+        # from before slots were used, so pickles stay readable both ways.
+        # Read through the slot, so nothing is created for a record without
+        # old fields.
+        state = dict(self._extra or {})
+        for name in _all_slots(type(self)):
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            if name == '_date':
+                state['date'] = self.date
+            else:
+                state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        # Pickles made by the default slot machinery are (dict, slots) pairs.
+        if isinstance(state, tuple):
+            merged = dict(state[0] or {})
+            merged.update(state[1] or {})
+            state = merged
+        slots = _all_slots(type(self))
+        extra = {}
+        for name, value in state.items():
+            if name == 'date' or name == '_date':
+                self.date = value
+            elif name == 'user':
+                self.user = sys.intern(value) if type(value) is str else value
+            elif name in slots:
+                object.__setattr__(self, name, value)
+            else:
+                extra[name] = value
+        if extra:
+            self._extra = extra
 
     def fail(self):
         raise NotImplementedError
@@ -10,7 +10,15 @@
 #
 #   Workarounds:
 #
+#   Modifications:
+#   2026-10 Records are kept sorted by date, and status() is cached until
+#           the records change. Stations keep a summary of their records,
+#           see summary().
+#
 ###############################################################################
+import itertools
+import numbers
+from datetime import datetime
 
 modes = {
     "last": lambda station: station.m_records[-1],
@@ -19,10 +27,151 @@ modes = {
 }
 
 
+# Every station and tube gets a new stamp from this counter whenever it is
+# created, loaded or changed. A cached status is only used if the stamps it
+# was computed from are still the same.
+_stamps = itertools.count(1)
+
+
+def next_stamp():
+    return next(_stamps)
+
+
+class StatusCache:
+    """
+    Counts how often cached statuses were used (hits) and how often they had
+    to be computed (misses), for stations and tubes. Setting enabled to
+    false turns the caching off, for comparison.
+    """
+    def __init__(self):
+        self.enabled = True
+        self.reset()
+
+    def reset(self):
+        self.station_hits = 0
+        self.station_misses = 0
+        self.tube_hits = 0
+        self.tube_misses = 0
+
+    def __str__(self):
+        return (
+            f"station status: {self.station_hits} cached, "
+            f"{self.station_misses} computed\n"
+            f"tube status: {self.tube_hits} cached, "
+            f"{self.tube_misses} computed"
+        )
+
+
+status_cache = StatusCache()
+
+
+def date_key(record):
+    """
+    The key records are kept sorted by. Oldest first, records without a date
+    go at the end.
+    """
+    date = getattr(record, 'date', None)
+    return (date is None, date)
+
+
+def record_passed(record):
+    """
+    True if the record doesn't fail. Records that can't tell (no fail()
+    function, or missing values it needs) don't count as passing.
+    """
+    try:
+        return not record.fail()
+    except (AttributeError, TypeError):
+        return False
+
+
+class StationSummary:
+    """
+    Summary of a station's records: the first and last record, the first
+    and last passing record, the first and last record of every day, and
+    the minimum, maximum and mean of the station's primary_field. Built by
+    Station.summary(), and kept up to date as records are added.
+    """
+    def __init__(self, field=None):
+        self.field = field
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.first_passing = None
+        self.last_passing = None
+        # Date of the day -> [first record, last record] of that day.
+        self.days = {}
+        self.first_day = None
+        self.last_day = None
+        self.minimum = None
+        self.maximum = None
+        self.n_values = 0
+        self.total = 0.0
+
+    def add(self, record):
+        """
+        Adds a record that goes after all the others.
+        """
+        self.count += 1
+        if self.first is None:
+            self.first = record
+        self.last = record
+        if record_passed(record):
+            if self.first_passing is None:
+                self.first_passing = record
+            self.last_passing = record
+
+        date = getattr(record, 'date', None)
+        if date is not None:
+            day = date.date() if isinstance(date, datetime) else date
+            entry = self.days.get(day)
+            if entry is None:
+                self.days[day] = [record, record]
+            else:
+                entry[1] = record
+            if self.first_day is None:
+                self.first_day = day
+            self.last_day = day
+
+        if self.field is not None:
+            value = getattr(record, self.field, None)
+            # NaN != NaN, those are left out like None is.
+            if isinstance(value, numbers.Real) and value == value:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+                self.n_values += 1
+                self.total += value
+
+    def day_first(self, day):
+        """Returns the first record of the day, or None."""
+        entry = self.days.get(day)
+        return entry[0] if entry else None
+
+    def day_last(self, day):
+        """Returns the last record of the day, or None."""
+        entry = self.days.get(day)
+        return entry[1] if entry else None
+
+    def mean(self):
+        """Mean of the primary field, or None if no record has a value."""
+        return self.total / self.n_values if self.n_values else None
+
+
 class Station:
     """
     Abstract class representing a station that will record data on a tube
     """
+    # The record field summary() takes the minimum, maximum and mean of.
+    primary_field = None
+
+    # Defaults for the status and summary caches, see status() and summary().
+    _stamp = 0
+    _status_key = None
+    _status = None
+    _summary = None
+
     def __init__(self):
         # WARNING
         # Initially, this init function and the inheriting station's functions
@@ -35,6 +184,7 @@ class Station:
         # encountered the problem and traced it back here and found that
         # removing it fixed it
         self.m_records = []
+        self._stamp = next_stamp()
 
     def __str__(self):
         raise NotImplementedError
@@ -44,8 +194,56 @@ class Station:
 
     def __add__(self, other):
         ret = type(self)()
-        ret.m_records = self.m_records + other.m_records
-        return ret
+        ret.m_records = list(self.m_records)
+        return ret.merge_from(other)
+
+    def __getstate__(self):
+        # The cached status and summary are never stored.
+        state = self.__dict__.copy()
+        for name in ('_stamp', '_status_key', '_status', '_summary'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stamp = next_stamp()
+        # Stations pickled before records were kept sorted are in the order
+        # the files were read in. Sorting is stable and nearly free on an
+        # already sorted list, so this only costs anything once per tube.
+        records = self.m_records
+        if len(records) < 2:
+            return
+        try:
+            if any(date_key(b) < date_key(a) for a, b in zip(records, records[1:])):
+                records.sort(key=date_key)
+        except TypeError:
+            pass
+
+    def merge_from(self, other):
+        """
+        Adds the records of other to this station, in place. Unlike __add__,
+        no new station object is built. Returns self.
+        """
+        records = self.m_records
+        new_records = other.m_records
+        if not new_records:
+            return self
+        self._stamp = next_stamp()
+        if len(new_records) <= 2:
+            for record in new_records:
+                self.add_record(record)
+            return self
+        in_order = not records \
+            or not date_key(new_records[0]) < date_key(records[-1])
+        records.extend(new_records)
+        if not in_order:
+            # Both halves are already sorted, which timsort merges in a
+            # single pass.
+            try:
+                records.sort(key=date_key)
+            except TypeError:
+                pass
+        return self
 
     def fail(self):
         raise NotImplementedError
@@ -61,12 +259,103 @@ class Station:
             raise RuntimeError()
 
     def add_record(self, record):
-        """Adds a record to the station's records"""
-        self.m_records.append(record)
+        """
+        Adds a record to the station's records, keeping them sorted by date.
+        Records with the same date stay in the order they were added.
+        """
+        records = self.m_records
+        key = date_key(record)
+        summary = self._summary
+        if summary is not None and summary.key != self.cache_key():
+            summary = None
+        self._stamp = next_stamp()
+        try:
+            if not records or not key < date_key(records[-1]):
+                # Records almost always arrive in order, and then the
+                # summary can be updated instead of rebuilt.
+                records.append(record)
+                if summary is not None:
+                    summary.add(record)
+                    summary.key = self.cache_key()
+                return
+            records.insert(self._bisect(key, len(records)), record)
+        except TypeError:
+            # A date that can't be compared to the others, keep it at the end.
+            records.append(record)
+
+    def get_records_between(self, start=None, end=None):
+        """
+        Returns the list of records dated from start up to but not including
+        end. Either bound may be None to leave that side open. Records with
+        no date are never included.
+        """
+        records = self.m_records
+        n_dated = self._bisect((True, None), len(records), right=False)
+        lo = 0 if start is None else self._bisect((False, start), n_dated, right=False)
+        hi = n_dated if end is None else self._bisect((False, end), n_dated, right=False)
+        return records[lo:hi]
+
+    def _bisect(self, key, hi, right=True):
+        # Binary search of the records by date_key, like bisect.bisect_right
+        # (or bisect_left if right is false). bisect only takes a key
+        # function from python 3.10 on.
+        records = self.m_records
+        lo = 0
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = date_key(records[mid])
+            if key < mid_key or (not right and not mid_key < key):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
 
     def visited(self):
         return len(self.m_records) != 0
 
+    def cache_key(self):
+        """
+        Changes whenever the records could have changed. The length is there
+        for code that appends to m_records directly.
+        """
+        return (self._stamp, len(self.m_records))
+
+    def invalidate(self):
+        """
+        Drops the cached status. Only needed after editing a record in place.
+        """
+        self._stamp = next_stamp()
+
     def status(self):
+        """
+        Returns the station's status, as computed by compute_status(). The
+        result is cached until a record is added.
+        """
+        key = self.cache_key()
+        if status_cache.enabled and self._status_key == key:
+            status_cache.station_hits += 1
+            return self._status
+        status_cache.station_misses += 1
+        self._status = self.compute_status()
+        self._status_key = key
+        return self._status
+
+    def compute_status(self):
         raise NotImplementedError
 
+    def summary(self):
+        """
+        Returns the StationSummary of the records. It is updated as records
+        are added in date order, and only rebuilt when they change any other
+        way.
+        """
+        summary = self._summary
+        key = self.cache_key()
+        if summary is None or summary.key != key:
+            summary = StationSummary(self.primary_field)
+            for record in self.m_records:
+                summary.add(record)
+            summary.key = key
+            self._summary = summary
+        return summary
+
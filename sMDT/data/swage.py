@@ -24,6 +24,7 @@ class SwageRecord(Record):
     """
     Class for objects representing individual records from the Swage station.
     """
+    __slots__ = ('raw_length', 'swage_length', 'clean_code')
 
     # These are the fail limits for any tube.
     max_raw_length      = 1000  # cm
@@ -81,6 +82,8 @@ class Swage(Station, ABC):
     """
     The Swage station class, manages the relevant records for a particular tube.
     """
+    primary_field = 'swage_length'
+
     def __init__(self): 
         super().__init__()
 
@@ -88,10 +91,8 @@ class Swage(Station, ABC):
         a = "Swage Data: " + (self.status().name or '') + "\n"
         b = ""
 
-        # We want to print out each record.
-        for record in sorted(
-                self.m_records, key=lambda i: (i.date is None, i.date)
-        ):
+        # We want to print out each record. They are kept sorted by date.
+        for record in self.m_records:
             b += record.__str__()
 
         b = b[:-1]
@@ -106,7 +107,7 @@ class Swage(Station, ABC):
 
         return self.get_record(mode='last').fail()
 
-    def status(self):
+    def compute_status(self):
         if not self.visited():
             return Status.INCOMPLETE
         elif self.fail():
@@ -24,6 +24,7 @@ class TensionRecord(Record):
     """
     Class for objects representing individual records from the Tension station.
     """
+    __slots__ = ('tension', 'frequency')
 
     # Here are the project defined limits.
     max_tension = 350 + 15
@@ -62,6 +63,7 @@ class Tension(Station, ABC):
     """
     Class for objects representing individual records from the Tension station.
     """
+    primary_field = 'tension'
 
     def __init__(self):
         super().__init__()
@@ -70,10 +72,8 @@ class Tension(Station, ABC):
         a = "Tension Data: " + self.status().name + "\n"
         b = ""
 
-        # We want to print out each record.
-        for record in sorted(
-                self.m_records, key = lambda i: (i.date is None, i.date)
-        ):
+        # We want to print out each record. They are kept sorted by date.
+        for record in self.m_records:
             b += record.__str__()
 
         b = b[:-1]
@@ -89,9 +89,7 @@ class Tension(Station, ABC):
         found_first_tension = False
         first_tension_date = None
         two_weeks = datetime.timedelta(days = 14)
-        for record in sorted(
-                self.m_records, key = lambda i: (i.date is None, i.date)
-        ):
+        for record in self.m_records:
             if record is None:
                 return False
 
@@ -105,7 +103,7 @@ class Tension(Station, ABC):
                     first_tension_date = record.date
         return False
 
-    def status(self):
+    def compute_status(self):
         if not self.visited():
             return Status.INCOMPLETE
         # if self.passed_second_tension():
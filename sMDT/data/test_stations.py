@@ -155,3 +155,157 @@ def test_second_tension():
         TensionRecord(tension=350, date=datetime.datetime.now()-fifteendays)
     )
     assert tStation.passed_second_tension()
+
+
+def test_record_slots_and_pickle():
+    from .tension import TensionRecord
+    from .umich import UMich_TensionRecord
+    import sys
+    import pickle
+    import datetime
+    user = ''.join(['Pa', 'ul'])
+    r = TensionRecord(tension=350, date=datetime.datetime(2021, 6, 1), user=user)
+    assert not hasattr(r, '__dict__')
+    assert r.user is TensionRecord(user='Paul').user
+    size = sys.getsizeof(r)
+    r2 = pickle.loads(pickle.dumps(r))
+    # Pickling adds nothing to either record.
+    assert sys.getsizeof(r) == sys.getsizeof(r2) == size and r._extra is None
+    assert (r2.tension, r2.date, r2.user) == (350, datetime.datetime(2021, 6, 1), 'Paul')
+
+    # Unused inherited fields are never set, and read as None.
+    u = UMich_TensionRecord(umich_tension=350)
+    assert u.tension is None and u.date is None
+    with pytest.raises(AttributeError):
+        u.not_a_field
+
+
+def test_record_old_state():
+    """
+    Records pickled before slots were used have a plain dictionary state,
+    possibly with fields that no longer exist.
+    """
+    from .swage import SwageRecord
+    import datetime
+    r = SwageRecord.__new__(SwageRecord)
+    r.__setstate__({
+        'raw_length': 1.5, 'swage_length': 0.5, 'clean_code': '4',
+        'date': datetime.datetime(2021, 6, 1), 'user': 'Paul', 'error_code': 2
+    })
+    assert r.raw_length == 1.5
+    assert r.error_code == 2
+    assert r.__getstate__()['error_code'] == 2
+
+
+def test_record_compact_dates():
+    from .record import Record
+    from .leak import LeakRecord
+    import datetime
+    date = datetime.datetime(2021, 6, 1, 12, 30, 5)
+    Record.compact_dates = True
+    try:
+        r = LeakRecord(leak_rate=0, date=date)
+        assert type(r._date) is int
+        assert r.date == date
+        precise = LeakRecord(leak_rate=0, date=date.replace(microsecond=7))
+        assert precise.date.microsecond == 7
+    finally:
+        Record.compact_dates = False
+    assert r.date == date
+
+
+def test_records_sorted_on_insert():
+    from .leak import Leak, LeakRecord
+    import datetime
+    day = datetime.timedelta(days=1)
+    start = datetime.datetime(2021, 6, 1)
+    l = Leak()
+    l.add_record(LeakRecord(leak_rate=3, date=start + 3 * day))
+    l.add_record(LeakRecord(leak_rate=None, date=None))
+    l.add_record(LeakRecord(leak_rate=1, date=start + day))
+    l.add_record(LeakRecord(leak_rate=2, date=start + 2 * day))
+    l.add_record(LeakRecord(leak_rate=4, date=start + 2 * day))
+    assert [r.leak_rate for r in l.get_record('all')] == [1, 2, 4, 3, None]
+    assert l.get_record('first').leak_rate == 1
+    assert l.get_record('last').leak_rate is None
+
+    between = l.get_records_between(start + 2 * day, start + 3 * day)
+    assert [r.leak_rate for r in between] == [2, 4]
+    assert len(l.get_records_between(start + 2 * day)) == 3
+    assert len(l.get_records_between(end=start)) == 0
+
+    other = Leak()
+    for i in range(5):
+        other.add_record(LeakRecord(leak_rate=10 + i, date=start + i * day))
+    l.merge_from(other)
+    dates = [r.date for r in l.get_record('all')]
+    assert dates[:-1] == sorted(dates[:-1])
+    assert dates[-1] is None
+
+
+def test_unsorted_station_sorted_on_load():
+    from .tension import Tension, TensionRecord
+    import datetime
+    import pickle
+    t = Tension()
+    t.m_records = [
+        TensionRecord(tension=351, date=datetime.datetime(2021, 7, 1)),
+        TensionRecord(tension=350, date=datetime.datetime(2021, 6, 1)),
+    ]
+    t2 = pickle.loads(pickle.dumps(t))
+    assert t2.get_record('first').tension == 350
+    assert t2.get_record('last').tension == 351
+
+
+def test_station_summary():
+    from .tension import Tension, TensionRecord
+    import datetime
+    start = datetime.datetime(2021, 6, 1, 9)
+    hour = datetime.timedelta(hours=1)
+    day = datetime.timedelta(days=1)
+    t = Tension()
+    summary = t.summary()
+    assert summary.first is None and summary.first_day is None
+    assert summary.mean() is None
+
+    t.add_record(TensionRecord(tension=300, date=start))
+    t.add_record(TensionRecord(tension=350, date=start + hour))
+    t.add_record(TensionRecord(tension=340, date=start + 2 * hour))
+    t.add_record(TensionRecord(tension=352, date=start + 15 * day))
+    # Records added in order update the same summary.
+    assert t.summary() is summary
+    assert summary.count == 4
+    assert summary.first.tension == 300
+    assert summary.last.tension == 352
+    assert summary.first_passing.tension == 350
+    assert summary.last_passing.tension == 352
+    assert summary.first_day == start.date()
+    assert summary.day_first(start.date()).tension == 300
+    assert summary.day_last(summary.first_day).tension == 340
+    assert summary.day_last(summary.last_day).tension == 352
+    assert summary.day_last(start.date() + day) is None
+    assert (summary.minimum, summary.maximum) == (300, 352)
+    assert summary.mean() == (300 + 350 + 340 + 352) / 4
+
+    # Anything else rebuilds it.
+    t.add_record(TensionRecord(tension=360, date=start - day))
+    assert t.summary().first.tension == 360
+    assert t.summary().first_day == (start - day).date()
+    t.m_records.append(TensionRecord(tension=float('nan'), date=None))
+    assert t.summary().count == 6
+    assert t.summary().maximum == 360
+    assert t.summary().last_day == (start + 15 * day).date()
+
+
+def test_dark_current_summary():
+    from .dark_current import DarkCurrent, DarkCurrentRecord
+    import datetime
+    start = datetime.datetime(2021, 6, 1, 9)
+    hour = datetime.timedelta(hours=1)
+    dc = DarkCurrent()
+    dc.add_record(DarkCurrentRecord(dark_current=0.5, date=start, voltage=2730))
+    dc.add_record(DarkCurrentRecord(dark_current=1.5, date=start + hour, voltage=2730))
+    dc.add_record(DarkCurrentRecord(dark_current=1.0, date=start + 2 * hour, voltage=2730))
+    summary = dc.summary()
+    assert (summary.minimum, summary.maximum) == (0.5, 1.5)
+    assert summary.mean() == 1.0
@@ -33,12 +33,14 @@ class UMich_BentRecord(BentRecord):
     Class for objects representing individual records from University of 
     Michigan's bentness tests. These are bentness tests after a tube is produced
     """
+    __slots__ = ('umich_bent',)
+
     # Only one column in the UMich csv file seems relevant to our Bentness Station
     def __init__(self,
                 umich_bent = None
     ):
-            # Calling super class init to contruct the object
-            super().__init__()
+            # The fields inherited from BentRecord aren't used, so the super
+            # class init isn't called. Unset fields read as None.
             self.umich_bent = umich_bent 
 
 
@@ -52,6 +54,7 @@ class UMich_Bent(Bent):
     """"
     UMich Bent Class, to manage relevent records for a particular tube
     """
+    primary_field = 'umich_bent'
 
     # Created using metaclass because UMich_Status as a parent class caused issues
     __metaclass__ = UMich_Status
@@ -78,7 +81,7 @@ class UMich_Bent(Bent):
         return a + textwrap.indent(b, '\t') + '\n'
             
             
-    def status(self):
+    def compute_status(self):
 
         # If there are no UMich records for the tube, set status to NO_DATA
         record = None
@@ -102,6 +105,10 @@ class UMich_TensionRecord(TensionRecord):
     Class for objects representing individual records from University of 
     Michigan's tension tests
     """
+    __slots__ = (
+        'umich_tension', 'umich_frequency', 'umich_date', 'tension_flag',
+        'freq_diff', 'tens_diff', 'time_diff', 'flag_scd_tension'
+    )
 
     def __init__(self,
                 umich_tension = None,
@@ -114,8 +121,8 @@ class UMich_TensionRecord(TensionRecord):
                 flag_scd_tension = None
     ):
 
-        # Calling super class to construct the object
-        super().__init__()
+        # The fields inherited from TensionRecord aren't used, so the super
+        # class init isn't called. Unset fields read as None.
         self.umich_tension = umich_tension
         self.umich_frequency = umich_frequency
         self.umich_date = umich_date
@@ -148,6 +155,7 @@ class UMich_Tension(Tension):
     """
     UMich Tension class, manages the relevant records for a particular tube.
     """
+    primary_field = 'umich_tension'
 
     # Used metaclass because inheritance from UMich_Status resulted in errors
     __metaclass__ = UMich_Status
@@ -175,7 +183,7 @@ class UMich_Tension(Tension):
         return a + textwrap.indent(b, '\t') + '\n'
             
             
-    def status(self):
+    def compute_status(self):
 
         # If the tube does not exist in the csv, the record will stay None
         record = None
@@ -206,6 +214,7 @@ class UMich_DarkCurrentRecord(DarkCurrentRecord):
     Class for objects representing individual records from University of 
     Michigan's dark current tests
     """
+    __slots__ = ('umich_dark_current', 'umich_date', 'dc_flag', 'hv_time')
 
     def __init__(self,
                 umich_dark_current = None,
@@ -213,7 +222,8 @@ class UMich_DarkCurrentRecord(DarkCurrentRecord):
                 dc_flag = None,
                 hv_time = None
     ):
-        super().__init__()
+        # The fields inherited from DarkCurrentRecord aren't used, so the
+        # super class init isn't called. Unset fields read as None.
         self.umich_dark_current = umich_dark_current
         self.umich_date = umich_date
         self.dc_flag = dc_flag
@@ -236,6 +246,8 @@ class UMich_DarkCurrent(DarkCurrent):
     """
     UMich Tension class, manages the relevant records for a particular tube.
     """
+    primary_field = 'umich_dark_current'
+
     # Used metaclass because inheritance from UMich_Status resulted in errors
     __metaclass__ = UMich_Status
 
@@ -262,7 +274,7 @@ class UMich_DarkCurrent(DarkCurrent):
         return a + textwrap.indent(b, '\t') + '\n'
             
             
-    def status(self):
+    def compute_status(self):
 
         record = None
 
@@ -287,6 +299,10 @@ class UMich_MiscRecord(Record):
     Class for objects representing individual records not involved in the 
     bentness, tension, or dark current testing from University of Michigan
     """
+    __slots__ = (
+        'prod_site', 'endplug_type', 'first_scan', 'flag_endplug', 'length',
+        'done'
+    )
 
     def __init__(self,
                 prod_site = None,
@@ -344,7 +360,7 @@ class UMich_Misc(Station, ABC):
         return a + textwrap.indent(b, '\t') + '\n'
             
             
-    def status(self):
+    def compute_status(self):
 
         record = None
 
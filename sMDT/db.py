@@ -13,54 +13,172 @@
 #       locking library.
 #  Modifications:
 #  2022-06, Sara Sawford, Reinhard Schwienhorst, add UMich information
+#  2026-10, A header store (headers.s) next to database.s, see list_headers()
+#  2026-10, query(), declarative queries checked on the headers first
+#  2026-10, aggregate(), grouped statistics of record values
+#  2026-10, generation() and an optional cache of query() and aggregate() results
+#  2026-10, a sorted index of the tube IDs (database.ids), see id_index()
+#  2026-10, db_manager.migrate() rewrites old tubes in the current schema version
+#  2026-10, add_tubes(), delete_tubes() and overwrite_tubes() stage one batch file
+#  2026-10, staging writes need no lock, see stage()
+#  2026-10, portalocker, the legacy pickler and the query modules are imported when first used
+#  2026-10, every path comes from a Config (config.py), so a database can live anywhere
+#  2026-10, tubes and headers are kept by a storage backend (storage.py), shelve by default
+#  2026-10, counts of tubes and records kept in database.meta, see metadata()
+#  2026-10, complete and shipped tubes move to a compressed cold tier, see db_manager.tier()
+#  2026-10, a cache of the tubes in production for the stations (database.wip), see get_wip()
+#  2026-10, tubes can be stored compressed, see compression.py and db_manager.compress()
+#  2026-10, databases are compacted only by db_manager.compact(), not under running readers
 #
 ###############################################################################
 
-import shelve
+import dbm
 import pickle
 import time
 import datetime
-import random
 import os
+import uuid
 import sys
+import itertools
+import contextlib
+import shutil
 #import dbm # used only to make sure the database is in dmb.dumb format for compatibility
 
-import portalocker
-
 from pathlib import Path
 
 from sMDT.tube import Tube
-from sMDT.legacy import station_pickler
-from sMDT import DBLogger
+from sMDT.header import TubeHeader
+from sMDT.id_index import IDIndex
+from sMDT.metadata import DatabaseMetadata
+from sMDT.wip import WIPCache
+from sMDT.lazy import lazy_import
+from sMDT.config import Config
+from sMDT.storage import open_store, store_path, store_exists, compact_store
+from sMDT import tiering, compression
+
+# Imported when a lock is first taken, importing it takes longer than all of
+# the rest of this module.
+portalocker = lazy_import('portalocker')
 
 logging = False
 
+# Reserved keys of the header store: the last write sequence number, and a
+# random token made whenever the header store is created. Together they are
+# the generation of the database, which changes with every write.
+SEQ_KEY = '__seq__'
+STORE_KEY = '__store__'
+RESERVED_KEYS = (SEQ_KEY, STORE_KEY)
+
+# IDs looked up at once by iter_tubes().
+_CHUNK = 500
+
+# What pickle.load() raises on a truncated or corrupt file.
+_UNREADABLE = (EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError)
+# A staged file that can't be read and is younger than this (seconds) may
+# still be being written by an old station PC, which writes into new_data
+# directly, and is left for the next update. Older ones are quarantined.
+_STAGING_GRACE = 60
+
+
+def mark_generation(headers, seq):
+    # Stores the sequence number in the open header store, and the token if
+    # it doesn't have one yet. Returns the generation.
+    headers[SEQ_KEY] = seq
+    if STORE_KEY not in headers:
+        headers[STORE_KEY] = uuid.uuid4().hex
+    return (headers[STORE_KEY], seq)
+
+
+def _replace_file(path, data):
+    # Writes data to a temporary file next to path and renames it over path,
+    # so readers see the old file or the new one, nothing in between.
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_bytes(data)
+    os.replace(str(temporary), str(path))
+
+
+def stage(directory, suffix, write):
+    # Stages a file for the db_manager in directory, without taking any lock.
+    # write(f) fills a temporary file, which is flushed to disk and renamed to
+    # a unique name ending in suffix. The db_manager skips the temporary
+    # names, so it only ever reads complete files. Names start with the time
+    # in nanoseconds, and the db_manager applies them in that order. Returns
+    # the file's path.
+    import tempfile
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(
+        prefix=str(time.time_ns()) + '.', suffix='.tmp', dir=str(directory)
+    )
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        path = temporary[:-len('.tmp')] + suffix
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+    return Path(path)
+
 
 class db:
-    def __init__(self):
+    def __init__(self, cache=None, config=None):
         # Here are all the directories that are relevant to the database.
-        # We are essentially asking for the directory that is two directories
-        # up. All paths are then relative to this path.
-
-        #Gets first two directories of the full path involved in finding the dropbox
-        self.dropbox_directory = Path(__file__).resolve().parents[1]
-        #uses above path to put the database in this directory as datdabase.s
-        self.db_file = self.dropbox_directory / 'database.s'
-        self.lock_file = self.dropbox_directory /'sMDT'/'locks'/'db_lock.lock'
-        #creates new directory from data in 'new data'
-        self.new_data_dir = self.dropbox_directory / 'sMDT' / 'new_data'
+        # They all come from config (see config.py): a Config, a root
+        # directory, or None for $SMDT_ROOT or else the directory two
+        # directories up, where the lab's database is.
+        self.config = Config.of(config)
+
+        #the directory containing the database
+        self.dropbox_directory = self.config.root
+        #the database itself, database.s
+        self.db_file = self.config.db_file
+        #the header of every tube, kept in sync with database.s by the db_manager
+        self.header_file = self.config.header_file
+        #the generation of the database, see generation()
+        self.generation_file = self.config.generation_file
+        #the sorted tube IDs, see id_index()
+        self.id_index_file = self.config.id_index_file
+        self._id_index = None
+        self._id_index_generation = None
+        #tube and record counts, see metadata()
+        self.metadata_file = self.config.metadata_file
+        #the tubes in production, see get_wip()
+        self.wip_file = self.config.wip_file
+        self._wip = None
+        #the cold tier, complete and shipped tubes (see tiering.py) and their headers
+        self.cold_file = self.config.cold_file
+        self.cold_header_file = self.config.cold_header_file
+        self.lock_file = self.config.lock_file
+        #where new data is staged for the db_manager
+        self.new_data_dir = self.config.new_data_dir
         #print("Database directory ",self.new_data_dir)
 
-        # We need to check if the database lock file exists. If
-        # not, then we'll have to make those directories.
-        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        # The lock file (and its directory) are made the first time a lock is
+        # needed, see _lock_path(). Programs that only stage tubes never do.
+        self._lock_ready = False
 
-        # Now we'll go ahead and create the lock file.
-        self.lock_file.touch(exist_ok=True)
+        # A ResultCache (see result_cache.py) remembering query() and aggregate() results
+        # for as long as the database doesn't change. None caches nothing.
+        self.cache = cache
 
         if logging:
+            from sMDT import DBLogger
             self.logger = DBLogger()
 
+    def _lock_path(self):
+        #the lock file's path, making it first if needed
+        if not self._lock_ready:
+            self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+            self.lock_file.touch(exist_ok=True)
+            self._lock_ready = True
+        return str(self.lock_file.resolve())
+
     def open_shelve(self):
         # We are going to use portalocker to have an os-independent locking
         # system. Whenever we ask to open a file, we will lock the 
@@ -73,7 +191,7 @@ class db:
         # method of opening the database.
 
         #turning path into string
-        s = str(self.lock_file.resolve())
+        s = self._lock_path()
 
         #try/except lines
         #try lets you test a block for errors
@@ -87,8 +205,11 @@ class db:
                 db_file = str(self.db_file.resolve())
                 #print("Database file format: ",dbm.whichdb(db_file))
 
-                #'r' is just a read only file
-                return_dict = shelve.open(db_file, 'r')
+                #'r' is just a read only file. A store of the backend of the config,
+                #used like a shelve (see storage.py), whose tubes may be compressed
+                return_dict = compression.open_compressed(
+                    self.config.backend, db_file, 'r', self.config.compression, self.config.dictionary_file
+                )
         except portalocker.LockException:
             # Just in-case we can't open the database, we'll return an
             # empty dictionary.
@@ -96,8 +217,25 @@ class db:
 
         return return_dict
 
+    def open_cold(self, headers=False):
+        #opens the cold store read only, like open_shelve(), or its header store if headers is
+        #true. None if the db_manager hasn't moved any tubes to the cold tier
+        path = self.cold_header_file if headers else self.cold_file
+        if not store_exists(self.config.backend, str(path)):
+            return None
+        s = self._lock_path()
+        try:
+            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+                if headers:
+                    return open_store(self.config.backend, str(path), 'r')
+                return tiering.open_cold(
+                    self.config.backend, str(path), 'r', self.config.cold_compression, self.config.dictionary_file
+                )
+        except (portalocker.LockException, FileNotFoundError, *dbm.error):
+            return None
+
     def close_shelve(self, shelve_obj):
-        s = str(self.lock_file.resolve())
+        s = self._lock_path()
         try:
             with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
                 shelve_obj.close()
@@ -106,140 +244,410 @@ class db:
         except portalocker.LockException as e:
             pass
 
-    def size(self):
+    def size(self, include_cold=False):
+        #the number of tubes, counting the cold tier only if include_cold, like get_IDs(), so
+        #len(get_IDs()) == size(). Read from the metadata when it's up to date, so the database
+        #isn't opened
+        metadata = self.metadata()
+        if metadata is not None and metadata.generation is not None \
+                and metadata.generation == self.generation():
+            return metadata.tubes + (metadata.cold if include_cold else 0)
         #since open_shelve returns the dictionary (either blank or database.s), tube_dict = return_dict
         tube_dict = self.open_shelve()
         number_of_tubes = len(tube_dict)
 
         #close_shelve is an action, not return value
         self.close_shelve(tube_dict)
+        cold = self.open_cold() if include_cold else None
+        if cold is not None:
+            number_of_tubes += len(cold)
+            self.close_shelve(cold)
         return number_of_tubes
 
     def add_tube(self, tube=Tube()):
-        dt = datetime.datetime.now()
-        timestamp = dt.timestamp()
-
-        filename = str(timestamp) + str(random.randrange(0, 999)) + ".tube"
-        #creates a new .tube file named after the data,time and random number. located in new_data
-        file_obj = self.new_data_dir / filename
-        if not file_obj.exists():
-            #parents=True creates any directories that don't exist yet
-            #exist_ok=True does nothing if a directory already exists
-            file_obj.parent.mkdir(parents=True, exist_ok=True)
-
-            #creates file.txt at file_obj path
-            file_obj.touch()
-
-        s = str(self.lock_file.resolve())
-        try:
-            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-
-                #wb+ to write a binary file
-                with file_obj.open('wb+') as f:
-                    #writing tube to file_obj we just opened
-                    #print("writing tube ",tube.get_ID()," to file ",filename)
-                    pickle.dump(tube, f)
-        except portalocker.LockException as e:
-            #print("Error trying to write to database file ",filename)
-            pass
-
-    def get_tube(self, barcode):
+        if tube.is_partial():
+            raise ValueError("can't add a tube loaded with get_tube(stations=...)")
+        #pickles the tube into a new .tube file in new_data, named after the time. See stage(),
+        #no lock is taken, so this never waits on the db_manager
+        stage(self.new_data_dir, ".tube", lambda f: pickle.dump(tube, f))
+
+    def get_tube(self, barcode, stations=None):
+        #stored tubes only unpickle a station when it's first used. Passing a list of station names
+        #loads only those, the returned tube is partial and can't be written back (see Tube.project)
+        #A tube that isn't in the database is looked for in the cold tier
         tubes = self.open_shelve()
         #if the tube with the specific parameter barcode exists, then return it and close the shelf
         try:
             ret_tube = tubes[barcode]
         except KeyError:
             self.close_shelve(tubes)
-            raise KeyError
+            ret_tube = self._get_cold(barcode)
         else:
             self.close_shelve(tubes)
-            return ret_tube
+        if stations is not None:
+            ret_tube.project(stations)
+        return ret_tube
 
-    def get_tubes(self, selection=None):
+    def _get_cold(self, barcode):
+        cold = self.open_cold()
+        if cold is None:
+            raise KeyError
+        try:
+            return cold[barcode]
+        except KeyError:
+            raise KeyError
+        finally:
+            self.close_shelve(cold)
+
+    def get_tubes(self, selection=None, stations=None, include_cold=False):
+        #if selection=None, then returns every tube, and those of the cold tier too if
+        #include_cold is true. The tubes with the IDs in selection are looked for in the cold
+        #tier whenever they aren't in the database. See iter_tubes()
+        return list(self.iter_tubes(selection or None, stations, include_cold))
+
+    def iter_tubes(self, selection=None, stations=None, include_cold=False):
+        #yields the tubes with the IDs in selection, in that order, skipping IDs that aren't
+        #anywhere. Those not in the database are looked for in the cold tier. If selection is
+        #None, yields every tube in the database, and then every tube in the cold tier if
+        #include_cold is true. The database is open until the generator is done or closed
         tubes = self.open_shelve()
-
-        #if selection=None, then goes to else statement
-        #if selection != None, appends the tubes in the list to return list
-        #else, returns the initial tube values
-        if selection:
-            ret_tubes = []
-            for ID in selection:
+        cold = None
+        looked_cold = False
+        try:
+            if selection is None:
+                found = tubes.iterate()
+                if include_cold:
+                    cold = self.open_cold()
+                    if cold is not None:
+                        found = itertools.chain(found, cold.iterate())
+                for ID, tube in found:
+                    if stations is not None:
+                        tube.project(stations)
+                    yield tube
+                return
+            selection = list(selection)
+            for i in range(0, len(selection), _CHUNK):
+                chunk = selection[i:i + _CHUNK]
+                found = dict(tubes.get_many(chunk))
+                missing = [ID for ID in chunk if ID not in found]
+                if missing and not looked_cold:
+                    cold = self.open_cold()
+                    looked_cold = True
+                if missing and cold is not None:
+                    found.update(cold.get_many(missing))
+                for ID in chunk:
+                    if ID in found:
+                        tube = found[ID]
+                        if stations is not None:
+                            tube.project(stations)
+                        yield tube
+        finally:
+            self.close_shelve(tubes)
+            if cold is not None:
+                self.close_shelve(cold)
+
+    def list_headers(self, selection=None, include_cold=False):
+        #yields the TubeHeader of every tube (see header.py) straight from the header store,
+        #without loading any tubes, or only of the tubes with the IDs in selection if given.
+        #As for iter_tubes(), the headers of the cold tier are yielded too if include_cold is
+        #true, and looked in for the IDs in selection. Yields nothing if there is no header store yet
+        s = self._lock_path()
+        try:
+            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+                headers = open_store(self.config.backend, str(self.header_file), 'r')
+        except (portalocker.LockException, *dbm.error):
+            return
+        cold = None
+        try:
+            if selection is None:
+                for key in headers.keys():
+                    if key not in RESERVED_KEYS:
+                        yield headers[key]
+                if include_cold:
+                    cold = self.open_cold(headers=True)
+                    if cold is not None:
+                        for key, header in cold.iterate():
+                            yield header
+            else:
+                missing = []
+                for key in selection:
+                    if key not in RESERVED_KEYS:
+                        if key in headers:
+                            yield headers[key]
+                        else:
+                            missing.append(key)
+                if missing:
+                    cold = self.open_cold(headers=True)
+                    if cold is not None:
+                        for key, header in cold.get_many(missing):
+                            yield header
+        finally:
+            self.close_shelve(headers)
+            if cold is not None:
+                self.close_shelve(cold)
+
+    def get_header(self, barcode):
+        #returns the TubeHeader of one tube, raises KeyError if there is none
+        header = None
+        s = self._lock_path()
+        try:
+            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+                headers = open_store(self.config.backend, str(self.header_file), 'r')
+        except (portalocker.LockException, *dbm.error):
+            raise KeyError(barcode)
+        try:
+            if barcode not in RESERVED_KEYS:
+                header = headers.get(barcode)
+        finally:
+            self.close_shelve(headers)
+        if header is None and barcode not in RESERVED_KEYS:
+            #maybe in the cold tier
+            cold = self.open_cold(headers=True)
+            if cold is not None:
                 try:
-                    ret_tubes.append(tubes[ID])
-                except KeyError:
-                    pass
-        else:
-            ret_tubes = list(tubes.values())
-        self.close_shelve(tubes)
-        return ret_tubes
-
-    def get_IDs(self):
-        #returns keys of dictionary
+                    header = cold.get(barcode)
+                finally:
+                    self.close_shelve(cold)
+        if header is None:
+            raise KeyError(barcode)
+        return header
+
+    def snapshot(self, path):
+        #copies the tubes, as they are now, to a new store at path with the same backend
+        #(database.s for shelve...), and the cold tier (cold.s and cold_headers.s) and the zlib
+        #dictionaries (database.zdict) to the same directory, holding the lock so the db_manager
+        #can't write meanwhile. Returns the files written, see StorageBackend.snapshot()
+        directory = Path(path).parent
+        s = self._lock_path()
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            with open_store(self.config.backend, str(self.db_file.resolve()), 'r') as tubes:
+                files = tubes.snapshot(path)
+            for source in (self.cold_file, self.cold_header_file):
+                if store_exists(self.config.backend, str(source)):
+                    # Copied as stored, still compressed.
+                    with open_store(self.config.backend, str(source), 'r') as store:
+                        files += store.snapshot(str(directory / source.name))
+            # Tubes compressed with a dictionary can't be read without it.
+            if self.config.dictionary_file.exists():
+                copy = directory / self.config.dictionary_file.name
+                shutil.copyfile(str(self.config.dictionary_file), str(copy))
+                files.append(copy)
+        return files
+
+    def generation(self):
+        #returns a value that changes whenever the database does (every tube added, edited or
+        #deleted by the db_manager), or None if it isn't known. The db_manager writes it to a
+        #small file of its own, so this doesn't have to open the header store
+        try:
+            token, seq = self.generation_file.read_text().split()
+            return (token, int(seq))
+        except (OSError, ValueError):
+            return None
+
+    def metadata(self):
+        #returns the DatabaseMetadata (see metadata.py): the number of tubes, of records per station,
+        #when the db_manager last wrote and the files it left in new_data. Read from database.meta,
+        #which the db_manager writes with every update, without the lock. None if there is none yet
+        try:
+            with self.metadata_file.open('rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def wip(self):
+        #returns the WIPCache (see wip.py) of the tubes in production: swaged in the last weeks
+        #and not UMich complete. Read from database.wip, which the db_manager writes, and only
+        #read again once it has changed. An empty cache if there is none yet
+        try:
+            stat = self.wip_file.stat()
+        except OSError:
+            return WIPCache()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._wip is None or self._wip[0] != key:
+            try:
+                with self.wip_file.open('rb') as f:
+                    self._wip = (key, pickle.load(f))
+            except (OSError, EOFError, pickle.UnpicklingError):
+                return WIPCache()
+        return self._wip[1]
+
+    def get_wip(self, barcode):
+        #returns the WIPEntry of a tube in production (its status and the values of its last
+        #swage, tension, leak and dark current records), or None if it isn't in production.
+        #Stations look here first, and load the tube with get_tube() only if it's None
+        return self.wip().get(barcode)
+
+    def query(self, barcodes=None, prefix=None, status=None, status_bentness=None,
+              status_umich=None, mfg_date=None, station=None, where=None,
+              record='any', stations=None, include_cold=False):
+        #yields the tubes matching every given condition, in barcode order. Everything except
+        #where is checked on the tube headers, only the tubes that pass those are loaded.
+        #   barcodes: list of IDs to look at.    prefix: ID starts with this, like 'MSU0'
+        #   status, status_bentness, status_umich: a Status/UMich_Status, or a list of them
+        #   mfg_date: (start, end) dates, start included, end not. Either may be None
+        #   station: only tubes with records at this station, like 'tension'
+        #   where: function returning true for a match. Called with the tube, or if station is
+        #          given with its records: record='any', 'all', 'first' or 'last' of them must match.
+        #          A where that raises AttributeError, TypeError, IndexError or ValueError
+        #          (missing values...) counts as no match
+        #   stations: load only these stations, as in get_tube()
+        #   include_cold: look at the tubes of the cold tier too (see tiering.py)
+        #e.g. query(status=Status.FAIL, station='tension', where=lambda r: r.tension < 340)
+        from sMDT import query as tube_query
+        conditions = tube_query.Query(
+            barcodes, prefix, status, status_bentness, status_umich,
+            mfg_date, station, where, record, include_cold
+        )
+        return tube_query.run(self, conditions, stations)
+
+    def aggregate(self, field, by='day', stats=('count', 'mean', 'std', 'median'),
+                  record='all', **conditions):
+        #statistics of a record field grouped by the records' day, week (keyed by its monday),
+        #month (keyed by its 1st), operator (the record's user), or the tube's UMich endplug type.
+        #field is 'station.field' like 'swage.raw_length', or a station name alone for its
+        #primary field ('tension' is 'tension.tension'). stats are any of count, sum, mean, std,
+        #min, max, median and percentiles like p95. record='first' or 'last' uses only that
+        #record of each tube. conditions are passed to query() to pick the tubes.
+        #Returns an Aggregate, see aggregate.py: result.groups, result['mean'], result.rows()
+        from sMDT import aggregate as record_stats
+        from sMDT import query as tube_query
+        from sMDT.result_cache import cached
+        station, _ = record_stats.parse_field(field)
+        stations = [station, 'umich_misc'] if by == 'endplug' else [station]
+        key = tube_query.Query(station=station, **conditions).key()
+        if key is not None:
+            key = ('aggregate', field, by, tuple(stats), record) + key
+
+        def compute():
+            tubes = self.query(station=station, stations=stations, **conditions)
+            return record_stats.aggregate(tubes, field, by, stats, record)
+        return cached(self.cache, self, key, compute)
+
+    def get_IDs(self, view='list', include_cold=False):
+        #returns the IDs of every tube. view='list' (default) gives a list in no particular order,
+        #'set' a frozenset for fast `in` checks, 'sorted' the IDIndex of id_index().
+        #include_cold adds the IDs of the cold tier (see tiering.py)
+        if include_cold and view in ('list', 'set', 'sorted'):
+            ids = self.get_IDs()
+            cold = self.open_cold(headers=True)
+            if cold is not None:
+                ids += [key for key in cold.keys() if key not in RESERVED_KEYS]
+                self.close_shelve(cold)
+            return {'list': ids, 'set': frozenset(ids), 'sorted': IDIndex(ids)}[view]
+        if view == 'sorted':
+            return self.id_index()
+        if view == 'set':
+            return frozenset(self.id_index())
+        if view != 'list':
+            raise ValueError("view must be 'list', 'set' or 'sorted'")
         tubes = self.open_shelve()
         ret_ids = list(tubes.keys())
         self.close_shelve(tubes)
         return ret_ids
 
+    def id_index(self):
+        #returns the IDIndex of the database (see id_index.py): the sorted IDs, with contains(),
+        #range(start, end) of tube numbers and prefix() scans by binary search. It's read from
+        #database.ids, which the db_manager writes, and only read again once the database changes
+        generation = self.generation()
+        if self._id_index is not None and generation is not None \
+                and generation == self._id_index_generation:
+            return self._id_index
+        try:
+            with self.id_index_file.open('rb') as f:
+                index = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            #no index written yet, make one from the database
+            index = IDIndex(self.get_IDs())
+        self._id_index = index
+        self._id_index_generation = generation
+        return index
+
     def delete_tube(self, tube_id):
         #unless the remove is in umich_tube(), only creates .del.tube, doesn't remove from database
         if type(tube_id) is not str:
             tube_id = tube_id.get_ID()
 
-        dt = datetime.datetime.now()
-        timestamp = dt.timestamp()
-
-        filename = str(timestamp) + str(random.randrange(0, 999)) + ".del.tube"
-        file_obj = self.new_data_dir / filename
-
-        if not file_obj.exists():
-            file_obj.touch()
-
         tube = Tube()
         tube.set_ID(tube_id)
 
-        s = str(self.lock_file.resolve())
-        try:
-            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-                with file_obj.open('wb+') as f:
-                    pickle.dump(tube, f)
-        except portalocker.LockException as e:
-            pass
+        stage(self.new_data_dir, ".del.tube", lambda f: pickle.dump(tube, f))
 
     def overwrite_tube(self, tube):
         #doesn't seem to remove the wrong tube, just edits one of the ids
-        dt = datetime.datetime.now()
-        timestamp = dt.timestamp()
-
-        filename = str(timestamp) + str(random.randrange(0, 999)) + ".edit.tube"
-        file_obj = self.new_data_dir / filename
-
-        if not file_obj.exists():
-            file_obj.touch()
-
-        s = str(self.lock_file.resolve())
-        try:
-            with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-                with file_obj.open('wb+') as f:
-                    pickle.dump(tube, f)
-        except portalocker.LockException as e:
-            pass
+        if tube.is_partial():
+            raise ValueError("can't overwrite with a tube loaded with get_tube(stations=...)")
+        stage(self.new_data_dir, ".edit.tube", lambda f: pickle.dump(tube, f))
+
+    def add_tubes(self, tubes):
+        #add_tube() for every tube in tubes, as one batch: a single file in new_data, which the
+        #db_manager applies whole in one update. Returns the number of tubes staged
+        return self.write_batch(('add', tube) for tube in tubes)
+
+    def delete_tubes(self, tube_ids):
+        #delete_tube() for every ID (or tube) in tube_ids, as one batch, see add_tubes()
+        def entries():
+            for tube_id in tube_ids:
+                tube = Tube()
+                tube.set_ID(tube_id if type(tube_id) is str else tube_id.get_ID())
+                yield ('delete', tube)
+        return self.write_batch(entries())
+
+    def overwrite_tubes(self, tubes):
+        #overwrite_tube() for every tube in tubes, as one batch, see add_tubes()
+        return self.write_batch(('edit', tube) for tube in tubes)
+
+    def write_batch(self, entries):
+        #stages (kind, tube) pairs as one batch, kind being 'add', 'edit' or 'delete' (a tube with
+        #only the ID set), applied in order. The .batch file is their pickles one after the other,
+        #see stage(). Nothing is staged if there are no entries, if a tube is partial or anything
+        #fails. Returns the number of entries staged
+        entries = iter(entries)
+        first = next(entries, None)
+        if first is None:
+            return 0
+        count = 0
+
+        def write(f):
+            nonlocal count
+            for kind, tube in itertools.chain([first], entries):
+                if kind != 'delete' and tube.is_partial():
+                    raise ValueError("can't stage a tube loaded with get_tube(stations=...)")
+                pickle.dump((kind, tube), f)
+                count += 1
+        stage(self.new_data_dir, ".batch", write)
+        return count
 
 
 class db_manager:
-    def __init__(self, db_path=None, archive=True, testing=False):
-        self.dropbox_directory = Path(__file__).resolve().parents[1]
+    def __init__(self, db_path=None, archive=True, testing=False, config=None):
+        # Every path comes from config, see db.__init__()
+        self.config = Config.of(config)
+        self.dropbox_directory = self.config.root
 
-        #if db_path = None, create a new database
-        if not db_path:
-            self.db_file = self.dropbox_directory / 'database.s'
+        #if db_path = None, use the database of config. The header store and
+        #the rest are kept next to db_path otherwise
+        self.db_file = Path(db_path) if db_path else self.config.db_file
 
-        self.lock_file = self.dropbox_directory /'sMDT'/'locks'/'db_lock.lock'
-        self.new_data_dir = self.dropbox_directory / 'sMDT' / 'new_data'
+        self.lock_file = self.config.lock_file
+        self.new_data_dir = self.config.new_data_dir
+        self.quarantine_dir = self.config.quarantine_dir
 
-        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        self.config.make_dirs()
         self.lock_file.touch(exist_ok=True)
 
+        #the stores of the tubes and headers are opened with this backend (see storage.py)
+        self.backend = self.config.backend
         self.path = str(self.db_file.resolve())
+        self.header_path = str(store_path(self.backend, self.db_file.resolve().parent, 'headers'))
+        self.generation_path = self.db_file.resolve().with_name('database.generation')
+        self.id_index_path = self.db_file.resolve().with_name('database.ids')
+        self.metadata_path = self.db_file.resolve().with_name('database.meta')
+        self.wip_path = self.db_file.resolve().with_name('database.wip')
+        #the cold tier (see tier()), and the CSVs of shipped tubes deciding what goes there
+        self.cold_path = str(store_path(self.backend, self.db_file.resolve().parent, 'cold'))
+        self.cold_header_path = str(store_path(self.backend, self.db_file.resolve().parent, 'cold_headers'))
+        self.exported_dir = self.config.exported_dir
         self.archive = archive
         self.testing = testing
 
@@ -248,22 +656,264 @@ class db_manager:
             s = str(self.lock_file.resolve())
             try:
                 with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-                    tubes = shelve.open(self.path, 'n')
+                    open_store(self.backend, self.path, 'n').close()
+                    open_store(self.backend, self.header_path, 'n').close()
+                    for path in (self.cold_path, self.cold_header_path):
+                        if store_exists(self.backend, path):
+                            open_store(self.backend, path, 'n').close()
+                    for path in (self.generation_path, self.id_index_path, self.metadata_path, self.wip_path):
+                        if path.exists():
+                            path.unlink()
             except portalocker.LockException as e:
                 pass
         else:
             raise RuntimeError
 
+    def rebuild_headers(self):
+        #rewrites the header store from database.s. Needed after database.s is changed by anything
+        #other than update(), update() itself does it when there is no header store yet
+        s = str(self.lock_file.resolve())
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            with self._open_tubes() as tubes, open_store(self.backend, self.header_path) as headers:
+                generation = self._rebuild_headers(tubes, headers)
+                metadata = self._count_metadata(headers)
+            self._write_metadata(metadata, generation)
+            self._write_generation(generation)
+
+    def _rebuild_headers(self, tubes, headers):
+        # The sequence number carries on, and the store gets a new token.
+        seq = headers.get(SEQ_KEY, 0)
+        for key in list(headers.keys()):
+            del headers[key]
+        for key in tubes.keys():
+            seq += 1
+            headers[key] = TubeHeader.from_tube(tubes[key], seq)
+        return mark_generation(headers, seq)
+
+    def _write_generation(self, generation):
+        #called once the shelves are closed
+        _replace_file(self.generation_path, "{} {}".format(*generation).encode())
+
+    def _load_metadata(self, headers, cold_headers=None):
+        #the metadata of the last write, if it's of the open header store as it is now,
+        #else everything counted again
+        generation = (headers[STORE_KEY], headers.get(SEQ_KEY, 0)) if STORE_KEY in headers else None
+        try:
+            with self.metadata_path.open('rb') as f:
+                metadata = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            metadata = None
+        if metadata is not None and metadata.generation == generation:
+            return metadata
+        return self._count_metadata(headers, cold_headers)
+
+    def _count_metadata(self, headers, cold_headers=None):
+        #counts the headers in the open header store, and those of the cold tier
+        metadata = DatabaseMetadata.from_headers(headers, RESERVED_KEYS)
+        if cold_headers is not None:
+            metadata.cold = len(cold_headers)
+        elif store_exists(self.backend, self.cold_header_path):
+            with open_store(self.backend, self.cold_header_path, 'r') as cold_headers:
+                metadata.cold = len(cold_headers)
+        return metadata
+
+    def _open_tubes(self, flag='c'):
+        #the tube store, whose tubes are written compressed as the config says (see compression.py)
+        return compression.open_compressed(
+            self.backend, self.path, flag, self.config.compression, self.config.dictionary_file
+        )
+
+    def _open_cold_tubes(self, flag='c'):
+        return tiering.open_cold(
+            self.backend, self.cold_path, flag, self.config.cold_compression, self.config.dictionary_file
+        )
+
+    @contextlib.contextmanager
+    def _open_cold(self):
+        #the open cold store and its header store, or (None, None) if there is no cold tier yet
+        if not store_exists(self.backend, self.cold_path):
+            yield None, None
+            return
+        with self._open_cold_tubes() as cold, \
+                open_store(self.backend, self.cold_header_path) as cold_headers:
+            yield cold, cold_headers
+
+    def _write_metadata(self, metadata, generation):
+        #written before the generation, like the ID index
+        metadata.generation = generation
+        metadata.updated = datetime.datetime.now()
+        metadata.pending = sum(
+            1 for filename in os.listdir(self.new_data_dir) if not filename.endswith(".tmp")
+        ) if self.new_data_dir.exists() else 0
+        _replace_file(self.metadata_path, pickle.dumps(metadata, 4))
+
+    def _load_wip(self, headers):
+        #the WIPCache of the last write, if it's of the open header store as it is now, else None
+        generation = (headers[STORE_KEY], headers.get(SEQ_KEY, 0)) if STORE_KEY in headers else None
+        try:
+            with self.wip_path.open('rb') as f:
+                wip = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return wip if wip.generation == generation else None
+
+    def _write_wip(self, wip, generation):
+        #written before the generation, like the ID index, and only if it changed
+        wip.expire()
+        if wip.changed or wip.generation != generation:
+            wip.generation = generation
+            _replace_file(self.wip_path, pickle.dumps(wip, 4))
+
+    def _read_staged(self, filename):
+        #the tube of a .tube file in new_data, or the (kind, tube) entries of a .batch file.
+        #Raises what pickle.load() does if it's truncated or corrupt
+        with open(os.path.join(self.new_data_dir, filename), 'rb') as new_data_file:
+            if not filename.endswith(".batch"):
+                return pickle.load(new_data_file)
+            entries = []
+            while True:
+                try:
+                    entries.append(pickle.load(new_data_file))
+                except EOFError:
+                    # Only at the very end is it the end of the batch.
+                    if new_data_file.tell() != os.fstat(new_data_file.fileno()).st_size:
+                        raise
+                    return entries
+
+    def _quarantine(self, filename, error, log_activity, logging):
+        #moves a staged file that can't be read out of new_data, so it doesn't stop every later
+        #update. One that may still be being written is left for the next update instead
+        path = Path(self.new_data_dir) / filename
+        if time.time() - path.stat().st_mtime < _STAGING_GRACE:
+            return
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(str(path), str(self.quarantine_dir / filename))
+        line = "Moved unreadable file {} to {} ({!r})".format(filename, self.quarantine_dir, error)
+        log_activity.write(time.strftime("%d-%b-%Y %H:%M:%S") + "\t" + line + "\n")
+        if logging:
+            print(line)
+
+    def _write_id_index(self, ids):
+        #written before the generation, so a reader that sees the new generation gets the new index
+        _replace_file(self.id_index_path, pickle.dumps(IDIndex(ids), 4))
+
+    def migrate(self, workers=None, chunk_size=500, logging=True):
+        #rewrites every tube stored with an older schema version (see schema.py and migrate.py)
+        #directly in database.s, holding the lock the whole time. Don't run update() meanwhile
+        from sMDT import migrate
+        s = str(self.lock_file.resolve())
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            with self._open_tubes() as tubes, open_store(self.backend, self.header_path) as headers:
+                if len(headers) == 0 and len(tubes) != 0:
+                    self._rebuild_headers(tubes, headers)
+                result = migrate.migrate(tubes, headers, workers, chunk_size, logging)
+                generation = (headers[STORE_KEY], headers[SEQ_KEY])
+                metadata = self._count_metadata(headers)
+            self._write_metadata(metadata, generation)
+            self._write_generation(generation)
+        return result
+
+    def compress(self, new_dictionary=True, samples=500, logging=True):
+        #rewrites every tube of the database and of the cold tier compressed as the config says
+        #(see compression.py), after building a new zlib dictionary from samples tubes if
+        #new_dictionary and either uses zlib. Only needed to compress the tubes already there when the compression is
+        #changed, update() writes new ones compressed. Holds the lock the whole time, like
+        #migrate(). Returns the number of tubes rewritten
+        codecs = (self.config.compression, self.config.cold_compression)
+        s = str(self.lock_file.resolve())
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            if new_dictionary and 'zlib' in codecs:
+                with self._open_tubes() as tubes:
+                    found = compression.sample(tubes, samples)
+                if not found and store_exists(self.backend, self.cold_path):
+                    with self._open_cold_tubes() as cold:
+                        found = compression.sample(cold, samples)
+                if found:
+                    compression.save_dictionary(
+                        self.config.dictionary_file, compression.concatenated_dictionary(found)
+                    )
+            count = 0
+            for path, codec in ((self.path, codecs[0]), (self.cold_path, codecs[1])):
+                if path == self.path or store_exists(self.backend, path):
+                    count += compression.recompress(self.backend, path, codec, self.config.dictionary_file)
+        if logging:
+            print(count, "tubes compressed with", codecs[0] or "none", "and", codecs[1] or "none",
+                  "at", time.strftime("%H:%M:%S"))
+        return count
+
+    def compact(self, logging=True):
+        #gives back the space of the tubes deleted or moved to the cold tier (tier() and compress()
+        #leave it), so the database gets smaller on disk, not only emptier. A shelve is copied and the
+        #copy takes its place, under any program still reading the old files, so only run this while
+        #no other program has the database open, like migrate()
+        s = str(self.lock_file.resolve())
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            for path in (self.path, self.header_path, self.cold_path, self.cold_header_path):
+                if store_exists(self.backend, path):
+                    compact_store(self.backend, path)
+        if logging:
+            print("Database compacted at", time.strftime("%H:%M:%S"))
+
+    def tier(self, shipped=None, logging=True):
+        #moves every tube that belongs in the cold tier (UMich complete or shipped, see
+        #tiering.py) from database.s to the compressed cold store, with its header. shipped is
+        #the set of barcodes of shipped tubes, read from the CSVs in Exported_Tubes if None.
+        #update() moves a cold tube back whenever it writes to it. Returns the number moved
+        if shipped is None:
+            shipped = tiering.shipped_barcodes(self.exported_dir)
+        s = str(self.lock_file.resolve())
+        with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
+            with self._open_tubes() as tubes, open_store(self.backend, self.header_path) as headers, \
+                    self._open_cold_tubes() as cold, \
+                    open_store(self.backend, self.cold_header_path) as cold_headers:
+                if len(headers) == 0 and len(tubes) != 0:
+                    self._rebuild_headers(tubes, headers)
+                seq = headers.get(SEQ_KEY, 0)
+                metadata = self._load_metadata(headers, cold_headers)
+                wip = self._load_wip(headers)
+                if wip is None:
+                    wip = WIPCache.build(tubes, headers, RESERVED_KEYS)
+                moving = {
+                    key: header for key, header in headers.iterate()
+                    if key not in RESERVED_KEYS and tiering.is_cold(header, shipped)
+                }
+                keys = sorted(moving)
+                for i in range(0, len(keys), _CHUNK):
+                    chunk = keys[i:i + _CHUNK]
+                    # The pickles are copied as they are, and only compressed.
+                    cold.put_batch(tubes.get_many(chunk, raw=True), raw=True)
+                    cold_headers.put_batch((key, moving[key]) for key in chunk)
+                    for key in chunk:
+                        del tubes[key]
+                        del headers[key]
+                        metadata.replace(moving[key], None)
+                        wip.discard(key)
+                metadata.cold += len(keys)
+                if keys:
+                    seq += 1
+                generation = mark_generation(headers, seq)
+                ids = list(tubes.keys()) if keys else None
+            if ids is not None:
+                self._write_id_index(ids)
+            self._write_metadata(metadata, generation)
+            self._write_wip(wip, generation)
+            self._write_generation(generation)
+        if logging:
+            print(len(keys), "tubes moved to the cold tier at", time.strftime("%H:%M:%S"))
+        return len(keys)
+
     def cleanup(self):
         for file_obj in self.new_data_dir.iterdir():
             file_obj.unlink()
 
     def update(self, logging=True):
         if not self.testing:
+            from sMDT.legacy import station_pickler
             pickler = station_pickler(
                 os.path.dirname(self.path), 
                 archive=self.archive, 
-                logging=logging
+                logging=logging,
+                sMDT_DIR=str(self.config.package_dir)
             )
             pickler.pickle_swage()
             pickler.pickle_tension()
@@ -277,13 +927,29 @@ class db_manager:
         s = str(self.lock_file.resolve())
         
         with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-            with shelve.open(self.path) as tubes:
-                log_activity = open('activity.log', 'a')
+            with self._open_tubes() as tubes, open_store(self.backend, self.header_path) as headers, \
+                    self._open_cold() as (cold, cold_headers):
+                log_activity = open(str(self.config.activity_log), 'a')
+
+                # Every tube written gets its header rewritten with the next
+                # sequence number. A database from before the header store
+                # existed gets all of its headers made first.
+                if len(headers) == 0 and len(tubes) != 0:
+                    self._rebuild_headers(tubes, headers)
+                seq = headers.get(SEQ_KEY, 0)
+                # Only if tubes were added or deleted is the ID index written again.
+                ids_changed = not self.id_index_path.exists()
+                # The counts are carried on from the last update, and only
+                # counted again from the headers if they're missing or stale.
+                metadata = self._load_metadata(headers, cold_headers)
+                # Likewise the cache of the tubes in production, built once
+                # everything is written if it's missing or stale.
+                wip = self._load_wip(headers)
 
                 # Check if the stored database is more recent.
-                if not (len(tubes) or len(tubes) < 50) and not self.testing:
+                if not (metadata.tubes or metadata.tubes < 50) and not self.testing:
                     print("\nThe Database has been corrupted. ") 
-                    print_str = "Size is {}.\n".format(len(tubes))
+                    print_str = "Size is {}.\n".format(metadata.tubes)
                     print_str += "The database will continue to sync. \n"
                     print(print_str)
                     t = datetime.datetime.now()
@@ -302,23 +968,35 @@ class db_manager:
 
                 addcount = editcount = delcount = 0
                 t = time.localtime()
-                #
-                # loop over files in new_data directory
-                for filename in os.listdir(self.new_data_dir):
-                    new_data_file = open(
-                        os.path.join(self.new_data_dir, filename), 'rb'
-                    ) 
 
-                    try:
-                        tube = pickle.load(new_data_file) 
-                        new_data_file.close()
-                    except EOFError:
-                        # this file is being written to as we're trying to open it, skip for now
-                        continue
-
-                    if filename.endswith(".del.tube"):
+                def thaw(ID):
+                    # Moves the tube back from the cold tier, if it's there,
+                    # so it's written like any other.
+                    nonlocal ids_changed
+                    if cold is None or ID not in cold:
+                        return
+                    tubes.put_batch(cold.get_many([ID], raw=True), raw=True)
+                    header = cold_headers.pop(ID)
+                    del cold[ID]
+                    headers[ID] = header
+                    metadata.cold -= 1
+                    metadata.replace(None, header)
+                    ids_changed = True
+
+                def apply(kind, tube):
+                    # Deletes, edits or adds one tube, kind being 'delete',
+                    # 'edit' or 'add'.
+                    nonlocal seq, ids_changed, addcount, editcount, delcount
+                    if tube.get_ID() not in tubes:
+                        thaw(tube.get_ID())
+                    if kind == 'delete':
                         if tube.get_ID() in tubes:
                             del tubes[tube.get_ID()]
+                            metadata.replace(headers.pop(tube.get_ID(), None), None)
+                            if wip is not None:
+                                wip.discard(tube.get_ID())
+                            seq += 1
+                            ids_changed = True
                             if logging:
                                 log_activity.write(
                                     time.strftime("%d-%b-%Y %H:%M:%S", t) 
@@ -347,7 +1025,7 @@ class db_manager:
                                     ", tube not found."
                                 )
 
-                    elif filename.endswith(".edit.tube"):
+                    elif kind == 'edit':
                         if logging:
                             log_activity.write(
                                 time.strftime("%d-%b-%Y %H:%M:%S", t) 
@@ -361,9 +1039,17 @@ class db_manager:
                                 "due to edit"
                             )
                             editcount += 1
+                        if tube.get_ID() not in tubes:
+                            ids_changed = True
                         tubes[tube.get_ID()] = tube
+                        seq += 1
+                        header = TubeHeader.from_tube(tube, seq)
+                        metadata.replace(headers.get(tube.get_ID()), header)
+                        headers[tube.get_ID()] = header
+                        if wip is not None:
+                            wip.update(tube, header)
 
-                    elif filename.endswith(".tube"):
+                    else:
                         if logging:
                             log_activity.write(
                                 time.strftime("%d-%b-%Y %H:%M:%S", t) 
@@ -381,12 +1067,51 @@ class db_manager:
                         if tube.get_ID() in tubes: 
                             # add the tubes to the database
                             #print("Tube ",tube.get_ID()," already exists")
-                            temp = tubes[tube.get_ID()] + tube
+                            temp = tubes[tube.get_ID()]
+                            temp.merge_from(tube)
                             tubes[tube.get_ID()] = temp
+                            tube = temp
                         else:
                             tubes[tube.get_ID()] = tube
+                            ids_changed = True
+                        # After the tube is stored, so the stations the header
+                        # decodes aren't pickled again.
+                        seq += 1
+                        header = TubeHeader.from_tube(tube, seq)
+                        metadata.replace(headers.get(tube.get_ID()), header)
+                        headers[tube.get_ID()] = header
+                        if wip is not None:
+                            wip.update(tube, header)
 
                         addcount += 1
+
+                #
+                # loop over files in new_data directory, oldest first (see stage())
+                for filename in sorted(os.listdir(self.new_data_dir)):
+                    if filename.endswith(".tmp"):
+                        # Still being written, see stage().
+                        continue
+                    try:
+                        staged = self._read_staged(filename)
+                    except _UNREADABLE as e:
+                        self._quarantine(filename, e, log_activity, logging)
+                        continue
+                    if filename.endswith(".batch"):
+                        # Every entry is read before any is applied, so a
+                        # batch goes in whole.
+                        for kind, tube in staged:
+                            apply(kind, tube)
+                        os.remove(os.path.join(self.new_data_dir, filename))
+                        continue
+
+                    tube = staged
+
+                    if filename.endswith(".del.tube"):
+                        apply('delete', tube)
+                    elif filename.endswith(".edit.tube"):
+                        apply('edit', tube)
+                    elif filename.endswith(".tube"):
+                        apply('add', tube)
                     else:
                         if logging:
                             print("Unrecognized file type in new_data folder")
@@ -394,6 +1119,10 @@ class db_manager:
                     # delete the file that we added the tube from
                     os.remove(os.path.join(self.new_data_dir, filename))  
 
+                generation = mark_generation(headers, seq)
+                if wip is None:
+                    wip = WIPCache.build(tubes, headers, RESERVED_KEYS)
+                ids = list(tubes.keys()) if ids_changed else None
                 t = time.localtime()
                 if logging:
                     print(
@@ -406,3 +1135,8 @@ class db_manager:
                         time.strftime("%H:%M:%S", t)
                     )
                 log_activity.close()
+            if ids is not None:
+                self._write_id_index(ids)
+            self._write_metadata(metadata, generation)
+            self._write_wip(wip, generation)
+            self._write_generation(generation)
@@ -13,10 +13,10 @@
 #       locking library.
 #  Notes:
 #   - This is renamed to db_legacy.py because it only contains MSU information for tubes
+#   - The shelve is opened through storage.py, like the one of db.py
 #
 ###############################################################################
 
-import shelve
 import pickle
 import time
 import datetime
@@ -31,6 +31,7 @@ from pathlib import Path
 from sMDT.MSU_only_tube import MSU_only_Tube
 from sMDT.old_legacy import station_pickler
 from sMDT import DBLogger
+from sMDT.storage import open_store
 
 logging = False
 
@@ -84,8 +85,8 @@ class db:
                 #remembering self.db_file is the database.s
                 db_file = str(self.db_file.resolve())
 
-                #'r' is just a read only file
-                return_dict = shelve.open(db_file, 'r')
+                #'r' is just a read only file, a shelve store (see storage.py)
+                return_dict = open_store('shelve', db_file, 'r')
         except portalocker.LockException:
             # Just in-case we can't open the database, we'll return an
             # empty dictionary.
@@ -160,12 +161,7 @@ class db:
         #if selection != None, appends the tubes in the list to return list
         #else, returns the initial tube values
         if selection:
-            ret_tubes = []
-            for ID in selection:
-                try:
-                    ret_tubes.append(tubes[ID])
-                except KeyError:
-                    pass
+            ret_tubes = [tube for ID, tube in tubes.get_many(selection)]
         else:
             ret_tubes = list(tubes.values())
         self.close_shelve(tubes)
@@ -246,7 +242,7 @@ class db_manager:
             s = str(self.lock_file.resolve())
             try:
                 with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-                    tubes = shelve.open(self.path, flag='n')
+                    tubes = open_store('shelve', self.path, 'n')
             except portalocker.LockException as e:
                 pass
         else:
@@ -274,7 +270,7 @@ class db_manager:
         s = str(self.lock_file.resolve())
         
         with portalocker.Lock(s, 'r+', timeout=30) as locked_file:
-            with shelve.open(self.path) as tubes:
+            with open_store('shelve', self.path) as tubes:
                 log_activity = open('old_activity.log', 'a')
 
                 # Check if the stored database is more recent.
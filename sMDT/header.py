@@ -0,0 +1,104 @@
+###############################################################################
+#   File: header.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The TubeHeader class, a small summary of a tube (barcode,
+#       manufacture date, statuses, record counts) that the database keeps
+#       next to each tube, so tubes can be listed, sorted and filtered
+#       without loading them. See db.list_headers().
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import re
+
+from .data.status import Status, UMich_Status
+
+
+class TubeHeader:
+    """
+    The summary of a tube stored in the header store. seq is the value of
+    the database's write counter when the tube was last written, so a
+    larger seq means a more recent change.
+    """
+    def __init__(self, barcode=None, number=None, mfg_date=None,
+                 status_code=None, status_bentness_code=None,
+                 status_umich_code=None, counts=None, seq=0):
+        self.barcode = barcode
+        self.number = number
+        self.mfg_date = mfg_date
+        self.status_code = status_code
+        self.status_bentness_code = status_bentness_code
+        self.status_umich_code = status_umich_code
+        # Station name -> number of records, for stations that have any.
+        self.counts = counts if counts is not None else {}
+        self.seq = seq
+
+    @staticmethod
+    def from_tube(tube, seq=0):
+        """Builds the header of a tube."""
+        counts = {}
+        for name in tube.station_names:
+            station = tube.peek(name)
+            if station is not None and station.m_records:
+                counts[name] = len(station.m_records)
+        header = TubeHeader(
+            barcode=tube.get_ID(),
+            number=barcode_number(tube.get_ID()),
+            mfg_date=tube.get_mfg_date(),
+            counts=counts,
+            seq=seq
+        )
+        # A tube whose data is too broken to give a status still gets a
+        # header, with no status.
+        try:
+            header.status_code = int(tube.status())
+            header.status_bentness_code = int(tube.status_bentness())
+            umich = tube.status_umich()
+            header.status_umich_code = None if umich is None else int(umich)
+        except Exception:
+            pass
+        return header
+
+    def status(self):
+        """The tube's status(), as a Status, or None if it had none."""
+        if self.status_code is None:
+            return None
+        return Status(self.status_code)
+
+    def status_bentness(self):
+        """The tube's status_bentness(), as a Status, or None."""
+        if self.status_bentness_code is None:
+            return None
+        return Status(self.status_bentness_code)
+
+    def status_umich(self):
+        """The tube's status_umich(), as a UMich_Status or None."""
+        if self.status_umich_code is None:
+            return None
+        return UMich_Status(self.status_umich_code)
+
+    def count(self, station):
+        """The number of records the station called station has."""
+        return self.counts.get(station, 0)
+
+    def __repr__(self):
+        status = self.status()
+        name = status.name if status is not None else None
+        return f"TubeHeader({self.barcode}, {name}, seq={self.seq})"
+
+
+def barcode_number(barcode):
+    """
+    The number of a barcode, for example 1234 for MSU01234: the digits
+    after its letters. None if it isn't letters followed by digits.
+    """
+    match = _BARCODE.match(barcode or '')
+    return int(match.group(1)) if match else None
+
+
+_BARCODE = re.compile(r'[A-Za-z]*(\d+)\Z')
@@ -0,0 +1,82 @@
+###############################################################################
+#   File: id_index.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The IDIndex class, the sorted list of every tube ID in the
+#       database. The db_manager writes it next to the database whenever
+#       tubes are added or deleted, and db.id_index() reads it. Checking if
+#       a tube is in the database, listing tubes by number range or by
+#       barcode prefix are binary searches instead of going through every
+#       ID.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+from bisect import bisect_left, bisect_right
+
+from .header import barcode_number
+
+
+class IDIndex:
+    """
+    The sorted tube IDs, and the IDs that have a number (see
+    header.barcode_number) sorted by that number. Iterating gives the IDs in
+    sorted order.
+    """
+    def __init__(self, ids=()):
+        self.ids = sorted(ids)
+        numbered = []
+        for barcode in self.ids:
+            number = barcode_number(barcode)
+            if number is not None:
+                numbered.append((number, barcode))
+        numbered.sort()
+        self.numbers = [number for number, barcode in numbered]
+        self.numbered_ids = [barcode for number, barcode in numbered]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __getitem__(self, i):
+        return self.ids[i]
+
+    def __contains__(self, barcode):
+        return self.contains(barcode)
+
+    def __repr__(self):
+        return f"IDIndex({len(self.ids)} tubes)"
+
+    def contains(self, barcode):
+        """
+        True if a tube with this ID is in the database. An int is looked up
+        as a tube number, so contains(1234) is true if MSU01234 is there.
+        """
+        if isinstance(barcode, int):
+            i = bisect_left(self.numbers, barcode)
+            return i < len(self.numbers) and self.numbers[i] == barcode
+        i = bisect_left(self.ids, barcode)
+        return i < len(self.ids) and self.ids[i] == barcode
+
+    def range(self, start=None, end=None):
+        """
+        The IDs with a number from start up to but not including end, in
+        order of their numbers. Either may be None to leave that side open.
+        """
+        lo = 0 if start is None else bisect_left(self.numbers, start)
+        hi = len(self.numbers) if end is None else bisect_left(self.numbers, end)
+        return self.numbered_ids[lo:hi]
+
+    def prefix(self, prefix):
+        """The IDs starting with prefix, in sorted order."""
+        lo = bisect_left(self.ids, prefix)
+        # Every string starting with prefix sorts before prefix + the
+        # highest character.
+        hi = bisect_right(self.ids, prefix + '\U0010ffff', lo)
+        return self.ids[lo:hi]
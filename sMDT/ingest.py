@@ -0,0 +1,218 @@
+###############################################################################
+#   File: ingest.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: A long running worker taking measurements from LabVIEW, one
+#       line each, instead of starting Python once per measurement with the
+#       *_to_tube.py scripts. Every line becomes a tube with one record,
+#       which goes into an outbox (see outbox.py), so the worker answers
+#       right away and the tubes are staged in batches in the background.
+#
+#       A line is the station and the same fields the *_to_tube.py scripts
+#       take, separated by tabs:
+#           leak            name, leak rate, barcode, date
+#           tension         name, tension, frequency, date, barcode
+#           dark_current    name, dark current, date, barcode
+#       with the dates as LabVIEW writes them, see LEAK_DATE and the like.
+#       The worker answers every line with "ok <barcode>" or "error
+#       <message>". "flush" stages everything journaled before answering.
+#
+#       The *_to_tube.py scripts LabVIEW runs per measurement hand their
+#       line to a worker on 127.0.0.1:PORT with submit(), and only journal
+#       the tube in an outbox themselves if no worker is running.
+#
+#   Usage: python -m sMDT.ingest [--port N] [--name NAME]
+#       Without --port, lines are read from stdin and answers written to
+#       stdout. With it, the worker listens on 127.0.0.1:N, and any number of
+#       connections can send lines. The scripts look for it on PORT.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import sys
+import socket
+import argparse
+import datetime
+import socketserver
+
+from .tube import Tube
+from .data.leak import LeakRecord
+from .data.tension import TensionRecord
+from .data.dark_current import DarkCurrentRecord
+
+# The date formats LabVIEW sends, like 05/31/20262:15 PM (no space before
+# the hour) and 31.05.2026 14.15.00.
+LEAK_DATE = '%m/%d/%Y%I:%M %p'
+TENSION_DATE = '%d.%m.%Y %H.%M.%S'
+DARK_CURRENT_DATE = '%m/%d/%Y%I:%M %p'
+
+# Where submit() looks for a worker.
+PORT = 5757
+
+
+def _tube(barcode):
+    tube = Tube()
+    tube.set_ID(barcode)
+    return tube
+
+
+def leak_tube(name, leak, barcode, date):
+    """A tube with one leak record, from the fields LabVIEW sends."""
+    tube = _tube(barcode)
+    tube.leak.add_record(LeakRecord(
+        leak_rate=float(leak), date=datetime.datetime.strptime(date, LEAK_DATE), user=name
+    ))
+    return tube
+
+
+def tension_tube(name, tension, frequency, date, barcode):
+    """A tube with one tension record, from the fields LabVIEW sends."""
+    tube = _tube(barcode)
+    tube.tension.add_record(TensionRecord(
+        tension=float(tension), frequency=float(frequency),
+        date=datetime.datetime.strptime(date, TENSION_DATE), user=name
+    ))
+    return tube
+
+
+def dark_current_tube(name, dark_current, date, barcode):
+    """A tube with one dark current record, from the fields LabVIEW sends."""
+    tube = _tube(barcode)
+    tube.dark_current.add_record(DarkCurrentRecord(
+        dark_current=float(dark_current),
+        date=datetime.datetime.strptime(date, DARK_CURRENT_DATE), user=name
+    ))
+    return tube
+
+
+# Station -> the function making the tube of a line's fields.
+STATIONS = {
+    'leak': leak_tube,
+    'tension': tension_tube,
+    'dark_current': dark_current_tube,
+}
+
+
+def parse(line):
+    """The tube of one line. Raises ValueError if the line isn't valid."""
+    station, *fields = line.rstrip('\r\n').split('\t')
+    make = STATIONS.get(station)
+    if make is None:
+        raise ValueError(f"unknown station {station!r}")
+    try:
+        return make(*fields)
+    except TypeError:
+        raise ValueError(f"wrong number of fields for {station}") from None
+
+
+def handle(line, outbox):
+    """Puts the tube of line into outbox. Returns the answer to send back."""
+    line = line.strip('\r\n')
+    if line == 'flush':
+        try:
+            return f"ok {outbox.flush()}"
+        except Exception as error:
+            return f"error {error}"
+    try:
+        tube = parse(line)
+    except ValueError as error:
+        return f"error {error}"
+    outbox.add_tube(tube)
+    return f"ok {tube.get_ID()}"
+
+
+def serve(lines, outbox, answer=None):
+    """
+    Handles every line of the iterable lines, blank ones aside. answer is
+    called with every answer, if given.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        result = handle(line, outbox)
+        if answer is not None:
+            answer(result)
+
+
+def serve_socket(port, outbox):
+    """Listens on 127.0.0.1:port until interrupted, every connection sends lines."""
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def answer(result):
+                self.wfile.write(result.encode() + b'\n')
+                self.wfile.flush()
+            serve((line.decode() for line in self.rfile), outbox, answer)
+
+    with socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler) as server:
+        server.daemon_threads = True
+        server.serve_forever()
+
+
+def send(station, *fields, port=PORT, timeout=10):
+    """
+    Sends the line of one measurement to the worker on 127.0.0.1:port and
+    returns its answer. Raises ConnectionError (an OSError) if no worker
+    is listening, in which case nothing was sent.
+    """
+    line = '\t'.join((station,) + tuple(str(field) for field in fields)) + '\n'
+    try:
+        connection = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+    except OSError as error:
+        raise ConnectionError(f"no ingest worker on port {port}") from error
+    # Once connected, a failure isn't retried another way, the worker may
+    # have the line already.
+    with connection, connection.makefile('rb') as answers:
+        connection.sendall(line.encode())
+        return answers.readline().decode().strip()
+
+
+def submit(station, *fields, port=PORT, name='labview'):
+    """
+    Takes one measurement from a *_to_tube.py script: sends it to the worker
+    if one is running, else journals its tube in the outbox called name, to
+    be staged right away or by a later run. Returns the barcode. Raises
+    ValueError if the fields aren't valid.
+    """
+    try:
+        answer = send(station, *fields, port=port)
+    except ConnectionError:
+        from .outbox import Outbox
+        tube = parse('\t'.join((station,) + tuple(str(field) for field in fields)))
+        with Outbox(name) as outbox:
+            outbox.add_tube(tube)
+        return tube.get_ID()
+    status, _, detail = answer.partition(' ')
+    if status != 'ok':
+        raise ValueError(detail or "no answer from the ingest worker")
+    return detail
+
+
+def main(argv=None):
+    from .outbox import Outbox
+
+    parser = argparse.ArgumentParser(description="Takes LabVIEW measurements, one line each.")
+    parser.add_argument('--port', type=int, default=None,
+                        help="listen on 127.0.0.1:PORT instead of reading stdin")
+    parser.add_argument('--name', default='ingest',
+                        help="name of the outbox journal (default: ingest)")
+    args = parser.parse_args(argv)
+
+    with Outbox(args.name) as outbox:
+        if args.port is None:
+            def answer(result):
+                print(result, flush=True)
+            serve(sys.stdin, outbox, answer)
+        else:
+            try:
+                serve_socket(args.port, outbox)
+            except KeyboardInterrupt:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
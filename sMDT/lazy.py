@@ -0,0 +1,35 @@
+###############################################################################
+#   File: lazy.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: lazy_import(), for modules that are slow to import and not
+#       needed by every program importing sMDT. The module is only really
+#       imported when one of its attributes is first used.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import sys
+import importlib.util
+
+
+def lazy_import(name):
+    """
+    Returns the top level module name, imported on first attribute access.
+    If it's imported already, that module is returned.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -10,6 +10,7 @@
 #
 #   Modifications:
 #   2020-06 Sara Sawford, Add UMIch information pickling
+#   2026-10 station_pickler takes the sMDT directory, for databases outside the repository
 #
 ###############################################################################
 
@@ -42,12 +43,14 @@ class station_pickler:
 
     sMDT_DIR = os.path.dirname(os.path.abspath(__file__))
     
-    def __init__(self, path, archive=True, logging=True):
+    def __init__(self, path, archive=True, logging=True, sMDT_DIR=None):
         '''
         Constructor, builds the pickler object. Gets the path to the directory it should look for/create the relevant
-        files in
+        files in, and optionally the sMDT directory the pickled tubes go in (see config.Config.package_dir)
         '''
         self.path = path
+        if sMDT_DIR is not None:
+            self.sMDT_DIR = sMDT_DIR
         self.archive = archive
         self.error_files = {'Swage': set(), 'Tension': set(), 'Leak': set(), 'DarkCurrent': set(), 'Bentness': set()}
         self.logging = logging
@@ -8,6 +8,9 @@
 #   These will be general purpose, in the off chance we need mutex for anything else
 #       
 #
+#   Modifications:
+#   2026-10, the lock directory follows config.Config, see lock_dir()
+#
 #   Known Issues:
 #
 #   Workarounds:
@@ -22,12 +25,14 @@ class Lock:
     sMDT_DIR = os.path.dirname(os.path.abspath(__file__))
     LOCK_DIR = os.path.join(sMDT_DIR, "locks")
 
-    def __init__(self, key=""):
+    def __init__(self, key="", config=None):
         '''
-        Constructor, gets the locks key. Builds the lock's path out of the key
+        Constructor, gets the locks key. Builds the lock's path out of the key, in the lock
+        directory of config (see config.py) if given, or of $SMDT_ROOT if it's set
         '''
         self.key = key 
         self.locked_by_this = False
+        self.LOCK_DIR = Lock.lock_dir(config)
         self.lock_path = os.path.join(self.LOCK_DIR, key + ".lock")
 
     def lock(self):
@@ -35,7 +40,7 @@ class Lock:
         This Lock becomes locked. A file key.lock is written to the lock path
         '''
         if not os.path.isdir(self.LOCK_DIR):
-            os.mkdir(self.LOCK_DIR)
+            os.makedirs(self.LOCK_DIR)
         lock = open(self.lock_path, 'a')
         lock.write(self.key + " locked.")
         self.locked_by_this = True
@@ -67,8 +72,18 @@ class Lock:
             self.unlock()
 
     @classmethod
-    def cleanup(Lock):
-        if not os.path.isdir(Lock.LOCK_DIR):
-            os.mkdir(Lock.LOCK_DIR)
-        for filename in os.listdir(Lock.LOCK_DIR):
-            os.remove(os.path.join(Lock.LOCK_DIR, filename))
\ No newline at end of file
+    def lock_dir(Lock, config=None):
+        '''
+        The lock directory of config, or Lock.LOCK_DIR if there is no config and $SMDT_ROOT isn't set
+        '''
+        from .config import Config
+        config = Config.of(config)
+        return Lock.LOCK_DIR if config.is_default else str(config.lock_dir)
+
+    @classmethod
+    def cleanup(Lock, config=None):
+        lock_dir = Lock.lock_dir(config)
+        if not os.path.isdir(lock_dir):
+            os.makedirs(lock_dir)
+        for filename in os.listdir(lock_dir):
+            os.remove(os.path.join(lock_dir, filename))
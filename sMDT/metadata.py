@@ -0,0 +1,72 @@
+###############################################################################
+#   File: metadata.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: The DatabaseMetadata class, a few numbers about the whole
+#       database: how many tubes, how many records per station, when the
+#       db_manager last wrote and what was left in new_data. The db_manager
+#       keeps it up to date with every update, from the headers it writes
+#       anyway, and writes it next to the database (database.meta), so
+#       db.size() and db.metadata() don't have to open the database.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+
+class DatabaseMetadata:
+    """
+    Counts of the database as of generation, see db.generation(). tubes and
+    records (station name -> number of records in that station over every
+    tube) leave out the cold tier (see tiering.py), which has cold tubes.
+    updated is when the db_manager last wrote it, and pending the number of
+    files it left in new_data then, staged while it was updating.
+    """
+    def __init__(self, tubes=0, records=None, generation=None, updated=None, pending=0, cold=0):
+        self.tubes = tubes
+        self.records = records if records is not None else {}
+        self.cold = cold
+        self.generation = generation
+        self.updated = updated
+        self.pending = pending
+
+    @staticmethod
+    def from_headers(headers, skip=()):
+        """
+        Counts the tubes and records of the TubeHeaders in headers, a dict or
+        open header store, leaving out the keys in skip.
+        """
+        metadata = DatabaseMetadata()
+        for key, header in headers.items():
+            if key not in skip:
+                metadata.replace(None, header)
+        return metadata
+
+    def replace(self, old, new):
+        """
+        Counts a tube written with the header new instead of old. old is
+        None for a tube that wasn't there, new for one deleted.
+        """
+        for header, sign in ((old, -1), (new, 1)):
+            if header is None:
+                continue
+            self.tubes += sign
+            for name, count in header.counts.items():
+                total = self.records.get(name, 0) + sign * count
+                if total:
+                    self.records[name] = total
+                else:
+                    self.records.pop(name, None)
+
+    def count(self, station=None):
+        """The number of records of the station called station, or of all of them."""
+        if station is None:
+            return sum(self.records.values())
+        return self.records.get(station, 0)
+
+    def __repr__(self):
+        return (f"DatabaseMetadata({self.tubes} tubes, {self.count()} records, "
+                f"cold={self.cold}, pending={self.pending})")
@@ -0,0 +1,160 @@
+###############################################################################
+#   File: migrate.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Rewrites every tube in the database that was stored with an
+#       older schema version (see schema.py) in the current one. Tubes are
+#       read from the store in chunks, unpickled, upgraded and pickled
+#       again by a pool of worker processes, and written straight back into
+#       the store, with their headers. Nothing goes through new_data.
+#
+#       Tubes get upgraded whenever they're loaded anyway, so this is never
+#       needed for correctness. It saves doing that on every load, and
+#       stores old tubes in the current shape, where loading a tube only
+#       unpickles the stations that are used.
+#
+#   Usage: python -m sMDT.migrate [--workers N] [--chunk-size N]
+#       The DatabaseManager must not be running, the migration holds the
+#       database lock until it's done.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import sys
+import time
+import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .tube import Tube, STATION_PROTOCOL
+from .header import TubeHeader
+from .schema import SCHEMA_VERSION, loaded_version
+
+
+class MigrationResult:
+    """What a migration did: how many tubes it read, upgraded and skipped."""
+    def __init__(self):
+        self.read = 0
+        self.upgraded = 0
+        # Entries that aren't tubes, or couldn't be unpickled, are left as
+        # they are.
+        self.skipped = []
+
+    def __str__(self):
+        return (
+            f"{self.read} tubes read, {self.upgraded} upgraded to schema "
+            f"version {SCHEMA_VERSION}, {len(self.skipped)} skipped"
+        )
+
+
+def migrate_chunk(items):
+    """
+    Upgrades a chunk of (key, pickled tube) pairs. Returns a list of
+    (key, new pickle, header) for the upgraded tubes, (key, None, None) for
+    the ones already current and (key, None, error message) for the ones
+    that couldn't be loaded. Runs in the worker processes.
+    """
+    results = []
+    for key, data in items:
+        try:
+            tube = pickle.loads(data)
+        except Exception as error:
+            results.append((key, None, f"{type(error).__name__}: {error}"))
+            continue
+        if not isinstance(tube, Tube):
+            results.append((key, None, f"not a tube ({type(tube).__name__})"))
+        elif loaded_version(tube) == SCHEMA_VERSION:
+            results.append((key, None, None))
+        else:
+            # Pickled before the header is built, so the stations the
+            # header decodes aren't pickled twice.
+            data = pickle.dumps(tube, STATION_PROTOCOL)
+            results.append((key, data, TubeHeader.from_tube(tube)))
+    return results
+
+
+def migrate(tubes, headers, workers=None, chunk_size=500, logging=True):
+    """
+    Migrates every tube in the open store tubes, and updates their headers
+    in the open store headers (see storage.py). workers is the number of worker processes,
+    None for one per CPU and 0 to do everything in this process. At most
+    two chunks per worker are in flight at once, so memory use doesn't
+    grow with the size of the database. Returns a MigrationResult.
+    """
+    # Imported here to avoid importing db (and the legacy pickler) into
+    # every worker process.
+    from .db import SEQ_KEY, mark_generation
+
+    result = MigrationResult()
+    seq = headers.get(SEQ_KEY, 0)
+    keys = list(tubes.keys())
+    start = time.perf_counter()
+
+    def chunks():
+        for i in range(0, len(keys), chunk_size):
+            yield list(tubes.get_many(keys[i:i + chunk_size], raw=True))
+
+    def write(results):
+        nonlocal seq
+        for key, data, header in results:
+            result.read += 1
+            if data is not None:
+                # Straight into the store, the tube is pickled already.
+                tubes.put_batch([(key, data)], raw=True)
+                seq += 1
+                header.seq = seq
+                headers[key] = header
+                result.upgraded += 1
+            elif header is not None:
+                result.skipped.append((key, header))
+        if logging:
+            print(f"{result.read}/{len(keys)} tubes, "
+                  f"{time.perf_counter() - start:0.1f} s")
+
+    if workers == 0:
+        for chunk in chunks():
+            write(migrate_chunk(chunk))
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as pool:
+            in_flight = []
+            for chunk in chunks():
+                in_flight.append(pool.submit(migrate_chunk, chunk))
+                if len(in_flight) >= 2 * workers:
+                    write(in_flight.pop(0).result())
+            for future in in_flight:
+                write(future.result())
+
+    mark_generation(headers, seq)
+    return result
+
+
+def main(argv=None):
+    from . import db, locks
+
+    parser = argparse.ArgumentParser(
+        description=f"Rewrites every tube stored with an older schema version in version {SCHEMA_VERSION}."
+    )
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes, 0 for none (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help="tubes sent to a worker at a time (default: 500)")
+    args = parser.parse_args(argv)
+
+    if locks.Lock("database_manager").is_locked():
+        print("The Database Manager is running, stop it before migrating.")
+        return 1
+    result = db.db_manager(testing=True).migrate(args.workers, args.chunk_size)
+    print(result)
+    for key, error in result.skipped:
+        print("Skipped", key + ":", error)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+###############################################################################
+#   File: outbox.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The Outbox class, for station programs. It has the add_tube(),
+#       overwrite_tube() and delete_tube() of the db class, but they only
+#       append the tube to a journal file on the local disk and return. A
+#       background thread stages what's in the journal for the db_manager,
+#       as batches (see db.write_batch()), and retries until that works. So
+#       the operator never waits on the synced folder, and a record written
+#       while it's unreachable is kept, across restarts too, until it's
+#       staged.
+#
+#   Known Issues:
+#       If the program dies right after a batch is staged, before the
+#       journal is rewritten without it, the batch is staged again on the
+#       next start. Records are written at least once, not exactly once.
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import zlib
+import atexit
+import pickle
+import struct
+import threading
+from pathlib import Path
+
+from .db import db, stage
+from .lazy import lazy_import
+from .config import DEFAULT_OUTBOX_DIRECTORY
+
+portalocker = lazy_import('portalocker')
+
+# Journal entries are the length and CRC-32 of the pickled (kind, tube),
+# then the pickle. An entry cut short by a crash fails the check and is
+# dropped when the journal is opened again.
+_HEADER = struct.Struct('<II')
+
+DEFAULT_DIRECTORY = DEFAULT_OUTBOX_DIRECTORY
+
+
+class Outbox:
+    """
+    A local journal of tubes to stage, flushed by a background thread. name
+    picks the journal in directory (by default the outbox_dir of the
+    database's Config, see config.py), one per station program; two programs
+    can't use the same one at once. Tubes are staged at most batch_size at a
+    time, delay seconds after the first arrives, so close records go
+    together. A failed flush is retried every retry_interval seconds.
+    """
+    def __init__(self, name='outbox', database=None, directory=None,
+                 delay=0.2, batch_size=500, retry_interval=5.0):
+        self.database = database if database is not None else db()
+        if directory is None:
+            directory = self.database.config.outbox_dir
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / (name + '.journal')
+        self.delay = delay
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.flushed = 0
+        self.errors = 0
+        self.last_error = None
+
+        self._file_lock = portalocker.Lock(str(self.path.with_name(name + '.lock')), 'a', timeout=10)
+        self._file_lock.acquire()
+        # Guards _pending and the journal file, _flush_lock lets one flush
+        # run at a time.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = self._recover()
+        self._journal = self.path.open('ab')
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        if self._pending:
+            self._wake.set()
+        self._thread = threading.Thread(target=self._run, name='outbox ' + name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __str__(self):
+        return (
+            f"outbox {self.path}: {len(self)} pending, {self.flushed} staged, "
+            f"{self.errors} failed flushes"
+            + (f" (last: {self.last_error})" if self.last_error else "")
+        )
+
+    def add_tube(self, tube):
+        """Journals tube to be added, see db.add_tube()."""
+        if tube.is_partial():
+            raise ValueError("can't add a tube loaded with get_tube(stations=...)")
+        self._put('add', tube)
+
+    def overwrite_tube(self, tube):
+        """Journals tube to overwrite the stored one, see db.overwrite_tube()."""
+        if tube.is_partial():
+            raise ValueError("can't overwrite with a tube loaded with get_tube(stations=...)")
+        self._put('edit', tube)
+
+    def delete_tube(self, tube_id):
+        """Journals the tube's deletion, see db.delete_tube()."""
+        from .tube import Tube
+        tube = Tube()
+        tube.set_ID(tube_id if type(tube_id) is str else tube_id.get_ID())
+        self._put('delete', tube)
+
+    def _put(self, kind, tube):
+        if self._closed:
+            raise RuntimeError("the outbox is closed")
+        payload = pickle.dumps((kind, tube))
+        with self._lock:
+            self._journal.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending.append(payload)
+        self._wake.set()
+
+    def flush(self):
+        """
+        Stages every pending tube now, in this thread. Returns how many were
+        staged. Raises what staging raised, the tubes not staged yet stay
+        pending.
+        """
+        staged = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.batch_size]
+                if not batch:
+                    return staged
+                # A .batch file is the (kind, tube) pickles one after the
+                # other, see db.write_batch(), which these already are.
+                stage(self.database.new_data_dir, '.batch', lambda f: f.writelines(batch))
+                with self._lock:
+                    del self._pending[:len(batch)]
+                    self._rewrite()
+                staged += len(batch)
+                self.flushed += len(batch)
+
+    def close(self):
+        """
+        Stops the background thread and makes a last try at staging. What
+        can't be staged stays in the journal for the next Outbox opening it.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        try:
+            self.flush()
+        except Exception as error:
+            self.errors += 1
+            self.last_error = error
+        self._journal.close()
+        self._file_lock.release()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Gives the records of one measurement time to come in together.
+            self._stop.wait(self.delay)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                self.errors += 1
+                self.last_error = error
+                self._wake.set()
+                self._stop.wait(self.retry_interval)
+
+    def _recover(self):
+        # The pickles of the complete entries in the journal. A torn entry at
+        # the end is cut off.
+        pending = []
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return pending
+        position = 0
+        while position + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, position)
+            payload = data[position + _HEADER.size:position + _HEADER.size + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break
+            pending.append(payload)
+            position += _HEADER.size + length
+        if position != len(data):
+            with self.path.open('r+b') as f:
+                f.truncate(position)
+        return pending
+
+    def _rewrite(self):
+        # Replaces the journal with the pending entries. Called with _lock
+        # held, so nothing is appended meanwhile.
+        self._journal.close()
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with temporary.open('wb') as f:
+            for payload in self._pending:
+                f.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(str(temporary), str(self.path))
+        self._journal = self.path.open('ab')
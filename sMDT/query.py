@@ -0,0 +1,221 @@
+###############################################################################
+#   File: query.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Declarative queries over the tube database, see db.query().
+#       A query is split in two. What the tube headers know (barcode, manu-
+#       facture date, statuses, which stations have records) is checked on
+#       the header store, without loading any tube. Only the tubes that pass
+#       are loaded, and the rest of the query (where) is checked on them.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import datetime
+from enum import IntEnum
+
+from .header import TubeHeader
+from .result_cache import cached
+
+# Errors a where function raising counts as "doesn't match": a record with
+# a missing value, or a station with no records.
+MISMATCH_ERRORS = (AttributeError, TypeError, IndexError, ValueError)
+
+RECORD_MODES = ('any', 'all', 'first', 'last')
+
+
+def _as_datetime(value):
+    # Dates become midnight of that day, so they compare with datetimes.
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    return None
+
+
+def _codes(value):
+    # A status, or a list of them, as a set of ints.
+    if value is None:
+        return None
+    if isinstance(value, (IntEnum, int)):
+        return {int(value)}
+    return {int(status) for status in value}
+
+
+class Query:
+    """
+    A query, as built by db.query(). See db.query() for the parameters.
+    """
+    def __init__(self, barcodes=None, prefix=None, status=None,
+                 status_bentness=None, status_umich=None, mfg_date=None,
+                 station=None, where=None, record='any', include_cold=False):
+        if record not in RECORD_MODES:
+            raise ValueError(f"record must be one of {', '.join(RECORD_MODES)}")
+        if isinstance(barcodes, str):
+            barcodes = [barcodes]
+        self.barcodes = None if barcodes is None else set(barcodes)
+        self.prefix = prefix
+        self.status = _codes(status)
+        self.status_bentness = _codes(status_bentness)
+        self.status_umich = _codes(status_umich)
+        if mfg_date is None:
+            self.start = self.end = None
+        else:
+            start, end = mfg_date
+            self.start = _as_datetime(start)
+            self.end = _as_datetime(end)
+            if (start is not None and self.start is None) \
+                    or (end is not None and self.end is None):
+                raise TypeError("mfg_date must be a (start, end) pair of dates")
+        self.has_dates = mfg_date is not None
+        self.station = station
+        self.where = where
+        self.record = record
+        # Whether tubes of the cold tier (see tiering.py) are looked at.
+        self.include_cold = include_cold
+
+    def match_header(self, header):
+        """True if the header passes every part of the query headers know."""
+        barcode = header.barcode
+        if self.barcodes is not None and barcode not in self.barcodes:
+            return False
+        if self.prefix is not None and not (barcode or '').startswith(self.prefix):
+            return False
+        if self.status is not None and header.status_code not in self.status:
+            return False
+        if self.status_bentness is not None \
+                and header.status_bentness_code not in self.status_bentness:
+            return False
+        if self.status_umich is not None \
+                and header.status_umich_code not in self.status_umich:
+            return False
+        if self.has_dates:
+            date = _as_datetime(header.mfg_date)
+            if date is None:
+                return False
+            if self.start is not None and date < self.start:
+                return False
+            if self.end is not None and not date < self.end:
+                return False
+        if self.station is not None and not header.count(self.station):
+            return False
+        return True
+
+    def match_tube(self, tube):
+        """True if the tube passes where. The headers must be checked first."""
+        if self.where is None:
+            return True
+        if self.station is None:
+            return self._test(self.where, tube)
+        records = tube.peek(self.station).m_records
+        if self.record == 'any':
+            return any(self._test(self.where, record) for record in records)
+        if self.record == 'all':
+            return all(self._test(self.where, record) for record in records)
+        return self._test(self.where, records[0 if self.record == 'first' else -1])
+
+    @staticmethod
+    def _test(where, value):
+        try:
+            return bool(where(value))
+        except MISMATCH_ERRORS:
+            return False
+
+    def key(self):
+        """
+        The query as a tuple, the same for equal queries, for caching. None
+        if it has a where function, which can't be compared.
+        """
+        if self.where is not None:
+            return None
+
+        def sort(values):
+            return None if values is None else tuple(sorted(values))
+        return (
+            sort(self.barcodes), self.prefix, sort(self.status),
+            sort(self.status_bentness), sort(self.status_umich),
+            self.has_dates, self.start, self.end, self.station,
+            self.include_cold,
+        )
+
+    def plan(self):
+        """
+        Describes how the query runs, for checking that it uses the headers
+        as intended. Returns a list of strings, one per step.
+        """
+        steps = []
+        if self.barcodes is not None:
+            steps.append(f"look up {len(self.barcodes)} headers by barcode")
+        elif self.include_cold:
+            steps.append("scan the header store and the cold tier's")
+        else:
+            steps.append("scan the header store")
+        checks = []
+        if self.prefix is not None:
+            checks.append(f"barcode starts with {self.prefix!r}")
+        for name in ('status', 'status_bentness', 'status_umich'):
+            if getattr(self, name) is not None:
+                checks.append(f"{name} in {sorted(getattr(self, name))}")
+        if self.has_dates:
+            checks.append(f"mfg_date in [{self.start}, {self.end})")
+        if self.station is not None:
+            checks.append(f"{self.station} has records")
+        if checks:
+            steps.append("keep headers where " + " and ".join(checks))
+        steps.append("load the matching tubes, in barcode order")
+        if self.where is not None:
+            target = 'tube' if self.station is None \
+                else f"{self.record} {self.station} record"
+            steps.append(f"keep tubes where where({target}) is true")
+        return steps
+
+
+def run(database, query, stations=None):
+    """
+    Yields the tubes in database matching query. Used by db.query().
+    Without a header store, every tube is loaded and its header built on
+    the fly, which gives the same result, only slower. The IDs a query
+    without where matches are kept in database.cache, if it has one.
+    """
+    if stations is not None and query.station is not None:
+        stations = set(stations) | {query.station}
+    key = query.key()
+    if key is not None:
+        key = ('query',) + key
+    ids = cached(database.cache, database, key, lambda: select(database, query))
+    if ids is None:
+        # No header store yet (the db_manager makes one on its next update).
+        if query.barcodes is not None:
+            ids = sorted(query.barcodes)
+
+        def match(tube):
+            return query.match_header(TubeHeader.from_tube(tube)) \
+                and query.match_tube(tube)
+    else:
+        match = query.match_tube
+    if ids == []:
+        return
+
+    if ids is None:
+        ids = sorted(database.get_IDs(include_cold=query.include_cold))
+    # IDs deleted since the headers were read are skipped by iter_tubes().
+    for tube in database.iter_tubes(ids):
+        if match(tube):
+            if stations is not None:
+                tube.project(stations)
+            yield tube
+
+
+def select(database, query):
+    """
+    The sorted IDs of the tubes whose headers match query, or None if the
+    database has tubes but no header store.
+    """
+    headers = list(database.list_headers(query.barcodes, query.include_cold))
+    if not headers and database.size(query.include_cold):
+        return None
+    return sorted(header.barcode for header in headers if query.match_header(header))
@@ -0,0 +1,190 @@
+###############################################################################
+#   File: result_cache.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The ResultCache class, which remembers the results of
+#       db.query() and db.aggregate() for as long as the database stays the
+#       same. Results are stored with the database's generation (see
+#       db.generation()), which changes with every write the db_manager
+#       makes, and are only used while it is unchanged. The cache can also
+#       be kept in a directory, so another process (or the next run of a
+#       script) gets the results without computing them again.
+#
+#   Known Issues:
+#       Queries with a where function aren't cached, since a function can't
+#       be told apart from a changed one with the same name.
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    A cache of at most max_entries results, dropping the least recently
+    used. If path is given, results are also written there, one file each,
+    and read back by any process using the same path.
+    """
+    def __init__(self, max_entries=128, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        # Key -> (generation, seconds it took to compute, result).
+        self._entries = OrderedDict()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.reset()
+
+    def reset(self):
+        """Zeros the counters."""
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.evictions = 0
+        self.saved = 0.0
+
+    def __str__(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"results: {self.hits} cached ({self.disk_hits} from disk), "
+            f"{self.misses} computed, {self.uncached} not cacheable, "
+            f"{rate:.0%} hit rate, {self.saved:.2f} s saved, "
+            f"{self.evictions} evicted"
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, generation):
+        """
+        Returns (True, result) if key has a result for generation, or
+        (False, None). A result for any other generation is dropped.
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.path is not None:
+            entry = self._read(key)
+            if entry is not None and entry[0] == generation:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is None or entry[0] != generation:
+            if entry is not None:
+                self._forget(key)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.saved += entry[1]
+        return True, entry[2]
+
+    def put(self, key, generation, elapsed, result):
+        """Stores the result for key, computed in elapsed seconds."""
+        entry = (generation, elapsed, result)
+        self._remember(key, entry)
+        if self.path is not None:
+            self._write(key, entry)
+
+    def clear(self):
+        """Drops every result, from disk too."""
+        self._entries.clear()
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith('.result'):
+                    os.remove(os.path.join(self.path, name))
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _forget(self, key):
+        self._entries.pop(key, None)
+        if self.path is not None:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def _file(self, key):
+        # Keys are tuples of strings, numbers, dates and None, whose repr is
+        # the same in every process.
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.path, digest + '.result')
+
+    def _read(self, key):
+        try:
+            with open(self._file(key), 'rb') as f:
+                stored_key, entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        return entry if stored_key == key else None
+
+    def _write(self, key, entry):
+        # Written to a temporary file and renamed, so a reader never sees a
+        # half written result.
+        file_name = self._file(key)
+        descriptor, temporary = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                pickle.dump((key, entry), f)
+            os.replace(temporary, file_name)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+        self._trim()
+
+    def _trim(self):
+        # Keeps at most max_entries files, dropping the oldest.
+        files = [
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.endswith('.result')
+        ]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=_modified)
+        for name in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+
+
+def _modified(file_name):
+    # Another process may have removed the file already.
+    try:
+        return os.stat(file_name).st_mtime
+    except OSError:
+        return 0.0
+
+
+def cached(cache, database, key, compute):
+    """
+    Returns compute(), or the result cached under key if the database
+    hasn't changed since. key None means not cacheable.
+    """
+    if cache is None:
+        return compute()
+    generation = database.generation() if key is not None else None
+    if generation is None:
+        cache.uncached += 1
+        return compute()
+    hit, result = cache.get(key, generation)
+    if hit:
+        return result
+    start = time.perf_counter()
+    result = compute()
+    cache.put(key, generation, time.perf_counter() - start, result)
+    return result
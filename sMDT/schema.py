@@ -0,0 +1,88 @@
+###############################################################################
+#   File: schema.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: The version of the shape stored tubes are in, and the functions
+#       that bring tubes stored in an older shape up to date. Every pickled
+#       tube records the SCHEMA_VERSION it was written with, and a tube
+#       loaded from an older pickle is upgraded as it is loaded (see
+#       Tube.__setstate__). To rewrite the whole database in the current
+#       shape, see migrate.py.
+#
+#   Changing the shape of a tube:
+#       1. Add 1 to SCHEMA_VERSION.
+#       2. Register a function taking a loaded tube of the previous version
+#          and changing it, in place, to the new one:
+#
+#              @upgrade(1)
+#              def _rename_something(tube):
+#                  ...
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+SCHEMA_VERSION = 1
+
+# Version -> function bringing a tube of that version to the next one.
+_upgrades = {}
+
+
+def upgrade(from_version):
+    """
+    Registers the decorated function as the upgrade of tubes of
+    from_version to from_version + 1.
+    """
+    def register(function):
+        if from_version in _upgrades:
+            raise ValueError(f"an upgrade from version {from_version} is already registered")
+        _upgrades[from_version] = function
+        return function
+    return register
+
+
+def upgrade_tube(tube, version):
+    """
+    Runs every upgrade from version up to SCHEMA_VERSION on tube, in order.
+    Raises ValueError if one is missing or the version is newer than this
+    code knows about.
+    """
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"tube {tube.m_tube_id} was written with schema version {version}, "
+            f"this code only knows up to {SCHEMA_VERSION}. Update the sMDT package."
+        )
+    for step in range(version, SCHEMA_VERSION):
+        try:
+            function = _upgrades[step]
+        except KeyError:
+            raise ValueError(f"no upgrade from schema version {step}") from None
+        function(tube)
+    return tube
+
+
+def loaded_version(tube):
+    """
+    The schema version the tube was stored with, before it was upgraded on
+    load. Tubes that weren't loaded from a pickle are current.
+    """
+    return tube.__dict__.get('_loaded_version', SCHEMA_VERSION)
+
+
+@upgrade(0)
+def _drop_empty(tube):
+    # Version 0 is every tube pickled before the versions existed. Those
+    # hold all their stations, comments and legacy data, even empty ones,
+    # as objects. Dropping the empty ones leaves them to be created on first
+    # use, like a current tube.
+    attributes = tube.__dict__
+    for name in tube.station_names:
+        station = attributes.get(name)
+        if station is not None and not station.m_records:
+            del attributes[name]
+    for name in ('m_comments', 'legacy_data', 'comment_fail'):
+        if name in attributes and not attributes[name]:
+            del attributes[name]
@@ -0,0 +1,394 @@
+###############################################################################
+#   File: status_engine.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Computes the status of many tubes at once. The fields the status
+#       depends on (last leak rate, last dark current and voltage, the
+#       tension of every tension record, bentness, comment error codes...)
+#       are pulled out of the tubes into NumPy arrays in one pass, and the
+#       pass/fail/incomplete logic of Tube.status(), Tube.status_bentness()
+#       and Tube.status_umich() is then applied to all of them at once.
+#
+#   Known Issues:
+#       The logic here is a copy of the station compute_status() functions
+#       and has to be kept in sync with them. evaluate(cross_check=True)
+#       (or check()) compares every result with the tube's own, use it
+#       after changing either.
+#
+#   Workarounds:
+#       Tubes with data the arrays can't hold (a record that is None, a
+#       tension that is a string, a missing station...) are handed to the
+#       tube's own status functions instead, so the results are always the
+#       same as Tube.status(), errors included.
+#
+###############################################################################
+
+import numbers
+from datetime import datetime
+
+import numpy as np
+
+from .data.status import Status, UMich_Status, ErrorCodes
+from .data.tension import TensionRecord
+from .data.leak import LeakRecord
+from .data.dark_current import DarkCurrentRecord
+from .data.bent import BentRecord
+
+
+# status_umich() returns None for tubes without UMich data. Arrays can't hold
+# None, so it is stored as this.
+UMICH_NONE = -1
+
+# Same as the list in Tube.comment_fails().
+OK_ERROR_CODES = [
+    ErrorCodes.NO_ERROR,
+    ErrorCodes.SHIM_FITS_2_4MM,
+    ErrorCodes.SHIM_FITS_1_6MM,
+    ErrorCodes.SHIM_FITS_0_8MM
+]
+
+_INF = float('inf')
+_NAN = float('nan')
+
+
+class StatusMismatch(RuntimeError):
+    """
+    Raised by evaluate(cross_check=True) when a result differs from the one
+    the tube itself gives.
+    """
+
+
+class _Irregular(Exception):
+    # The tube has data the arrays can't hold.
+    pass
+
+
+def _number(value, none):
+    # Values are compared as floats. None is stored as a stand in chosen so
+    # the comparisons come out the way the record fail() functions treat
+    # None. Anything that isn't a real number goes to the tube itself.
+    if value is None:
+        return none
+    if type(value) is float or isinstance(value, numbers.Real):
+        return value
+    raise _Irregular
+
+
+def _comment_code(comment):
+    # Tube.comment_fails() checks comment[3] against the ok error codes. A
+    # code that isn't a number is never ok, which -1 stands in for.
+    code = comment[3]
+    if isinstance(code, numbers.Real):
+        return float(code)
+    return -1.0
+
+
+class TubeArrays:
+    """
+    The fields of a list of tubes that their status depends on, one entry
+    per tube (or per record, for tension and comments), built by
+    TubeArrays.extract().
+    """
+    def __init__(self):
+        self.ids = []
+        self.swage_n = []
+        self.tension_n = []
+        self.leak_n = []
+        self.leak_rate = []
+        self.dark_current_n = []
+        self.dark_current = []
+        self.voltage = []
+        self.dark_current_date = []
+        self.bent_n = []
+        self.bentness = []
+        self.comment_fail = []
+        self.umich_done = []
+        # One entry per tension record and per coded comment, with the index
+        # of the tube it belongs to.
+        self.tension_tube = []
+        self.tension = []
+        self.comment_tube = []
+        self.comment_code = []
+        # Index and tube of every tube the arrays couldn't hold.
+        self.irregular = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def extract(tubes):
+        """
+        Pulls the fields out of an iterable of tubes. Returns a TubeArrays
+        whose fields are NumPy arrays.
+        """
+        arrays = TubeArrays()
+        for index, tube in enumerate(tubes):
+            arrays.ids.append(tube.get_ID())
+            try:
+                row, tensions, codes = TubeArrays._extract_tube(tube)
+            except (_Irregular, AttributeError, IndexError, TypeError):
+                arrays.irregular.append((index, tube))
+                row, tensions, codes = TubeArrays._empty_row, (), ()
+            arrays._append(index, row, tensions, codes)
+        arrays._to_numpy()
+        return arrays
+
+    # (swage_n, tension_n, leak_n, leak_rate, dark_current_n, dark_current,
+    #  voltage, dark_current_date, bent_n, bentness, comment_fail, umich_done)
+    _empty_row = (0, 0, 0, _NAN, 0, _NAN, _NAN, None, 0, _NAN, False, 0)
+
+    @staticmethod
+    def _extract_tube(tube):
+        # peek() so that no empty stations are created on the tubes.
+        swage = tube.peek('swage')
+        tension = tube.peek('tension')
+        leak = tube.peek('leak')
+        dark_current = tube.peek('dark_current')
+        if swage is None or tension is None or leak is None \
+                or dark_current is None:
+            raise _Irregular
+
+        swage_records = swage.m_records
+        if swage_records and swage_records[-1] is None:
+            raise _Irregular
+
+        tension_records = tension.m_records
+        # passed_first_tension() skips records that are None.
+        tensions = [
+            _number(record.tension, _INF)
+            for record in tension_records if record is not None
+        ]
+
+        leak_records = leak.m_records
+        leak_rate = _NAN
+        if leak_records:
+            leak_rate = _number(leak_records[-1].leak_rate, _INF)
+
+        dc_records = dark_current.m_records
+        dc_value = voltage = _NAN
+        dc_date = None
+        if dc_records:
+            last = dc_records[-1]
+            dc_date = last.date
+            if dc_date is not None and (
+                    type(dc_date) is not datetime or dc_date.tzinfo is not None):
+                raise _Irregular
+            dc_value = _number(last.dark_current, _INF)
+            voltage = _number(last.voltage, -_INF)
+
+        bent_records = tube.peek('bent').m_records
+        bentness = _NAN
+        if bent_records:
+            bentness = _number(bent_records[-1].bentness, _NAN)
+
+        codes = [
+            _comment_code(comment) for comment in tube.peek('m_comments')
+            if comment is not None and len(comment) > 3
+        ]
+
+        # status_umich() swallows every error, so this can't be irregular.
+        umich_done = 0
+        umich_misc = tube.peek('umich_misc')
+        if umich_misc is not None and umich_misc.m_records:
+            done = getattr(umich_misc.m_records[-1], 'done', None)
+            if done == 'yes':
+                umich_done = 1
+            elif done == 'no':
+                umich_done = 2
+
+        row = (
+            len(swage_records), len(tension_records), len(leak_records),
+            leak_rate, len(dc_records), dc_value, voltage, dc_date,
+            len(bent_records), bentness, bool(tube.comment_fail), umich_done
+        )
+        return row, tensions, codes
+
+    def _append(self, index, row, tensions, codes):
+        (swage_n, tension_n, leak_n, leak_rate, dark_current_n, dark_current,
+         voltage, dark_current_date, bent_n, bentness, comment_fail,
+         umich_done) = row
+        self.swage_n.append(swage_n)
+        self.tension_n.append(tension_n)
+        self.leak_n.append(leak_n)
+        self.leak_rate.append(leak_rate)
+        self.dark_current_n.append(dark_current_n)
+        self.dark_current.append(dark_current)
+        self.voltage.append(voltage)
+        self.dark_current_date.append(dark_current_date)
+        self.bent_n.append(bent_n)
+        self.bentness.append(bentness)
+        self.comment_fail.append(comment_fail)
+        self.umich_done.append(umich_done)
+        self.tension_tube.extend([index] * len(tensions))
+        self.tension.extend(tensions)
+        self.comment_tube.extend([index] * len(codes))
+        self.comment_code.extend(codes)
+
+    def _to_numpy(self):
+        for name in ('swage_n', 'tension_n', 'leak_n', 'dark_current_n',
+                     'bent_n', 'tension_tube', 'comment_tube'):
+            setattr(self, name, np.array(getattr(self, name), dtype=np.int64))
+        for name in ('leak_rate', 'dark_current', 'voltage', 'bentness',
+                     'tension', 'comment_code'):
+            setattr(self, name, np.array(getattr(self, name), dtype=np.float64))
+        self.dark_current_date = np.array(
+            self.dark_current_date, dtype='datetime64[us]'
+        )
+        self.comment_fail = np.array(self.comment_fail, dtype=bool)
+        self.umich_done = np.array(self.umich_done, dtype=np.int8)
+
+
+class StatusTable:
+    """
+    The statuses of a list of tubes, as returned by evaluate(). status and
+    status_bentness hold Status values, status_umich holds UMich_Status
+    values or UMICH_NONE.
+    """
+    def __init__(self, ids, status, status_bentness, status_umich):
+        self.ids = ids
+        self.status = status
+        self.status_bentness = status_bentness
+        self.status_umich = status_umich
+
+    def __len__(self):
+        return len(self.ids)
+
+    def tube_status(self, i):
+        """
+        Returns (status, status_bentness, status_umich) of the i-th tube, as
+        the enums (or None) the Tube functions return.
+        """
+        umich = int(self.status_umich[i])
+        return (
+            Status(int(self.status[i])),
+            Status(int(self.status_bentness[i])),
+            None if umich == UMICH_NONE else UMich_Status(umich)
+        )
+
+    def counts(self):
+        """Returns a dictionary of the number of tubes with each Status."""
+        values = np.bincount(self.status, minlength=len(Status))
+        return {status: int(values[status]) for status in Status}
+
+
+def compute(arrays):
+    """
+    Applies the status logic to a TubeArrays. Returns a StatusTable. Tubes
+    the arrays couldn't hold are computed by the tube itself.
+    """
+    n = len(arrays)
+    INCOMPLETE, PASS, FAIL = Status.INCOMPLETE, Status.PASS, Status.FAIL
+
+    swage = np.where(arrays.swage_n > 0, PASS, INCOMPLETE)
+
+    # A tension station passes if any record is within the limits. NaN is
+    # within them, like it is for TensionRecord.fail().
+    tension = arrays.tension
+    record_passed = ~((tension < TensionRecord.min_tension)
+                      | (tension > TensionRecord.max_tension))
+    passed = np.bincount(
+        arrays.tension_tube[record_passed], minlength=n
+    ) > 0
+    tension = np.where(
+        arrays.tension_n == 0, INCOMPLETE, np.where(passed, PASS, FAIL)
+    )
+
+    leak = np.where(
+        arrays.leak_n == 0, INCOMPLETE,
+        np.where(arrays.leak_rate > LeakRecord.threshold_leak, FAIL, PASS)
+    )
+
+    # A missing date can't be compared, which DarkCurrent counts as
+    # incomplete, as it does a voltage of 0 V after the trip check date.
+    dates = arrays.dark_current_date
+    tripped = np.isnat(dates) | (
+        (dates > np.datetime64(DarkCurrentRecord.trip_check_date))
+        & (arrays.voltage <= 0.0)
+    )
+    dark_current = np.where(
+        (arrays.dark_current_n == 0) | tripped, INCOMPLETE,
+        np.where(
+            arrays.dark_current > DarkCurrentRecord.max_individual_current,
+            FAIL, PASS
+        )
+    )
+
+    bent_visited = arrays.bent_n > 0
+    bent = np.where(
+        bent_visited,
+        np.where(arrays.bentness >= BentRecord.max_bentness, FAIL, PASS),
+        INCOMPLETE
+    )
+    status_bentness = np.where(
+        ~bent_visited, PASS,
+        np.where((arrays.bentness == 0.8) & (swage == INCOMPLETE), FAIL, bent)
+    )
+
+    bad_comment = ~np.isin(arrays.comment_code, [float(c) for c in OK_ERROR_CODES])
+    comment_fails = np.bincount(
+        arrays.comment_tube[bad_comment], minlength=n
+    ) > 0
+
+    stations = np.stack([swage, tension, leak, dark_current])
+    failed = (status_bentness == FAIL) | (stations == FAIL).any(axis=0) \
+        | comment_fails | arrays.comment_fail
+    incomplete = (stations == INCOMPLETE).any(axis=0)
+    status = np.where(failed, FAIL, np.where(incomplete, INCOMPLETE, PASS))
+
+    status_umich = np.select(
+        [arrays.umich_done == 1, arrays.umich_done == 2],
+        [UMich_Status.UMICH_COMPLETE, UMich_Status.UMICH_INCOMPLETE],
+        UMICH_NONE
+    )
+
+    table = StatusTable(
+        arrays.ids, status.astype(np.int8), status_bentness.astype(np.int8),
+        status_umich.astype(np.int8)
+    )
+    for index, tube in arrays.irregular:
+        umich = tube.status_umich()
+        table.status[index] = tube.status()
+        table.status_bentness[index] = tube.status_bentness()
+        table.status_umich[index] = UMICH_NONE if umich is None else umich
+    return table
+
+
+def check(tubes, table):
+    """
+    Compares every result in table with the tube's own status functions.
+    Raises StatusMismatch listing the tubes that differ.
+    """
+    mismatched = []
+    for i, tube in enumerate(tubes):
+        expected = (tube.status(), tube.status_bentness(), tube.status_umich())
+        if table.tube_status(i) != expected:
+            mismatched.append(tube.get_ID())
+    if mismatched:
+        raise StatusMismatch(
+            f"{len(mismatched)} tubes differ from Tube.status(): "
+            + ", ".join(str(i) for i in mismatched[:10])
+        )
+
+
+def evaluate(tubes, cross_check=False):
+    """
+    Returns the StatusTable of a list of tubes. With cross_check, every
+    result is also compared against the tube's own status functions.
+    """
+    tubes = list(tubes)
+    table = compute(TubeArrays.extract(tubes))
+    if cross_check:
+        check(tubes, table)
+    return table
+
+
+def evaluate_db(database=None, cross_check=False):
+    """
+    Returns the StatusTable of every tube in the database, the cold tier
+    included.
+    """
+    if database is None:
+        from .db import db
+        database = db()
+    return evaluate(database.get_tubes(include_cold=True), cross_check=cross_check)
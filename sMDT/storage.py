@@ -0,0 +1,601 @@
+###############################################################################
+#   File: storage.py
+#   Author(s): sMDT lab
+#   Date Created: 18 October, 2026
+#
+#   Purpose: Where the db and db_manager keep their tubes and headers. A
+#       StorageBackend is a store of pickled values by string key, used like
+#       the shelves it replaces (tubes[ID], `ID in tubes`, len(tubes)...), with
+#       batch reads and writes on top. There are three:
+#           shelve  ShelveBackend, the shelve files the lab has always used
+#           sqlite  SQLiteBackend, one SQLite file per store
+#           memory  MemoryBackend, dicts in this process, for tests and
+#                   benchmarks
+#       Which one a database uses is the backend of its Config (see
+#       config.py), so switching doesn't change any code using the db class.
+#       benchmarks/bench_storage.py times the same work on each.
+#
+#       A CompressedStore keeps its values compressed in another store, with
+#       zlib or lzma, as the cold tier does (see tiering.py) and the
+#       database does if its Config says so (see compression.py).
+#
+#   Known Issues:
+#       A store is read and written by one thread at a time, as shelves are.
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import lzma
+import zlib
+import uuid
+import pickle
+import shelve
+import shutil
+import tempfile
+from pathlib import Path
+from collections.abc import MutableMapping
+
+# The pickle protocol values are written with, as for the station blobs.
+PROTOCOL = 4
+
+# Keys per statement of the SQLite batch reads, below SQLite's limit of
+# variables per statement.
+_CHUNK = 500
+
+# What a CompressedStore can compress with, and the level each is used at
+# unless another is given.
+CODECS = {'zlib': 9, 'lzma': 6}
+
+# How a stored value starts, see CompressedStore._decompress(). zlib streams
+# never start with the byte pickles start with.
+_PICKLE_MAGIC = b'\x80'
+_XZ_MAGIC = b'\xfd7zXZ\x00'
+# Set in the second byte of a zlib stream compressed with a dictionary.
+_ZLIB_FDICT = 0x20
+
+
+class StorageBackend(MutableMapping):
+    """
+    An open store. Subclasses keep pickled bytes, and implement the methods
+    that raise NotImplementedError. Every method taking raw=True reads or
+    writes the pickles themselves, without loading them, which is what
+    copying and migrating need. Stores are opened with open_store() and
+    closed with close() or a with block.
+    """
+    # Appended to the path a store is opened with, see store_path().
+    suffix = ''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getitem__(self, key):
+        data = self._get(key)
+        if data is None:
+            raise KeyError(key)
+        return pickle.loads(data)
+
+    def __setitem__(self, key, value):
+        self.put_batch([(key, value)])
+
+    def __delitem__(self, key):
+        self.delete(key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key):
+        return self._get(key) is not None
+
+    def get_many(self, keys, raw=False):
+        """Yields (key, value) for every key in keys that is stored, in order."""
+        for key, data in self._get_many(list(keys)):
+            yield key, data if raw else pickle.loads(data)
+
+    def put_batch(self, items, raw=False):
+        """Stores every (key, value) of items, replacing what was there."""
+        if not raw:
+            items = ((key, pickle.dumps(value, PROTOCOL)) for key, value in items)
+        self._put_many(items)
+
+    def delete(self, key):
+        """Deletes key, raises KeyError if it isn't stored."""
+        if not self._delete(key):
+            raise KeyError(key)
+
+    def iterate(self, raw=False):
+        """Yields (key, value) for every key, in no particular order."""
+        for key, data in self._iterate():
+            yield key, data if raw else pickle.loads(data)
+
+    def items(self):
+        return self.iterate()
+
+    def values(self):
+        return (value for key, value in self.iterate())
+
+    def size(self):
+        """The number of keys."""
+        return len(self)
+
+    def copy_to(self, other):
+        """Stores everything of this store in other, an open store."""
+        other.put_batch(self.iterate(raw=True), raw=True)
+
+    @classmethod
+    def exists(cls, path):
+        """True if there is a store at path."""
+        return os.path.exists(str(path))
+
+    @classmethod
+    def compact(cls, path):
+        """
+        Gives back the space of deleted values of the store at path, which
+        must not be open.
+        """
+        pass
+
+    def keys(self):
+        """A list of every key, in no particular order."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def snapshot(self, path):
+        """
+        Copies the store, as it is now, to a new store of the same kind at
+        path (see store_path()). Returns the files written.
+        """
+        raise NotImplementedError
+
+    def generation(self):
+        """
+        A value that changes with every write to the store, by this handle
+        or by any other once its writes are on disk.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def _get(self, key):
+        # The pickle stored under key, or None.
+        raise NotImplementedError
+
+    def _get_many(self, keys):
+        return ((key, data) for key, data in ((key, self._get(key)) for key in keys)
+                if data is not None)
+
+    def _put_many(self, items):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        # True if key was stored.
+        raise NotImplementedError
+
+    def _iterate(self):
+        raise NotImplementedError
+
+
+class ShelveBackend(StorageBackend):
+    """A shelve, as made by shelve.open(). flag is shelve's."""
+    suffix = '.s'
+
+    def __init__(self, path, flag='c'):
+        self.path = str(path)
+        self._shelf = shelve.open(self.path, flag, protocol=PROTOCOL)
+        # The dbm under the shelf, holding the pickles.
+        self._dbm = self._shelf.dict
+        self._encoding = self._shelf.keyencoding
+        self._writes = 0
+
+    def keys(self):
+        return [key.decode(self._encoding) for key in self._dbm.keys()]
+
+    def __len__(self):
+        return len(self._dbm)
+
+    def _get(self, key):
+        try:
+            return self._dbm[key.encode(self._encoding)]
+        except KeyError:
+            return None
+
+    def _put_many(self, items):
+        for key, data in items:
+            self._dbm[key.encode(self._encoding)] = data
+            self._writes += 1
+
+    def _delete(self, key):
+        try:
+            del self._dbm[key.encode(self._encoding)]
+        except KeyError:
+            return False
+        self._writes += 1
+        return True
+
+    def _iterate(self):
+        for key in list(self._dbm.keys()):
+            yield key.decode(self._encoding), self._dbm[key]
+
+    @staticmethod
+    def _files(path):
+        # Depending on the dbm, a shelve is path itself or path.dat, path.dir...
+        path = Path(path)
+        return sorted(
+            file for file in path.parent.glob(path.name + '*')
+            if file.name == path.name or file.suffix in ('.db', '.dat', '.dir', '.bak', '.pag')
+        )
+
+    @classmethod
+    def exists(cls, path):
+        return bool(cls._files(path))
+
+    @classmethod
+    def compact(cls, path):
+        # A dbm keeps the space of deleted values, so the shelve is copied
+        # and the copy takes its place.
+        path = Path(path)
+        directory = tempfile.mkdtemp(prefix=path.name + '.', dir=str(path.parent))
+        try:
+            with ShelveBackend(path, 'r') as store:
+                files = store.snapshot(Path(directory) / path.name)
+            for file in cls._files(path):
+                file.unlink()
+            for file in files:
+                os.replace(str(file), str(path.parent / file.name))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def snapshot(self, path):
+        with ShelveBackend(path, 'n') as copy:
+            self.copy_to(copy)
+        return self._files(path)
+
+    def generation(self):
+        files = []
+        for file in self._files(self.path):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((file.name, stat.st_size, stat.st_mtime_ns))
+        return (tuple(files), self._writes)
+
+    def close(self):
+        self._shelf.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    A table of (key, pickle) in an SQLite file. The writes made while the
+    store is open are one transaction, committed by close() or commit().
+    flag is as for shelve: 'r' read only, 'c' create if needed, 'n' empty.
+    """
+    suffix = '.sqlite'
+
+    def __init__(self, path, flag='c'):
+        import sqlite3
+        from urllib.request import pathname2url
+        self.path = str(path)
+        if flag == 'r':
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(self.path)
+            self._connection = sqlite3.connect(
+                'file:{}?mode=ro'.format(pathname2url(self.path)), uri=True
+            )
+        else:
+            if flag == 'n' and os.path.exists(self.path):
+                os.remove(self.path)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID"
+            )
+            # A counter bumped by every transaction writing, see generation().
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+            )
+            self._connection.execute("INSERT OR IGNORE INTO meta VALUES ('generation', 0)")
+            self._connection.commit()
+        self._dirty = False
+        self._writes = 0
+
+    def keys(self):
+        return [key for key, in self._connection.execute("SELECT key FROM items")]
+
+    def __len__(self):
+        return self._connection.execute("SELECT count(*) FROM items").fetchone()[0]
+
+    def _get(self, key):
+        row = self._connection.execute("SELECT value FROM items WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _get_many(self, keys):
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            found = dict(self._connection.execute(
+                "SELECT key, value FROM items WHERE key IN ({})".format(','.join('?' * len(chunk))),
+                chunk
+            ))
+            for key in chunk:
+                if key in found:
+                    yield key, found[key]
+
+    def _written(self):
+        if not self._dirty:
+            self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self._dirty = True
+
+    def _put_many(self, items):
+        self._written()
+        self._writes += self._connection.executemany(
+            "INSERT OR REPLACE INTO items VALUES (?, ?)", items
+        ).rowcount
+
+    def _delete(self, key):
+        self._written()
+        deleted = self._connection.execute("DELETE FROM items WHERE key = ?", (key,)).rowcount > 0
+        self._writes += deleted
+        return deleted
+
+    def _iterate(self):
+        # Read as it goes, so don't write to the store before it's done.
+        return self._connection.execute("SELECT key, value FROM items")
+
+    def commit(self):
+        """Commits the writes made so far."""
+        self._connection.commit()
+        self._dirty = False
+        self._writes = 0
+
+    def snapshot(self, path):
+        import sqlite3
+        # The backup waits on a transaction still open, so commit it first.
+        if self._dirty:
+            self.commit()
+        if os.path.exists(str(path)):
+            os.remove(str(path))
+        copy = sqlite3.connect(str(path))
+        try:
+            self._connection.backup(copy)
+        finally:
+            copy.close()
+        return [Path(path)]
+
+    @classmethod
+    def compact(cls, path):
+        import sqlite3
+        connection = sqlite3.connect(str(path))
+        try:
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+    def generation(self):
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        # The counter is bumped once per transaction, the writes not committed
+        # yet are counted here.
+        return (row[0] if row else 0, self._writes)
+
+    def close(self):
+        if self._connection is not None:
+            self.commit()
+            self._connection.close()
+            self._connection = None
+
+
+class MemoryBackend(StorageBackend):
+    """
+    A dict of pickles in this process. Every store opened with the same path
+    shares one dict, so a db and a db_manager in one process see the same
+    data. flag is as for shelve.
+    """
+    suffix = '.s'
+
+    # Path -> [token, writes, {key: pickle}], see generation().
+    _stores = {}
+
+    def __init__(self, path, flag='c'):
+        self.path = str(path)
+        if flag == 'r' and self.path not in self._stores:
+            raise FileNotFoundError(self.path)
+        if flag == 'n' or self.path not in self._stores:
+            self._stores[self.path] = [uuid.uuid4().hex, 0, {}]
+        self._store = self._stores[self.path]
+        self._data = self._store[2]
+
+    def keys(self):
+        return list(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def _get(self, key):
+        return self._data.get(key)
+
+    def _put_many(self, items):
+        for key, data in items:
+            self._data[key] = data
+            self._store[1] += 1
+
+    def _delete(self, key):
+        if self._data.pop(key, None) is None:
+            return False
+        self._store[1] += 1
+        return True
+
+    def _iterate(self):
+        return iter(list(self._data.items()))
+
+    def snapshot(self, path):
+        self._stores[str(path)] = [uuid.uuid4().hex, 0, dict(self._data)]
+        return []
+
+    def generation(self):
+        return (self._store[0], self._store[1])
+
+    def close(self):
+        pass
+
+    @classmethod
+    def exists(cls, path):
+        return str(path) in cls._stores
+
+    @classmethod
+    def drop(cls, path=None):
+        """Forgets the store at path, or every store."""
+        if path is None:
+            cls._stores.clear()
+        else:
+            cls._stores.pop(str(path), None)
+
+
+class CompressedStore(StorageBackend):
+    """
+    Keeps the pickles of its values compressed with codec, 'zlib' or
+    'lzma', in store, another open store, which it closes when closed.
+    codec None writes plain pickles. zlib values are compressed with
+    dictionary (see compression.py) if one is given. Every value says how
+    it was written, so values written with another codec, another level,
+    none, or any dictionary in dictionaries (by compression.dictionary_id())
+    all read back. raw=True still reads and writes plain pickles, so
+    copy_to() between compressed and plain stores works.
+    """
+    def __init__(self, store, level=None, codec='zlib', dictionary=None, dictionaries=None):
+        self.store = store
+        self.codec = codec_name(codec)
+        self.level = CODECS.get(self.codec) if level is None else level
+        self.dictionary = dictionary if self.codec == 'zlib' else None
+        self.dictionaries = dict(dictionaries or {})
+        if dictionary is not None:
+            self.dictionaries[zlib.adler32(dictionary)] = dictionary
+
+    def _compress(self, data):
+        if self.codec is None:
+            return data
+        if self.codec == 'lzma':
+            # Without the integrity check, the backend has its own.
+            return lzma.compress(data, check=lzma.CHECK_NONE, preset=self.level)
+        if self.dictionary is None:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, data):
+        if data[:1] == _PICKLE_MAGIC:
+            # Written plain, before the store was compressed.
+            return data
+        if data[:6] == _XZ_MAGIC:
+            return lzma.decompress(data)
+        if data[1] & _ZLIB_FDICT:
+            # The stream names its dictionary by its Adler-32.
+            dictionary = self.dictionaries.get(int.from_bytes(data[2:6], 'big'))
+            if dictionary is None:
+                raise ValueError("value compressed with a dictionary that isn't known, see compression.py")
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            return decompressor.decompress(data) + decompressor.flush()
+        return zlib.decompress(data)
+
+    def keys(self):
+        return self.store.keys()
+
+    def __len__(self):
+        return len(self.store)
+
+    def __contains__(self, key):
+        return key in self.store
+
+    def _get(self, key):
+        data = self.store._get(key)
+        return None if data is None else self._decompress(data)
+
+    def _get_many(self, keys):
+        for key, data in self.store._get_many(keys):
+            yield key, self._decompress(data)
+
+    def _put_many(self, items):
+        self.store._put_many((key, self._compress(data)) for key, data in items)
+
+    def _delete(self, key):
+        return self.store._delete(key)
+
+    def _iterate(self):
+        for key, data in self.store._iterate():
+            yield key, self._decompress(data)
+
+    def snapshot(self, path):
+        return self.store.snapshot(path)
+
+    def generation(self):
+        return self.store.generation()
+
+    def close(self):
+        self.store.close()
+
+
+BACKENDS = {
+    'shelve': ShelveBackend,
+    'sqlite': SQLiteBackend,
+    'memory': MemoryBackend,
+}
+
+
+def backend_class(name):
+    """The StorageBackend subclass called name. Raises ValueError for any other name."""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown storage backend {name!r}, expected one of {', '.join(BACKENDS)}"
+        ) from None
+
+
+def codec_name(name):
+    """
+    The codec called name, None for no compression (name None, '' or
+    'none'). Raises ValueError for any other name than those in CODECS.
+    """
+    if not name or name == 'none':
+        return None
+    if name not in CODECS:
+        raise ValueError(
+            f"unknown compression {name!r}, expected none or one of {', '.join(CODECS)}"
+        )
+    return name
+
+
+def store_path(backend, directory, name):
+    """The path of the store called name (like 'database') in directory."""
+    return Path(directory) / (name + backend_class(backend).suffix)
+
+
+def open_store(backend, path, flag='c'):
+    """Opens the store at path with the backend called backend."""
+    return backend_class(backend)(path, flag)
+
+
+def store_exists(backend, path):
+    """True if there is a store of the backend called backend at path."""
+    return backend_class(backend).exists(path)
+
+
+def compact_store(backend, path):
+    """Gives back the space of deleted values of the store at path, which must not be open."""
+    backend_class(backend).compact(path)
+
+
+def copy_store(source, destination, source_backend='shelve', destination_backend='sqlite'):
+    """
+    Copies the store at path source to a new one at destination, to switch a
+    database to another backend. Returns the number of keys copied.
+    """
+    with open_store(source_backend, source, 'r') as old, \
+            open_store(destination_backend, destination, 'n') as new:
+        old.copy_to(new)
+        return len(new)
+
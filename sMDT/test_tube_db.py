@@ -15,6 +15,17 @@
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def database_root(tmp_path, monkeypatch):
+    '''
+    Every test gets its own database, in a temporary directory (see config.py), so the
+    lab's database is never touched and tests can run in parallel.
+    '''
+    root = tmp_path / 'root'
+    monkeypatch.setenv('SMDT_ROOT', str(root))
+    return root
+
+
 def test_tube_init():
     '''
     Testing tube initialization and constructor
@@ -60,6 +71,36 @@ def test_tube_add():
     assert tube3.tension.get_record('first').user == 'Paul'
 
 
+def test_tube_merge_from():
+    '''
+    This tests the in place merge, which unlike __add__ keeps UMich data and comments.
+    '''
+    from . import tube
+    from .data import tension, leak
+    from .data.umich import UMich_MiscRecord
+    from .data.status import ErrorCodes
+    tube1 = tube.Tube()
+    tube2 = tube.Tube()
+    tube1.set_ID("MSU0000001")
+    tube2.set_ID("MSU0000001")
+    tube1.tension.add_record(tension.TensionRecord(350, user='Paul'))
+    tube2.tension.add_record(tension.TensionRecord(355, user='Reinhard'))
+    tube2.leak.add_record(leak.LeakRecord(0))
+    tube2.umich_misc.add_record(UMich_MiscRecord(done='yes'))
+    tube2.new_comment(("bent", "Paul", None, ErrorCodes.NO_ERROR))
+    tube2.comment_fail = True
+    tension_list = tube1.tension.m_records
+    assert tube1.merge_from(tube2) is tube1
+    assert tube1.tension.m_records is tension_list
+    assert len(tube1.tension.get_record('all')) == 2
+    assert tube1.tension.get_record('last').user == 'Reinhard'
+    assert tube1.leak.get_record('last').leak_rate == 0
+    assert tube1.umich_misc.get_record('last').done == 'yes'
+    assert len(tube1.get_comments()) == 1
+    assert tube1.comment_fail
+    assert len(tube2.tension.get_record('all')) == 1
+
+
 def test_db_persistence():
     '''
     This test is a simple test of the DB, not important since the DB code and this test will need to get rewritten.
@@ -193,3 +234,1088 @@ def test_tube_str():
     from .tube import Tube
     tube1 = Tube()
     str(tube1)
+
+
+def test_tube_status_cache():
+    from .tube import Tube
+    from .data.status import Status
+    from .data.station import status_cache
+    from .data import leak, swage, dark_current, tension, bent
+    from .data.status import ErrorCodes
+    tube1 = Tube()
+    assert tube1.status() == Status.INCOMPLETE
+    assert tube1.status_umich() == tube1._compute_status_umich()
+    tube1.swage.add_record(swage.SwageRecord(raw_length=-9.81, swage_length=0.07))
+    tube1.tension.add_record(tension.TensionRecord(tension=350))
+    tube1.leak.add_record(leak.LeakRecord(leak_rate=0))
+    tube1.dark_current.add_record(dark_current.DarkCurrentRecord(dark_current=0, voltage=3000))
+    status_cache.reset()
+    assert tube1.status() == Status.PASS
+    computed = status_cache.tube_misses
+    assert tube1.status() == Status.PASS
+    assert tube1.status_bentness() == Status.PASS
+    assert status_cache.tube_misses == computed
+    assert status_cache.tube_hits == 2
+
+    # Every kind of change has to be seen.
+    tube1.leak.add_record(leak.LeakRecord(leak_rate=5))
+    assert tube1.status() == Status.FAIL
+    tube1.leak.add_record(leak.LeakRecord(leak_rate=0))
+    assert tube1.status() == Status.PASS
+    tube1.bent.add_record(bent.BentRecord(bentness=1.0))
+    assert tube1.status() == Status.FAIL
+    tube1.bent.add_record(bent.BentRecord(bentness=0.1))
+    assert tube1.status() == Status.PASS
+    tube1.comment_fail = True
+    assert tube1.status() == Status.FAIL
+    tube1.comment_fail = False
+    tube1.new_comment(("snapped", "Paul", None, ErrorCodes.WIRE_SNAPPED))
+    assert tube1.status() == Status.FAIL
+    tube1.m_comments.pop()
+    assert tube1.status() == Status.PASS
+    tube1.leak.get_record().leak_rate = 5
+    tube1.leak.invalidate()
+    assert tube1.status() == Status.FAIL
+
+
+def test_status_engine():
+    '''
+    The vectorized status engine has to agree with Tube.status() on every
+    tube, including the odd ones.
+    '''
+    from .tube import Tube
+    from . import status_engine
+    from .data.status import Status, ErrorCodes
+    from .data import leak, swage, dark_current, tension, bent
+    from .data.umich import UMich_MiscRecord
+    import datetime
+
+    def complete_tube():
+        tube1 = Tube()
+        tube1.swage.add_record(swage.SwageRecord(raw_length=-9.81, swage_length=0.07))
+        tube1.tension.add_record(tension.TensionRecord(tension=350))
+        tube1.leak.add_record(leak.LeakRecord(leak_rate=0))
+        tube1.dark_current.add_record(dark_current.DarkCurrentRecord(dark_current=0, voltage=3000))
+        return tube1
+
+    tubes = [Tube(), complete_tube()]
+    odd = [
+        lambda t: t.leak.add_record(leak.LeakRecord(leak_rate=None)),
+        lambda t: t.leak.add_record(leak.LeakRecord(leak_rate=float('nan'))),
+        lambda t: t.tension.add_record(tension.TensionRecord(tension=float('nan'))),
+        lambda t: t.tension.add_record(tension.TensionRecord(tension=None)),
+        lambda t: t.tension.m_records.append(None),
+        lambda t: t.dark_current.add_record(dark_current.DarkCurrentRecord(dark_current=0, voltage=None)),
+        lambda t: t.dark_current.add_record(dark_current.DarkCurrentRecord(dark_current=5, voltage=3000)),
+        lambda t: t.dark_current.add_record(dark_current.DarkCurrentRecord(
+            dark_current=0, voltage=0, date=datetime.datetime(2021, 1, 1))),
+        lambda t: t.dark_current.add_record(dark_current.DarkCurrentRecord(dark_current=0, voltage=3000, date=None)),
+        lambda t: t.bent.add_record(bent.BentRecord(bentness=0.95)),
+        lambda t: t.bent.add_record(bent.BentRecord(bentness=None)),
+        lambda t: t.bent.add_record(bent.BentRecord(bentness=0.8)),
+        lambda t: (t.bent.add_record(bent.BentRecord(bentness=0.8)), t.swage.m_records.clear()),
+        lambda t: t.new_comment(("comment", "Paul", None, ErrorCodes.SHIM_FITS_0_8MM)),
+        lambda t: t.new_comment(("comment", "Paul", None, ErrorCodes.WIRE_SNAPPED)),
+        lambda t: t.new_comment("A plain string comment"),
+        lambda t: setattr(t, 'comment_fail', True),
+        lambda t: t.umich_misc.add_record(UMich_MiscRecord(done='yes')),
+        lambda t: t.umich_misc.add_record(UMich_MiscRecord(done='no')),
+        lambda t: t.__dict__.pop('umich_misc', None),
+        lambda t: setattr(t, 'leak', None),
+    ]
+    for change in odd:
+        tube1 = complete_tube()
+        change(tube1)
+        tubes.append(tube1)
+
+    table = status_engine.evaluate(tubes, cross_check=True)
+    assert len(table) == len(tubes)
+    assert table.tube_status(0) == (Status.INCOMPLETE, Status.PASS, None)
+    assert table.tube_status(1) == (Status.PASS, Status.PASS, None)
+    assert sum(table.counts().values()) == len(tubes)
+
+    # A result that differs is reported.
+    table.status[1] = Status.FAIL
+    with pytest.raises(status_engine.StatusMismatch):
+        status_engine.check(tubes, table)
+
+
+def test_tube_lazy_stations():
+    '''
+    Stations are only created when used, and empty ones aren't pickled.
+    '''
+    from .tube import Tube
+    from .data.status import Status
+    from .data import tension, leak
+    import pickle
+    tube1 = Tube()
+    tube1.set_ID("MSU0000001")
+    assert tube1.status() == Status.INCOMPLETE
+    assert tube1.status_umich() is None
+    str(tube1)
+    assert 'tension' not in tube1.__dict__
+    assert 'm_comments' not in tube1.__dict__
+    assert tube1.peek('tension').get_record('all') == ()
+
+    tube1.tension.add_record(tension.TensionRecord(350))
+    assert 'tension' in tube1.__dict__
+    assert tube1.umich_bent.get_record('all') == []
+    state = tube1.__getstate__()
+    assert set(state) == {'m_tube_id', '_blobs', 'schema_version'}
+    assert set(state['_blobs']) == {'tension'}
+
+    tube2 = pickle.loads(pickle.dumps(tube1))
+    assert tube2.get_ID() == "MSU0000001"
+    assert tube2.tension.get_record().tension == 350
+    assert tube2.leak.get_record('all') == []
+    assert tube2.get_comments() == []
+    assert tube2.legacy_data == {}
+    assert not tube2.comment_fail
+
+    # Merging only creates the stations the other tube has data for.
+    tube3 = Tube()
+    tube3.leak.add_record(leak.LeakRecord(0))
+    tube2.merge_from(tube3)
+    assert 'leak' in tube2.__dict__
+    assert 'bent' not in tube2.__dict__
+    assert (tube1 + tube3).leak.get_record().leak_rate == 0
+
+
+def test_tube_station_blobs():
+    '''
+    Stations are pickled separately and only unpickled when used.
+    '''
+    from .tube import Tube
+    from .data import tension, leak, swage
+    import pickle
+    tube1 = Tube()
+    tube1.set_ID("MSU0000001")
+    tube1.swage.add_record(swage.SwageRecord(raw_length=1, swage_length=1))
+    tube1.tension.add_record(tension.TensionRecord(350))
+    tube1.leak.add_record(leak.LeakRecord(0))
+    tube1.new_comment("comment")
+
+    tube2 = pickle.loads(pickle.dumps(tube1))
+    assert tube2.get_comments() == ["comment"]
+    assert 'leak' not in tube2.__dict__
+    assert tube2.leak.get_record().leak_rate == 0
+    assert 'leak' in tube2.__dict__
+    assert 'tension' not in tube2.__dict__
+    assert tube2.status() == tube1.status()
+
+    # Stations that were never decoded are stored from their blob.
+    tube3 = pickle.loads(pickle.dumps(pickle.loads(pickle.dumps(tube1))))
+    assert tube3.tension.get_record().tension == 350
+    assert tube3.swage.get_record().raw_length == 1
+    receiver = Tube()
+    receiver.merge_from(pickle.loads(pickle.dumps(tube1)))
+    assert receiver.tension.get_record().tension == 350
+
+    partial = pickle.loads(pickle.dumps(tube1)).project(['leak'])
+    assert partial.is_partial()
+    assert partial.leak.get_record().leak_rate == 0
+    assert partial.get_comments() == ["comment"]
+    with pytest.raises(AttributeError):
+        partial.tension
+    with pytest.raises(AttributeError):
+        partial.status()
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(partial)
+    with pytest.raises(ValueError):
+        Tube().project(['nonsense'])
+
+
+def test_db_get_tube_stations():
+    from . import tube, db
+    from .data import tension, leak
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    tube1 = tube.Tube()
+    tube1.set_ID("MSU0000001")
+    tube1.tension.add_record(tension.TensionRecord(350))
+    tube1.leak.add_record(leak.LeakRecord(0))
+    tubes.add_tube(tube1)
+    dbman.update(logging=False)
+
+    tube2 = tubes.get_tube("MSU0000001", stations=['leak'])
+    assert tube2.leak.get_record().leak_rate == 0
+    with pytest.raises(AttributeError):
+        tube2.tension
+    with pytest.raises(ValueError):
+        tubes.add_tube(tube2)
+    assert len(tubes.get_tubes(stations=['tension'])) == 1
+    dbman.wipe('confirm')
+
+
+def test_db_headers():
+    from . import tube, db
+    from .data import tension, leak
+    from .data.status import Status
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    assert list(tubes.list_headers()) == []
+    tube1 = tube.Tube()
+    tube1.set_ID("MSU00001")
+    tube1.tension.add_record(tension.TensionRecord(350))
+    tube2 = tube.Tube()
+    tube2.set_ID("MSU00002")
+    tube2.leak.add_record(leak.LeakRecord(0))
+    tubes.add_tube(tube1)
+    tubes.add_tube(tube2)
+    dbman.update(logging=False)
+
+    headers = {header.barcode: header for header in tubes.list_headers()}
+    assert set(headers) == {"MSU00001", "MSU00002"}
+    assert headers["MSU00001"].number == 1
+    assert headers["MSU00001"].count('tension') == 1
+    assert headers["MSU00001"].count('leak') == 0
+    assert headers["MSU00002"].status() == Status.INCOMPLETE
+    assert headers["MSU00002"].status_umich() is None
+    seq = headers["MSU00002"].seq
+
+    # Writes keep the headers in sync.
+    tube3 = tube.Tube()
+    tube3.set_ID("MSU00002")
+    tube3.leak.add_record(leak.LeakRecord(1))
+    tubes.add_tube(tube3)
+    tubes.delete_tube("MSU00001")
+    dbman.update(logging=False)
+    header = tubes.get_header("MSU00002")
+    assert header.count('leak') == 2
+    assert header.seq > seq
+    assert [h.barcode for h in tubes.list_headers()] == ["MSU00002"]
+    with pytest.raises(KeyError):
+        tubes.get_header("MSU00001")
+
+    dbman.rebuild_headers()
+    assert tubes.get_header("MSU00002").count('leak') == 2
+    dbman.wipe('confirm')
+
+
+class _UnversionedTube:
+    # Pickles like a tube stored before schema versions existed: every
+    # station in the state as an object, empty or not, and no version.
+    def __init__(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        from .tube import Tube
+        return (Tube, (), self.state)
+
+
+def test_tube_schema_upgrade():
+    import pickle
+    from . import tube, schema
+    from .data import tension, swage
+    state = {
+        'm_tube_id': "MSU00001",
+        'm_comments': [],
+        'legacy_data': {},
+        'comment_fail': False,
+        'swage': swage.Swage(),
+        'tension': tension.Tension(),
+    }
+    state['tension'].add_record(tension.TensionRecord(350))
+    old = pickle.dumps(_UnversionedTube(state))
+
+    tube1 = pickle.loads(old)
+    assert schema.loaded_version(tube1) == 0
+    assert set(tube1.__dict__) >= {'m_tube_id', 'tension'}
+    assert not {'swage', 'm_comments', 'legacy_data', 'comment_fail'} & set(tube1.__dict__)
+    assert tube1.tension.get_record().tension == 350
+
+    # Pickled again, it is current.
+    tube2 = pickle.loads(pickle.dumps(tube1))
+    assert schema.loaded_version(tube2) == schema.SCHEMA_VERSION
+    assert schema.loaded_version(tube.Tube()) == schema.SCHEMA_VERSION
+
+    future = tube1.__getstate__()
+    future['schema_version'] = schema.SCHEMA_VERSION + 1
+    with pytest.raises(ValueError):
+        tube.Tube().__setstate__(future)
+
+
+def test_db_migrate():
+    import pickle
+    from . import tube, db, schema
+    from .data import tension
+    from .storage import open_store
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    with open_store(dbman.backend, dbman.path) as stored:
+        for i in range(5):
+            station = tension.Tension()
+            station.add_record(tension.TensionRecord(340 + i))
+            stored[f"MSU0000{i}"] = _UnversionedTube({
+                'm_tube_id': f"MSU0000{i}", 'm_comments': [], 'tension': station
+            })
+    current = tube.Tube()
+    current.set_ID("MSU00009")
+    tubes.add_tube(current)
+    dbman.update(logging=False)
+
+    for workers in (2, 0):
+        result = dbman.migrate(workers=workers, chunk_size=2, logging=False)
+        assert result.read == 6
+        assert result.skipped == []
+        # The second time round everything is current already.
+        assert result.upgraded == (5 if workers else 0)
+
+    with open_store(dbman.backend, dbman.path, 'r') as stored:
+        stored_tube = pickle.loads(dict(stored.get_many(["MSU00003"], raw=True))["MSU00003"])
+        assert schema.loaded_version(stored_tube) == schema.SCHEMA_VERSION
+    assert tubes.get_tube("MSU00003").tension.get_record().tension == 343
+    assert tubes.get_header("MSU00003").count('tension') == 1
+    dbman.wipe('confirm')
+
+
+def test_db_query():
+    from datetime import datetime
+    from . import tube, db, query
+    from .data import tension, swage
+    from .data.status import Status
+    from .storage import open_store
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    for i, value in enumerate([330, 350, 360]):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.swage.add_record(swage.SwageRecord(date=datetime(2021, 6, 1 + i)))
+        tube1.tension.add_record(tension.TensionRecord(value, date=datetime(2021, 6, 1 + i)))
+        tubes.add_tube(tube1)
+    tube1 = tube.Tube()
+    tube1.set_ID("ABC00001")
+    tubes.add_tube(tube1)
+    dbman.update(logging=False)
+
+    def ids(**conditions):
+        return [t.get_ID() for t in tubes.query(**conditions)]
+
+    assert ids() == ["ABC00001", "MSU00000", "MSU00001", "MSU00002"]
+    assert ids(prefix="MSU", mfg_date=(datetime(2021, 6, 2), None)) == ["MSU00001", "MSU00002"]
+    assert ids(mfg_date=(None, datetime(2021, 6, 2).date())) == ["MSU00000"]
+    assert ids(barcodes=["MSU00002", "MSU00009"]) == ["MSU00002"]
+    assert ids(station='tension', where=lambda r: r.tension < 340) == ["MSU00000"]
+    assert ids(status=[Status.INCOMPLETE, Status.FAIL], station='tension') \
+        == ["MSU00000", "MSU00001", "MSU00002"]
+    # Missing values count as no match.
+    assert ids(where=lambda t: t.leak.get_record().leak_rate < 1) == []
+
+    partial = next(tubes.query(barcodes="MSU00001", stations=['swage']))
+    assert partial.is_partial()
+    assert partial.swage.get_record().date == datetime(2021, 6, 2)
+    plan = query.Query(status=Status.FAIL, station='tension', where=abs).plan()
+    assert plan[0] == "scan the header store"
+    assert "tension has records" in plan[1]
+
+    # Without a header store, the same results come from the tubes.
+    open_store(dbman.backend, dbman.header_path, 'n').close()
+    assert ids(prefix="MSU", mfg_date=(datetime(2021, 6, 2), None)) == ["MSU00001", "MSU00002"]
+    dbman.wipe('confirm')
+
+
+def test_aggregate():
+    import random
+    from datetime import datetime, date
+    import numpy as np
+    from . import tube, db, aggregate
+    from .data import tension
+
+    rng = random.Random(3)
+    keys = [rng.choice("abcd") for i in range(500)]
+    values = [rng.gauss(350, 10) for i in range(500)]
+    result = aggregate.group_stats(keys, values, ('count', 'mean', 'std', 'median', 'p95', 'min', 'max'))
+    assert result.groups == ['a', 'b', 'c', 'd']
+    for i, key in enumerate(result.groups):
+        group = np.array([v for k, v in zip(keys, values) if k == key])
+        assert result['count'][i] == len(group)
+        assert np.isclose(result['mean'][i], group.mean())
+        assert np.isclose(result['std'][i], group.std())
+        assert np.isclose(result['median'][i], np.median(group))
+        assert np.isclose(result['p95'][i], np.percentile(group, 95))
+        assert result['min'][i] == group.min() and result['max'][i] == group.max()
+    with pytest.raises(ValueError):
+        aggregate.group_stats(keys, values, ('mode',))
+
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    for i, (value, day, user) in enumerate([
+            (340, 7, 'Paul'), (350, 7, 'Sara'), (360, 8, 'Paul'), (None, 8, 'Paul')]):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(value, date=datetime(2021, 6, day), user=user))
+        tubes.add_tube(tube1)
+    dbman.update(logging=False)
+
+    by_day = tubes.aggregate('tension', by='day', stats=('count', 'mean'))
+    assert by_day.groups == [date(2021, 6, 7), date(2021, 6, 8)]
+    assert by_day.rows() == [
+        {'group': date(2021, 6, 7), 'count': 2, 'mean': 345.0},
+        {'group': date(2021, 6, 8), 'count': 1, 'mean': 360.0},
+    ]
+    assert by_day.dropped == 1
+    # 2021-06-07 was a Monday.
+    assert tubes.aggregate('tension.tension', by='week', stats=('count',)).rows() \
+        == [{'group': date(2021, 6, 7), 'count': 3}]
+    by_operator = tubes.aggregate('tension', by='operator', stats=('max',), prefix="MSU0000")
+    assert by_operator.groups == ['Paul', 'Sara']
+    assert list(by_operator['max']) == [360, 350]
+    counts = by_day.reindex('count', [date(2021, 6, 6), date(2021, 6, 8)])
+    assert np.isnan(counts[0]) and counts[1] == 1
+    dbman.wipe('confirm')
+
+
+def test_db_result_cache(tmp_path):
+    from datetime import datetime
+    from . import tube, db
+    from .data import tension
+    from .result_cache import ResultCache
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    tubes = db.db(cache=ResultCache(max_entries=2, path=str(tmp_path)))
+    assert tubes.generation() is None
+    for i in range(3):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(340 + i, date=datetime(2021, 6, 7)))
+        tubes.add_tube(tube1)
+    dbman.update(logging=False)
+    generation = tubes.generation()
+    assert generation is not None
+
+    def ids(**conditions):
+        return [t.get_ID() for t in tubes.query(**conditions)]
+
+    assert ids(prefix="MSU") == ["MSU00000", "MSU00001", "MSU00002"]
+    assert ids(prefix="MSU") == ["MSU00000", "MSU00001", "MSU00002"]
+    assert (tubes.cache.hits, tubes.cache.misses) == (1, 1)
+    # where functions aren't cached.
+    assert ids(where=lambda t: True) == ["MSU00000", "MSU00001", "MSU00002"]
+    assert tubes.cache.uncached == 1
+
+    # Another process with the same directory gets the result from disk.
+    other = db.db(cache=ResultCache(path=str(tmp_path)))
+    assert other.aggregate('tension', stats=('count',)).rows()[0]['count'] == 3
+    assert [t.get_ID() for t in other.query(prefix="MSU")] == ["MSU00000", "MSU00001", "MSU00002"]
+    assert other.cache.disk_hits == 1
+
+    # Any write makes a new generation, and the results are computed again.
+    tubes.delete_tube("MSU00001")
+    dbman.update(logging=False)
+    assert tubes.generation() != generation
+    assert ids(prefix="MSU") == ["MSU00000", "MSU00002"]
+    assert other.aggregate('tension', stats=('count',)).rows()[0]['count'] == 2
+    assert len(tubes.cache) <= 2
+    assert "hit rate" in str(tubes.cache)
+    dbman.wipe('confirm')
+
+
+def test_id_index():
+    from . import tube, db
+    from .id_index import IDIndex
+    index = IDIndex(["MSU00012", "MSU00003", "ABC00007", "MSU00100", "odd one"])
+    assert list(index) == ["ABC00007", "MSU00003", "MSU00012", "MSU00100", "odd one"]
+    assert "MSU00012" in index and "MSU00013" not in index
+    assert index.contains(100) and not index.contains(99)
+    assert index.range(5, 100) == ["ABC00007", "MSU00012"]
+    assert index.range(None, 10) == ["MSU00003", "ABC00007"]
+    assert index.prefix("MSU000") == ["MSU00003", "MSU00012"]
+    assert index.prefix("X") == []
+
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    for i in (5, 1, 3):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tubes.add_tube(tube1)
+    dbman.update(logging=False)
+    assert list(tubes.get_IDs('sorted')) == ["MSU00001", "MSU00003", "MSU00005"]
+    assert tubes.get_IDs('set') == {"MSU00001", "MSU00003", "MSU00005"}
+    assert sorted(tubes.get_IDs()) == ["MSU00001", "MSU00003", "MSU00005"]
+    tubes.delete_tube("MSU00003")
+    dbman.update(logging=False)
+    assert tubes.id_index().range(2, 6) == ["MSU00005"]
+    with pytest.raises(ValueError):
+        tubes.get_IDs('tuple')
+    dbman.wipe('confirm')
+
+
+def test_db_batch():
+    from . import tube, db
+    from .data import tension
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+
+    def make(i, value):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(value))
+        return tube1
+    assert tubes.add_tubes(make(i, 350) for i in range(5)) == 5
+    assert tubes.add_tubes([]) == 0
+    # One file, and nothing left behind while staging.
+    assert [f.suffix for f in tubes.new_data_dir.iterdir()] == ['.batch']
+    dbman.update(logging=False)
+    assert sorted(tubes.get_IDs()) == [f"MSU0000{i}" for i in range(5)]
+
+    # Adding to a tube merges, like add_tube().
+    tubes.add_tubes([make(0, 340)])
+    tubes.overwrite_tubes([make(1, 330)])
+    tubes.delete_tubes(["MSU00002", tubes.get_tube("MSU00003")])
+    dbman.update(logging=False)
+    assert sorted(tubes.get_IDs()) == ["MSU00000", "MSU00001", "MSU00004"]
+    assert len(tubes.get_tube("MSU00000").tension.m_records) == 2
+    assert [r.tension for r in tubes.get_tube("MSU00001").tension.m_records] == [330]
+
+    # A partial tube stages nothing.
+    with pytest.raises(ValueError):
+        tubes.add_tubes([make(5, 350), tubes.get_tube("MSU00004", stations=['tension'])])
+    assert list(tubes.new_data_dir.iterdir()) == []
+    dbman.wipe('confirm')
+
+
+def test_db_staging_without_lock():
+    import portalocker
+    from . import tube, db
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    tube1 = tube.Tube()
+    tube1.set_ID("MSU00001")
+    # Staging doesn't wait for the lock the db_manager holds while updating.
+    with portalocker.Lock(str(tubes.lock_file), 'r+', timeout=1):
+        tubes.add_tube(tube1)
+        tubes.add_tubes([tube1])
+    assert sorted(f.suffix for f in tubes.new_data_dir.iterdir()) == ['.batch', '.tube']
+    # A file still being written is left for the next update.
+    (tubes.new_data_dir / "unfinished.tube.tmp").write_bytes(b"\x80")
+    dbman.update(logging=False)
+    assert tubes.get_IDs() == ["MSU00001"]
+    assert [f.name for f in tubes.new_data_dir.iterdir()] == ["unfinished.tube.tmp"]
+    (tubes.new_data_dir / "unfinished.tube.tmp").unlink()
+    dbman.wipe('confirm')
+
+
+def test_outbox(tmp_path):
+    from . import tube, db
+    from .outbox import Outbox
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+
+    def make(i):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        return tube1
+
+    # While new_data can't be written, records stay in the journal.
+    unreachable = db.db()
+    unreachable.new_data_dir = tmp_path / 'not a directory'
+    unreachable.new_data_dir.write_text('')
+    box = Outbox('test', unreachable, directory=tmp_path, delay=0, retry_interval=0.01)
+    for i in range(3):
+        box.add_tube(make(i))
+    box.delete_tube("MSU00001")
+    box.close()
+    assert box.errors and len(box) == 4
+    # A torn entry at the end of the journal is dropped.
+    with (tmp_path / 'test.journal').open('ab') as f:
+        f.write(b'\x10\x00')
+
+    with Outbox('test', tubes, directory=tmp_path, batch_size=3) as box:
+        assert len(box) == 4
+        box.add_tube(make(3))
+        assert box.flush() == 5
+        assert len(box) == 0 and box.flushed == 5
+    assert (tmp_path / 'test.journal').read_bytes() == b''
+    assert len(list(tubes.new_data_dir.iterdir())) == 2
+    dbman.update(logging=False)
+    assert sorted(tubes.get_IDs()) == ["MSU00000", "MSU00002", "MSU00003"]
+    dbman.wipe('confirm')
+
+
+def test_ingest(tmp_path):
+    from . import db, ingest
+    from .outbox import Outbox
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    lines = [
+        "leak\tJason\t0.00001\tMSU00001\t05/31/20262:15 PM\n",
+        "tension\tJason\t350.5\t91.2\t31.05.2026 14.15.00\tMSU00001\r\n",
+        "\n",
+        "dark_current\tJason\t0.5\t05/31/20262:20 PM\tMSU00002\n",
+        "swage\tJason\n",
+        "leak\tJason\tnot a number\tMSU00003\t05/31/20262:15 PM\n",
+        "leak\tJason\n",
+        "flush\n",
+    ]
+    answers = []
+    with Outbox('ingest', tubes, directory=tmp_path, delay=60) as outbox:
+        ingest.serve(lines, outbox, answers.append)
+    assert answers[:3] == ["ok MSU00001", "ok MSU00001", "ok MSU00002"]
+    assert answers[3] == "error unknown station 'swage'"
+    assert answers[4].startswith("error could not convert")
+    assert answers[5] == "error wrong number of fields for leak"
+    assert answers[6] == "ok 3"
+    dbman.update(logging=False)
+    tube1 = tubes.get_tube("MSU00001")
+    assert tube1.tension.m_records[0].tension == 350.5
+    assert tube1.leak.m_records[0].date.hour == 14
+    assert tubes.get_tube("MSU00002").dark_current.m_records[0].dark_current == 0.5
+    dbman.wipe('confirm')
+
+
+def test_lazy_startup():
+    import os
+    import sys
+    import subprocess
+    code = (
+        "import sys, sMDT.db; "
+        "print(' '.join(m for m in ('portalocker.utils', 'sMDT.query', 'sMDT.legacy') if m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=root, stdout=subprocess.PIPE, universal_newlines=True, check=True
+    ).stdout
+    assert output.strip() == ""
+
+    from .lazy import lazy_import
+    assert lazy_import('os') is os
+    try:
+        lazy_import('sMDT_no_such_module')
+        assert False
+    except ModuleNotFoundError:
+        pass
+
+
+def test_config(tmp_path, database_root):
+    from . import tube, db
+    from .config import Config, PACKAGE_ROOT
+    from .locks import Lock
+    assert Config().root == database_root.resolve()
+    assert Config(tmp_path / 'a').root != database_root.resolve()
+
+    # Two databases side by side don't see each other's tubes.
+    databases = []
+    for name in ('a', 'b'):
+        tubes = db.db(config=tmp_path / name)
+        dbman = db.db_manager(testing=True, config=tubes.config)
+        tube1 = tube.Tube()
+        tube1.set_ID("MSU0000" + str(len(databases)))
+        tubes.add_tube(tube1)
+        dbman.update(logging=True)
+        databases.append(tubes)
+        assert tubes.size() == 1
+        assert (tmp_path / name / 'activity.log').exists()
+    assert databases[0].get_IDs() == ["MSU00000"]
+    assert databases[1].get_IDs() == ["MSU00001"]
+    assert not list(database_root.glob('database*'))
+
+    # A database file given to the db_manager keeps its headers next to it.
+    dbman = db.db_manager(db_path=str(tmp_path / 'c' / 'database.s'), testing=True)
+    assert dbman.header_path == str((tmp_path / 'c' / Config().header_file.name).resolve())
+
+    lock = Lock("testing", config=tmp_path / 'a')
+    lock.lock()
+    assert (tmp_path / 'a' / 'sMDT' / 'locks' / 'testing.lock').exists()
+    assert not Lock("testing").is_locked()
+    lock.unlock()
+
+    # Without SMDT_ROOT, the lab's database next to the package.
+    import os
+    del os.environ['SMDT_ROOT']
+    assert Config().root == PACKAGE_ROOT and Config().is_default
+    assert Lock().LOCK_DIR == Lock.LOCK_DIR
+
+
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite', 'memory'])
+def test_storage_backend(tmp_path, backend):
+    import dbm
+    from . import tube
+    from .data import tension
+    import pickle
+    from .storage import open_store, store_path, copy_store, store_exists, compact_store, CompressedStore
+    path = str(store_path(backend, tmp_path, 'store'))
+    with pytest.raises((FileNotFoundError, *dbm.error)):
+        open_store(backend, path, 'r')
+
+    def make(i):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(340 + i))
+        return tube1
+
+    with open_store(backend, path, 'n') as store:
+        generation = store.generation()
+        store.put_batch((f"MSU0000{i}", make(i)) for i in range(5))
+        assert store.generation() != generation
+        store["MSU00009"] = make(9)
+        assert len(store) == store.size() == 6
+        assert sorted(store.keys()) == sorted(store) == [f"MSU0000{i}" for i in (0, 1, 2, 3, 4, 9)]
+        assert "MSU00003" in store and "MSU00005" not in store
+        assert store["MSU00003"].tension.get_record().tension == 343
+        with pytest.raises(KeyError):
+            store["MSU00005"]
+        assert store.get("MSU00005") is None
+        # get_many keeps the order asked for and skips what isn't there.
+        assert [key for key, value in store.get_many(["MSU00004", "MSU00005", "MSU00001"])] \
+            == ["MSU00004", "MSU00001"]
+        raw = dict(store.get_many(["MSU00002"], raw=True))
+        assert isinstance(raw["MSU00002"], bytes)
+        # Loaded values are copies.
+        loaded = store["MSU00002"]
+        loaded.tension.add_record(tension.TensionRecord(400))
+        assert len(store["MSU00002"].tension.get_record('all')) == 1
+        generation = store.generation()
+        del store["MSU00009"]
+        assert store.generation() != generation
+        with pytest.raises(KeyError):
+            store.delete("MSU00009")
+        assert sorted(key for key, value in store.iterate()) == [f"MSU0000{i}" for i in range(5)]
+        assert sorted(value.get_ID() for value in store.values()) == sorted(store.keys())
+        store.put_batch([("MSU00000", raw["MSU00002"])], raw=True)
+        copy = str(store_path(backend, tmp_path, 'copy'))
+        store.snapshot(copy)
+        store.delete("MSU00001")
+
+    with open_store(backend, path, 'r') as store:
+        assert len(store) == 4
+        assert store["MSU00000"].get_ID() == "MSU00002"
+    with open_store(backend, copy, 'r') as store:
+        assert len(store) == 5
+    assert copy_store(copy, str(tmp_path / 'switched.sqlite'), backend, 'sqlite') == 5
+    with open_store('sqlite', str(tmp_path / 'switched.sqlite'), 'r') as store:
+        assert store["MSU00004"].tension.get_record().tension == 344
+    assert store_exists(backend, path) and not store_exists(backend, str(tmp_path / 'none'))
+    compact_store(backend, path)
+    with open_store(backend, path, 'r') as store:
+        assert sorted(store) == ["MSU00000", "MSU00002", "MSU00003", "MSU00004"]
+
+    # Compressed values read back the same, raw=True gives plain pickles.
+    compressed = str(store_path(backend, tmp_path, 'compressed'))
+    with CompressedStore(open_store(backend, compressed, 'n')) as store:
+        store.put_batch((f"MSU0000{i}", make(i)) for i in range(3))
+        assert store["MSU00001"].tension.get_record().tension == 341
+        assert "MSU00002" in store and len(store) == 3
+        assert pickle.loads(dict(store.get_many(["MSU00002"], raw=True))["MSU00002"]).get_ID() == "MSU00002"
+        assert isinstance(store.store._get("MSU00002"), bytes)
+
+    with open_store(backend, path, 'n') as store:
+        assert len(store) == 0
+
+
+def test_db_metadata():
+    from . import tube, db
+    from .data import tension, swage
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    assert tubes.metadata() is None
+    assert tubes.size() == 0
+
+    def make(i, stations=('tension',)):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        if 'tension' in stations:
+            tube1.tension.add_record(tension.TensionRecord(340 + i))
+        if 'swage' in stations:
+            tube1.swage.add_record(swage.SwageRecord(raw_length=i))
+        return tube1
+    tubes.add_tubes(make(i) for i in range(4))
+    tubes.add_tube(make(0, ('tension', 'swage')))
+    dbman.update(logging=False)
+    metadata = tubes.metadata()
+    assert metadata.tubes == tubes.size() == 4
+    assert metadata.records == {'tension': 5, 'swage': 1}
+    assert metadata.count() == 6 and metadata.count('swage') == 1
+    assert metadata.generation == tubes.generation()
+    assert metadata.pending == 0
+
+    tubes.overwrite_tube(make(1, ('swage',)))
+    tubes.delete_tube("MSU00002")
+    dbman.update(logging=False)
+    metadata = tubes.metadata()
+    assert metadata.tubes == 3
+    assert metadata.records == {'tension': 3, 'swage': 2}
+
+    # Stale or missing metadata is counted again from the headers.
+    dbman.metadata_path.unlink()
+    assert tubes.size() == 3
+    tubes.add_tube(make(5))
+    dbman.update(logging=False)
+    assert tubes.metadata().records == {'tension': 4, 'swage': 2}
+    dbman.rebuild_headers()
+    assert tubes.metadata().tubes == 4 and tubes.metadata().generation == tubes.generation()
+    dbman.wipe('confirm')
+    assert tubes.metadata() is None
+
+
+def test_db_tiering(database_root):
+    from . import tube, db, tiering
+    from .data import tension
+    from .data.status import UMich_Status
+    from .header import TubeHeader
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+
+    def make(i):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(340 + i))
+        return tube1
+    tubes.add_tubes(make(i) for i in range(4))
+    dbman.update(logging=False)
+    # Nothing is cold yet.
+    assert dbman.tier(logging=False) == 0
+
+    exported = database_root / 'Exported_Tubes'
+    exported.mkdir()
+    (exported / 'shipment.csv').write_text(
+        "Logger,Barcode,First Tension Date\nSara,MSU00001,x\nSara,MSU00002,x\n"
+    )
+    (exported / 'other.csv').write_text("no,barcodes\n1,2\n")
+    assert tiering.shipped_barcodes(exported) == {"MSU00001", "MSU00002"}
+    assert tiering.is_cold(TubeHeader("MSU00009", status_umich_code=int(UMich_Status.UMICH_COMPLETE)))
+    assert not tiering.is_cold(TubeHeader("MSU00009"))
+
+    # tier() leaves the files a reader may have open where they are.
+    files = {f: f.stat().st_ino for f in database_root.glob('database.s*')}
+    assert dbman.tier(logging=False) == 2
+    assert files and {f: f.stat().st_ino for f in database_root.glob('database.s*')} == files
+    dbman.compact(logging=False)
+    assert sorted(tubes.get_IDs()) == ["MSU00000", "MSU00003"]
+    assert sorted(tubes.get_IDs(include_cold=True)) == [f"MSU0000{i}" for i in range(4)]
+    assert tubes.get_IDs('sorted', include_cold=True).contains(2)
+    # size() counts the cold tier only when asked, like get_IDs().
+    assert tubes.size() == len(tubes.get_IDs()) == 2
+    assert tubes.size(include_cold=True) == len(tubes.get_IDs(include_cold=True)) == 4
+    dbman.metadata_path.unlink()
+    assert tubes.size() == 2 and tubes.size(include_cold=True) == 4
+    assert tubes.metadata() is None
+    dbman.update(logging=False)
+    assert tubes.metadata().tubes == 2 and tubes.metadata().cold == 2
+    # Backups have the cold tier too.
+    backup = database_root.parent / 'backup'
+    backup.mkdir()
+    files = tubes.snapshot(str(backup / tubes.db_file.name))
+    assert {f.name.split('.')[0] for f in files} == {'database', 'cold', 'cold_headers'}
+    backed_up = db.db(config=str(backup))
+    assert backed_up.get_tube("MSU00001").tension.get_record().tension == 341
+    # Lookups by ID find cold tubes, scans only with include_cold.
+    assert tubes.get_tube("MSU00001").tension.get_record().tension == 341
+    assert tubes.get_header("MSU00002").barcode == "MSU00002"
+    with pytest.raises(KeyError):
+        tubes.get_tube("MSU00009")
+    assert [t.get_ID() for t in tubes.get_tubes(["MSU00002", "MSU00009", "MSU00000"])] \
+        == ["MSU00002", "MSU00000"]
+    assert len(tubes.get_tubes()) == 2
+    assert len(tubes.get_tubes(include_cold=True)) == 4
+    assert len(list(tubes.iter_tubes(include_cold=True, stations=['tension']))) == 4
+    assert len(list(tubes.list_headers(include_cold=True))) == 4
+    assert [t.get_ID() for t in tubes.query(prefix="MSU")] == ["MSU00000", "MSU00003"]
+    assert [t.get_ID() for t in tubes.query(prefix="MSU", include_cold=True)] \
+        == [f"MSU0000{i}" for i in range(4)]
+    assert [t.get_ID() for t in tubes.query(barcodes=["MSU00001"])] == ["MSU00001"]
+
+    # A cold tube written to comes back, and goes again on the next tier().
+    tubes.add_tube(make(1))
+    tubes.delete_tube("MSU00002")
+    dbman.update(logging=False)
+    assert sorted(tubes.get_IDs()) == ["MSU00000", "MSU00001", "MSU00003"]
+    assert len(tubes.get_tube("MSU00001").tension.m_records) == 2
+    assert tubes.size() == 3
+    assert tubes.metadata().cold == 0
+    assert dbman.tier(logging=False) == 1
+    assert tubes.metadata().records == {'tension': 2}
+    dbman.wipe('confirm')
+    assert tubes.get_IDs(include_cold=True) == []
+
+
+def test_db_wip():
+    import datetime
+    from . import tube, db, wip
+    from .data import swage, tension
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    assert tubes.get_wip("MSU00000") is None
+
+    def make(i, days, length=1000):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        date = datetime.datetime.now() - datetime.timedelta(days=days)
+        tube1.swage.add_record(swage.SwageRecord(raw_length=length + i, date=date))
+        return tube1
+    # Swaged this week, and half a year ago.
+    tubes.add_tubes([make(0, 1), make(1, 2), make(2, 180)])
+    dbman.update(logging=False)
+    assert len(tubes.wip()) == 2
+    entry = tubes.get_wip("MSU00001")
+    assert entry.raw_length == 1001 and entry.tension is None
+    assert entry.status() == tubes.get_tube("MSU00001").status()
+    assert tubes.get_wip("MSU00002") is None
+
+    # Kept up to date with each update, without being built again.
+    tube1 = tube.Tube()
+    tube1.set_ID("MSU00001")
+    tube1.tension.add_record(tension.TensionRecord(350))
+    tubes.add_tube(tube1)
+    tubes.delete_tube("MSU00000")
+    dbman.update(logging=False)
+    assert tubes.get_wip("MSU00001").tension == 350
+    assert tubes.get_wip("MSU00000") is None
+    assert [e.barcode for e in tubes.wip()] == ["MSU00001"]
+    assert tubes.wip().generation == tubes.generation()
+    # A stale cache is built again from the database.
+    dbman.wip_path.unlink()
+    tubes.add_tube(make(3, 3))
+    dbman.update(logging=False)
+    assert sorted(e.barcode for e in tubes.wip()) == ["MSU00001", "MSU00003"]
+
+    # Tubes drop out once swaged longer than WINDOW ago.
+    cache = tubes.wip()
+    cache.expire(datetime.datetime.now() + wip.WINDOW)
+    assert len(cache) == 0 and cache.changed
+    dbman.wipe('confirm')
+    assert tubes.get_wip("MSU00001") is None
+
+
+def test_db_compression(monkeypatch, tmp_path):
+    import pickle
+    from . import tube, db, compression
+    from .config import Config
+    from .data import tension
+    from .storage import open_store, CompressedStore
+
+    def make(i):
+        tube1 = tube.Tube()
+        tube1.set_ID(f"MSU0000{i}")
+        tube1.tension.add_record(tension.TensionRecord(340 + i))
+        return tube1
+    with pytest.raises(ValueError):
+        Config(compression='zstd')
+    assert Config().compression is None and Config().cold_compression == 'zlib'
+
+    # Written plain, then with each codec: every value reads back.
+    path = str(tmp_path / 'store')
+    dictionary = compression.concatenated_dictionary([pickle.dumps(make(i), 4) for i in range(3)])
+    with open_store('memory', path, 'n') as store:
+        store.put_batch([("MSU00000", make(0))])
+    with CompressedStore(open_store('memory', path), codec='lzma') as store:
+        store["MSU00001"] = make(1)
+    with CompressedStore(open_store('memory', path), codec='zlib', dictionary=dictionary) as store:
+        store["MSU00002"] = make(2)
+        assert store.store._get("MSU00002")[:1] == b'\x78'
+    with CompressedStore(open_store('memory', path), codec=None) as store:
+        with pytest.raises(ValueError):
+            store["MSU00002"]
+    with CompressedStore(open_store('memory', path), dictionaries={compression.dictionary_id(dictionary): dictionary}) as store:
+        assert [t.tension.get_record().tension for key, t in store.iterate()] == [340, 341, 342]
+
+    # A database switched to zlib: new tubes are compressed when written,
+    # compress() builds a dictionary and rewrites the rest.
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    tubes.add_tubes(make(i) for i in range(3))
+    dbman.update(logging=False)
+    monkeypatch.setenv('SMDT_COMPRESSION', 'zlib')
+    monkeypatch.setenv('SMDT_COLD_COMPRESSION', 'lzma')
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    tubes.add_tube(make(3))
+    dbman.update(logging=False)
+    with open_store(dbman.backend, dbman.path, 'r') as stored:
+        assert stored._get("MSU00000")[:1] == b'\x80' and stored._get("MSU00003")[:1] == b'\x78'
+    assert dbman.compress(logging=False) == 4
+    current, dictionaries = compression.load_dictionaries(tubes.config.dictionary_file)
+    assert current is not None and len(dictionaries) == 1
+    with open_store(dbman.backend, dbman.path, 'r') as stored:
+        assert all(data[1] & 0x20 for key, data in stored.iterate(raw=True))
+    assert [t.tension.get_record().tension for t in tubes.get_tubes(sorted(tubes.get_IDs()))] == [340, 341, 342, 343]
+    # Backups have the dictionary too, so they can be read.
+    backup = tmp_path / 'backup'
+    backup.mkdir()
+    files = tubes.snapshot(str(backup / tubes.db_file.name))
+    assert backup / 'database.zdict' in files
+    assert db.db(config=str(backup)).get_tube("MSU00002").tension.get_record().tension == 342
+    # The cold tier with its own codec.
+    assert dbman.tier({"MSU00001"}, logging=False) == 1
+    with open_store(dbman.backend, dbman.cold_path, 'r') as stored:
+        assert stored._get("MSU00001")[:6] == b'\xfd7zXZ\x00'
+    assert tubes.get_tube("MSU00001").tension.get_record().tension == 341
+    dbman.wipe('confirm')
+
+
+def test_db_unreadable_staged_file():
+    import os
+    import pickle
+    from . import tube, db
+    from .data import tension
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    tube1 = tube.Tube()
+    tube1.set_ID("MSU00001")
+    tube1.tension.add_record(tension.TensionRecord(350))
+    data = pickle.dumps(tube1)
+    # Truncated, as an old station PC may leave it: one written a while
+    # ago and one that may still be being written.
+    old = dbman.new_data_dir / "0_old.tube"
+    old.write_bytes(data[:len(data) // 2])
+    os.utime(old, (0, 0))
+    young = dbman.new_data_dir / "1_young.tube"
+    young.write_bytes(b'\x80\x04garbage')
+    tubes.add_tube(tube1)
+    dbman.update(logging=False)
+    assert tubes.get_IDs() == ["MSU00001"]
+    assert (dbman.quarantine_dir / "0_old.tube").exists() and not old.exists()
+    # Left for the next update.
+    assert young.exists()
+    young.unlink()
+    dbman.wipe('confirm')
+
+
+def test_ingest_submit(tmp_path):
+    import time
+    import socket
+    import threading
+    from . import db, ingest
+    from .outbox import Outbox
+    tubes = db.db()
+    dbman = db.db_manager(testing=True)
+    dbman.wipe('confirm')
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    # No worker: the script journals the tube itself.
+    with pytest.raises(ConnectionError):
+        ingest.send('leak', 'Jason', '0.00001', 'MSU00001', '05/31/20262:15 PM', port=port)
+    assert ingest.submit('leak', 'Jason', '0.00001', 'MSU00001', '05/31/20262:15 PM', port=port) == "MSU00001"
+
+    # With a worker, the line goes to it.
+    with Outbox('ingest', tubes, directory=tmp_path, delay=60) as outbox:
+        threading.Thread(target=ingest.serve_socket, args=(port, outbox), daemon=True).start()
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                break
+            except OSError:
+                time.sleep(0.01)
+        assert ingest.submit('dark_current', 'Jason', 0.5, '05/31/20262:20 PM', 'MSU00002', port=port) == "MSU00002"
+        with pytest.raises(ValueError):
+            ingest.submit('leak', 'Jason', 'not a number', 'MSU00003', '05/31/20262:15 PM', port=port)
+        assert outbox.flush() == 1
+    dbman.update(logging=False)
+    assert sorted(tubes.get_IDs()) == ["MSU00001", "MSU00002"]
+    assert tubes.get_tube("MSU00002").dark_current.m_records[0].dark_current == 0.5
+    dbman.wipe('confirm')
@@ -0,0 +1,67 @@
+###############################################################################
+#   File: tiering.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: Which tubes belong in the cold tier. A tube that is UMich
+#       complete, or was shipped (it's in a CSV the export programs wrote
+#       to Exported_Tubes), is rarely looked at again. db_manager.tier()
+#       moves such tubes out of the database every program opens into the
+#       cold store (cold.s, with cold_headers.s), where they are kept
+#       compressed. db.get_tube() and the other lookups by ID still find
+#       them there, and reports ask for them with include_cold=True. The
+#       cold store is compressed with the cold_compression of the Config,
+#       zlib unless changed (see compression.py).
+#
+#   Known Issues:
+#       Tubes only leave the cold tier when the db_manager writes to them
+#       again, they are moved back to the database then.
+#
+#   Workarounds:
+#
+###############################################################################
+
+import csv
+from pathlib import Path
+
+from .data.status import UMich_Status
+from .compression import open_compressed
+
+# The column of the exported CSVs holding the barcodes.
+BARCODE_COLUMN = 'Barcode'
+
+
+def shipped_barcodes(directory):
+    """
+    The barcodes of every tube in the CSVs in directory, as written by
+    Export_Tubes.py and ExportTubesGUI. Files without a Barcode column are
+    skipped. An empty set if directory doesn't exist.
+    """
+    barcodes = set()
+    directory = Path(directory)
+    if not directory.is_dir():
+        return barcodes
+    for path in sorted(directory.glob('*.csv')):
+        with path.open(newline='') as f:
+            rows = csv.reader(f)
+            header = next(rows, None)
+            if header is None or BARCODE_COLUMN not in header:
+                continue
+            column = header.index(BARCODE_COLUMN)
+            for row in rows:
+                if len(row) > column and row[column].strip():
+                    barcodes.add(row[column].strip())
+    return barcodes
+
+
+def is_cold(header, shipped=frozenset()):
+    """True if the tube of the TubeHeader header belongs in the cold tier."""
+    return header.status_umich() == UMich_Status.UMICH_COMPLETE or header.barcode in shipped
+
+
+def open_cold(backend, path, flag='c', codec='zlib', dictionary_file=None):
+    """
+    Opens the cold store at path, whose tubes are kept compressed with codec
+    and the dictionary of dictionary_file, see compression.open_compressed().
+    """
+    return open_compressed(backend, path, flag, codec, dictionary_file)
@@ -0,0 +1,169 @@
+###############################################################################
+#   File: wip.py
+#   Author(s): sMDT lab
+#   Date Created: 19 October, 2026
+#
+#   Purpose: The work in progress cache, what the stations need to know
+#       about the tubes on the floor. A tube is in production if it was
+#       swaged in the last WINDOW and isn't done yet (UMich complete, see
+#       tiering.py). For each, a WIPEntry keeps its
+#       status and the values of its last swage, tension, leak and dark
+#       current records. The db_manager keeps the cache up to date with every
+#       update and writes it next to the database (database.wip), and
+#       db.get_wip() looks barcodes up in it, without opening the database.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import datetime
+
+from .data.status import Status
+from .tiering import is_cold
+
+# How long after swaging a tube counts as in production.
+WINDOW = datetime.timedelta(weeks=4)
+
+
+def _last(tube, station, field):
+    # The field of the last record of the station, or None.
+    station = tube.peek(station)
+    if station is None or not station.m_records:
+        return None
+    return getattr(station.m_records[-1], field, None)
+
+
+class WIPEntry:
+    """
+    What the stations look up about a tube in production: its status, its
+    manufacture (swage) date, and the values of its last records, None for
+    a station without any.
+    """
+    __slots__ = ('barcode', 'mfg_date', 'status_code', 'raw_length', 'tension',
+                 'leak_rate', 'dark_current')
+
+    def __init__(self, barcode, mfg_date=None, status_code=None, raw_length=None,
+                 tension=None, leak_rate=None, dark_current=None):
+        self.barcode = barcode
+        self.mfg_date = mfg_date
+        self.status_code = status_code
+        self.raw_length = raw_length
+        self.tension = tension
+        self.leak_rate = leak_rate
+        self.dark_current = dark_current
+
+    @staticmethod
+    def from_tube(tube, header):
+        """The entry of tube, whose TubeHeader is header."""
+        return WIPEntry(
+            header.barcode, header.mfg_date, header.status_code,
+            raw_length=_last(tube, 'swage', 'raw_length'),
+            tension=_last(tube, 'tension', 'tension'),
+            leak_rate=_last(tube, 'leak', 'leak_rate'),
+            dark_current=_last(tube, 'dark_current', 'dark_current'),
+        )
+
+    def status(self):
+        """The tube's status(), as a Status, or None if it had none."""
+        if self.status_code is None:
+            return None
+        return Status(self.status_code)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"WIPEntry({self.barcode}, raw_length={self.raw_length}, tension={self.tension})"
+
+
+def _recent(date, now, window):
+    # True if date is less than window before now.
+    start = (now or datetime.datetime.now()) - window
+    if not isinstance(date, datetime.datetime):
+        # A date without a time.
+        start = start.date()
+    return date >= start
+
+
+def in_production(header, now=None, window=WINDOW):
+    """True if the tube of the TubeHeader header belongs in the cache."""
+    if header.mfg_date is None or is_cold(header):
+        return False
+    return _recent(header.mfg_date, now, window)
+
+
+class WIPCache:
+    """
+    The WIPEntry of every tube in production, by barcode, as of the
+    database's generation. changed is set whenever an entry is added,
+    changed or dropped.
+    """
+    def __init__(self, entries=None, generation=None, window=WINDOW):
+        self.entries = entries if entries is not None else {}
+        self.generation = generation
+        self.window = window
+        self.changed = False
+
+    @staticmethod
+    def build(tubes, headers, skip=(), now=None, window=WINDOW):
+        """
+        The cache of the tubes in the open stores tubes and headers, leaving
+        out the header keys in skip. Only the tubes in production are loaded.
+        """
+        cache = WIPCache(window=window)
+        found = {
+            key: header for key, header in headers.items()
+            if key not in skip and in_production(header, now, window)
+        }
+        for key, tube in tubes.get_many(sorted(found)):
+            cache.entries[key] = WIPEntry.from_tube(tube, found[key])
+        cache.changed = True
+        return cache
+
+    def get(self, barcode):
+        """The WIPEntry of barcode, or None if it isn't in production."""
+        return self.entries.get(barcode)
+
+    def __contains__(self, barcode):
+        return barcode in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def update(self, tube, header, now=None):
+        """Puts in the entry of a tube just written, or drops it if it's no longer in production."""
+        if in_production(header, now, self.window):
+            self.entries[header.barcode] = WIPEntry.from_tube(tube, header)
+            self.changed = True
+        else:
+            self.discard(header.barcode)
+
+    def discard(self, barcode):
+        """Drops the entry of barcode, if there is one."""
+        if self.entries.pop(barcode, None) is not None:
+            self.changed = True
+
+    def expire(self, now=None):
+        """Drops the tubes swaged longer than window ago."""
+        for barcode, entry in list(self.entries.items()):
+            if not _recent(entry.mfg_date, now, self.window):
+                self.discard(barcode)
+
+    def __getstate__(self):
+        return {'entries': self.entries, 'generation': self.generation, 'window': self.window}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.changed = False
+
+    def __repr__(self):
+        return f"WIPCache({len(self.entries)} tubes)"
@@ -17,20 +17,31 @@ from datetime import datetime
 
 DROPBOX_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(DROPBOX_DIR)
-from sMDT import db, tube
+from sMDT import tube
 from sMDT.data import swage
 from sMDT.data.status import ErrorCodes
+from sMDT.outbox import Outbox
+
+# Comments are journaled locally and written to the database in the background
+# by an outbox, opened on the first write so importing this doesn't take its lock
+outbox = None
+
+
+def get_outbox():
+    global outbox
+    if outbox is None:
+        outbox = Outbox('comment')
+    return outbox
 
 
 def write(code, lengths, cleanCode, name):
-    database = db.db()
     tube1 = tube.Tube()
     tube1.set_ID(code)
     tube1.swage.add_record(swage.SwageRecord(raw_length=float(lengths[0]), 
                                              swage_length=float(lengths[1]), 
                                              clean_code=cleanCode, 
                                              user=name))
-    database.add_tube(tube1)
+    get_outbox().add_tube(tube1)
                     
 
 #######################################
@@ -62,11 +73,10 @@ def handle_enter(event):
         errorCode = errorCode.split(':')[0]
         errorCode = int(errorCode)
 
-        database = db.db()
         tube2 = tube.Tube()
         tube2.set_ID(barcode)
         tube2.new_comment((comment, name, datetime.now(), ErrorCodes(errorCode)))
-        database.add_tube(tube2)
+        get_outbox().add_tube(tube2)
         entry_barcode.delete(0, tk.END)
         sv_errorCode.set("0: NO_ERROR")
         text_entryStatus.delete("1.0", tk.END)
@@ -1,18 +1,14 @@
-from sMDT import db
-from sMDT import tube as Tube
-from sMDT.data.leak import LeakRecord
 
 import sys
-import datetime
+from sMDT import ingest
 
 
 def main(name, leak, barcode, date):
-    date = datetime.datetime.strptime(date, '%m/%d/%Y%I:%M %p')
-
-    datab = db.db()
-    tube = Tube()
-    tube.set_ID(barcode)
-    tube.leak.add_record(LeakRecord(leak_rate=leak,
-                                    date=date, 
-                                    user=name))
-    datab.add_tube(tube)
\ No newline at end of file
+    # One run per measurement. The line goes to the ingest worker
+    # (python -m sMDT.ingest --port 5757) if it's running, so this doesn't
+    # open and sync an outbox every time; otherwise the tube is journaled in
+    # the labview outbox, so the record is kept if the database can't be
+    # reached, and staged by a later run.
+    # The leak rate is stored as a float, before 2026-10 it was stored as
+    # the string LabVIEW passed.
+    ingest.submit('leak', name, leak, barcode, date)
@@ -1,20 +1,16 @@
 import sys
 import os
-import datetime
 #DROPBOX_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 #sys.path.append(DROPBOX_DIR)
-from sMDT import db
-from sMDT import tube as Tube
-from sMDT.data.tension import TensionRecord
+from sMDT import ingest
 
-def main(name, tension, frequency, date, barcode):
-    date = datetime.datetime.strptime(date, '%d.%m.%Y %H.%M.%S')
 
-    datab = db.db()
-    tube = Tube()
-    tube.set_ID(barcode)
-    tube.tension.add_record(TensionRecord(tension=tension,
-                                          frequency=frequency,
-                                          date=date,
-                                          user=name))
-    datab.add_tube(tube)
+def main(name, tension, frequency, date, barcode):
+    # One run per measurement. The line goes to the ingest worker
+    # (python -m sMDT.ingest --port 5757) if it's running, so this doesn't
+    # open and sync an outbox every time; otherwise the tube is journaled in
+    # the labview outbox, so the record is kept if the database can't be
+    # reached, and staged by a later run.
+    # The tension and frequency are stored as floats, before 2026-10 they
+    # were stored as the strings LabVIEW passed.
+    ingest.submit('tension', name, tension, frequency, date, barcode)
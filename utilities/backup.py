@@ -7,7 +7,6 @@ sys.path.append(DROPBOX_DIR)
 
 from sMDT import tube,db
 
-import shelve
 import zipfile
 import datetime
 
@@ -53,12 +52,10 @@ if __name__ == "__main__":
         os.mkdir(backup_dir)
 
     database1 = db.db()
-    database2 = db.db(os.path.join(backup_dir, "database.s"))
-    id_list = database1.get_IDs()
-    backup_database = shelve.open(os.path.join(backup_dir, "database.s"))
-    for id in progressBar(id_list, prefix = 'Backing up database:', suffix = 'Complete', length = 50):
-        backup_database[id] = database1.get_tube(id)
-    backup_database.close()
+    # A copy of the store as it is now, in whatever backend the database uses.
+    # Written under the lock, so no update can land halfway through.
+    print("Backing up database...")
+    backup_files = database1.snapshot(os.path.join(backup_dir, os.path.basename(str(database1.db_file))))
 
     if not os.path.isdir(backup_dir):
         os.mkdir(backup_dir)
@@ -72,10 +69,12 @@ if __name__ == "__main__":
             i += 1
 
 
-    zf.write(os.path.join(backup_dir, "database.s"), arcname="database.s")
+    for backup_file in backup_files:
+        zf.write(str(backup_file), arcname=backup_file.name)
     zf.close()
 
-    os.remove(os.path.join(backup_dir, "database.s"))
+    for backup_file in backup_files:
+        os.remove(str(backup_file))
 
 
     print("Backup done.")
\ No newline at end of file
@@ -0,0 +1,28 @@
+###############################################################################
+#   File: compact_database.py
+#   Author(s): sMDT lab
+#   Date Created: October, 2026
+#
+#   Purpose: This simple script compacts the database files, giving back the
+#   space of the tubes moved to the cold tier, deleted or compressed again.
+#   The files are replaced, so close every station program, the viewer and
+#   the DatabaseManager before running it.
+#
+#   Known Issues:
+#
+#   Workarounds:
+#
+###############################################################################
+
+import os
+import sys
+DROPBOX_DIR = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(DROPBOX_DIR)
+
+from sMDT import db
+
+if __name__ == "__main__":
+    test = input("Close every program using the database before compacting it.\nType exactly 'confirm' to continue. ")
+    if test == 'confirm':
+        db_man = db.db_manager()
+        db_man.compact()
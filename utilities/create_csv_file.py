@@ -11,29 +11,16 @@ from sMDT import db
 def keyDay(record):
     return record.date.day
 
-def getFirstTensionRecord(records):
-    earliestTensionDate = datetime.datetime(year=datetime.MAXYEAR, month=1, day=1)
-    for record in records:
-        if record.date < earliestTensionDate:
-            earliestTensionDate = record.date
-    firstTensionRecord = None
-    firstTensionDate = datetime.datetime(year=datetime.MINYEAR, month=1, day=1)
-    for record in records:
-        if record.date.day == earliestTensionDate.day and record.date.month == earliestTensionDate.month:
-            if record.date > firstTensionDate:
-                firstTensionRecord = record
-                firstTensionDate = record.date
-    return firstTensionRecord
+def getFirstTensionRecord(station):
+    # The last tension record on the first day the tube was tensioned.
+    summary = station.summary()
+    return summary.day_last(summary.first_day)
 
 
-def getLastTension(records):
-    lastRecordDate = datetime.datetime(year=datetime.MINYEAR, month=1, day=1)
-    lastRecord = None
-    for record in records:
-        if record.date > lastRecordDate:
-            lastRecord = record
-            lastRecordDate = lastRecord.date
-    return lastRecord
+def getLastTension(station):
+    # The last dated tension record.
+    summary = station.summary()
+    return summary.day_last(summary.last_day)
 
 def swageDateKey(tube):
     try:
@@ -46,7 +33,7 @@ def swageDateKey(tube):
         return datetime.datetime(year=datetime.MINYEAR, month=1, day=1)
 
 datab = db.db()
-tubes = datab.get_tubes()
+tubes = datab.get_tubes(include_cold=True)
 tubes.sort(key=swageDateKey, reverse=True)
 
 f = open('database.csv','w')
@@ -61,7 +48,7 @@ for tube in tubes:
     ###### Tension Data
     # Returns the last tension record on the first day it was tensioned
     try:
-        record = getFirstTensionRecord(tube.tension.get_record(mode='all'))
+        record = getFirstTensionRecord(tube.tension)
         first_tension = record.tension
         first_frequency = record.frequency
         first_tension_date = record.date 
@@ -72,7 +59,7 @@ for tube in tubes:
 
     # Returns the last tension record, this is defined as the second tension
     try:
-        lastRecord = getLastTension(tube.tension.get_record(mode='all'))
+        lastRecord = getLastTension(tube.tension)
         last_tension = lastRecord.tension
         last_frequency = lastRecord.frequency
         last_tension_date = lastRecord.date
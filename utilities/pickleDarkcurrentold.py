@@ -3,7 +3,6 @@ import os
 import sys
 import pickle
 import datetime
-import random
 
 from sMDT import db
 from sMDT.tube import Tube
@@ -20,7 +19,8 @@ archive_directory = os.path.join("DarkCurrentStation","archive_old")
 new_data_directory = os.path.join("sMDT", "new_data")
 
 datab = db.db()
-tubes_in_database = datab.get_IDs()
+# a set, so checking every line's barcode against it is quick
+tubes_in_database = datab.get_IDs('set')
 
 for directory in [darkcurrent_directory, CSV_directory, archive_directory, new_data_directory]:
     if not os.path.isdir(directory):
@@ -67,13 +67,10 @@ for filename in os.listdir(CSV_directory):
                                                             date=sDate,
                                                             voltage=voltage))
 
-            pickled_filename = str(datetime.datetime.now().timestamp()) + \
-                                str(random.randrange(100, 999)) + 'darkcurrentold.tube'
-
-            with open(os.path.join(new_data_directory, pickled_filename), "wb") as f:
-                pickle.dump(tube, f)
-                put_in_database = True
-                count += 1
+            # Staged whole, so the manager never reads a half written file
+            db.stage(new_data_directory, 'darkcurrentold.tube', lambda f: pickle.dump(tube, f))
+            put_in_database = True
+            count += 1
 
     if put_in_database:
         os.replace(os.path.join(CSV_directory, filename), os.path.join(archive_directory, filename))
@@ -145,12 +142,9 @@ for filename in filenames:
                                                                         date=sDate,
                                                                         voltage=voltage))
                         tube.new_comment(("This tube's dark current tests were the average of " + str(barcodes), "Jason", datetime.datetime.now(), ErrorCodes(0)))
-                        pickled_filename = str(datetime.datetime.now().timestamp()) + \
-                                            str(random.randrange(100, 999)) + 'darkcurrentold.tube'
-
-                        with open(os.path.join(new_data_directory, pickled_filename), "wb") as f:
-                            pickle.dump(tube, f)
-                            put_in_database = True
+                        db.stage(new_data_directory, 'darkcurrentold.tube',
+                                 lambda f: pickle.dump(tube, f))
+                        put_in_database = True
                         count +=1
                 except KeyError:
                     break  # If a tube doesn't exist in the database, then don't add the dark current
@@ -217,16 +211,12 @@ for filename in os.listdir(CSV_directory):
                                                             date=sDate,
                                                             voltage=voltage))
             tube.new_comment(("This tube was in bad data but was recovered", "Jason", datetime.datetime.now(), ErrorCodes(0)))
-            pickled_filename = str(datetime.datetime.now().timestamp()) + \
-                                str(random.randrange(100, 999)) + 'darkcurrentold.tube'
-
-            with open(os.path.join(new_data_directory, pickled_filename), "wb") as f:
-                pickle.dump(tube, f)
-                put_in_database = True
+            db.stage(new_data_directory, 'darkcurrentold.tube', lambda f: pickle.dump(tube, f))
+            put_in_database = True
             count += 1
 
     if put_in_database:
         os.replace(os.path.join(CSV_directory, filename), os.path.join(archive_directory, filename))
 print(str(count) + " tubes were recovered from the bad tube directory.")
 print("END OF BAD TUBE SINGLE TESTS")
-f.close()
\ No newline at end of file
+f_bad.close()
\ No newline at end of file
@@ -15,6 +15,7 @@
 #
 #   Updates:
 #   2022-06, Reinhard Schwienhorst: Insert counter and delays 
+#   2026-10, Tubes are added in two batches (db.add_tubes), no more delays
 #
 ###############################################################################
 
@@ -259,37 +260,40 @@ lst = umich['tubeID'].tolist()
 
 print("Copying ",len(tube_dict)," tubes from old to new database")
 
-counter=0
-for barcode in tube_dict:
-
-        # Creating new tube object with UMich attributes
-        tube = Tube()
-        tube.set_ID(barcode)
-        old = tube_dict[barcode]
-        counter += 1
-        # update and maybe sleep every 1000 tubes to give the manager time to keep up
-        if counter%1000 == 0:
-                print("Processing tube ",counter," , ID ",barcode)
-                time.sleep(3)
-
-        # Tube object has records from MSU database
-        tube = msu_tube_records(tube, old)
-
-        # Checks if the MSU barcode is in the UMich list of barcodes
-        # If not in list, don't create UMich records for the tube
-        if barcode in lst:
-                row = umich.index[(umich['tubeID'] == barcode).tolist()]
-                #tube = umich_tube_records(tube, row)
-        else:
-                pass   
+def msu_tubes():
+        counter=0
+        for barcode in tube_dict:
+
+                # Creating new tube object with UMich attributes
+                tube = Tube()
+                tube.set_ID(barcode)
+                old = tube_dict[barcode]
+                counter += 1
+                # show progress every 1000 tubes
+                if counter%1000 == 0:
+                        print("Processing tube ",counter," , ID ",barcode)
+
+                # Tube object has records from MSU database
+                tube = msu_tube_records(tube, old)
+
+                # Checks if the MSU barcode is in the UMich list of barcodes
+                # If not in list, don't create UMich records for the tube
+                if barcode in lst:
+                        row = umich.index[(umich['tubeID'] == barcode).tolist()]
+                        #tube = umich_tube_records(tube, row)
+                else:
+                        pass   
 
-        # Adds tube with MSU records (and UMich records if they exist)
-        database.add_tube(tube)
+                # Tube with MSU records (and UMich records if they exist)
+                yield tube
 
+# Adds all of the tubes as one batch, the manager picks it up in one go
+database.add_tubes(msu_tubes())
 
-print("Cross-check: number of tubes in new database: ",database.size())
+
+print("Cross-check: number of tubes in new database: ",database.size(include_cold=True))
 time.sleep(5)
-print("Cross-check: number of tubes in new database: ",database.size())
+print("Cross-check: number of tubes in new database: ",database.size(include_cold=True))
 
         
 # List of barcodes that are in UMich barcode list, but not MSU database
@@ -297,21 +301,23 @@ print("Cross-check: number of tubes in new database: ",database.size())
 umich_barcodes = list(set(lst) - set(tube_dict))
 print("Number of tubes made at UMich: ",len(umich_barcodes))
 
-counter=0
-for barcode in umich_barcodes:
-        tube = Tube()
-        tube.set_ID(barcode)
-        counter += 1
-        # sleep every 1000 tubes to give the manager time to keep up
-        if counter%1000 == 0:
-                print("Processing tube ",counter," , ID ",barcode)
-                #time.sleep(3)
+def umich_tubes():
+        counter=0
+        for barcode in umich_barcodes:
+                tube = Tube()
+                tube.set_ID(barcode)
+                counter += 1
+                # show progress every 1000 tubes
+                if counter%1000 == 0:
+                        print("Processing tube ",counter," , ID ",barcode)
         
-        row = umich.index[(umich['tubeID'] == barcode).tolist()]
-        tube = umich_tube_records(tube, row)
+                row = umich.index[(umich['tubeID'] == barcode).tolist()]
+                tube = umich_tube_records(tube, row)
+
+                # Tube with only UMich records
+                yield tube
 
-        # Adds tube with only UMich records
-        database.add_tube(tube)
+database.add_tubes(umich_tubes())
 
 print("Finished! Now you have to wait for the manager to add all of the tubes")
 old_database.close_shelve(tube_dict)